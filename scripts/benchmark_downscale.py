@@ -0,0 +1,77 @@
+"""
+Compare the speed and output quality of the downscale methods of the preprocessing.
+
+Each image is converted to 8-bit grayscale at the target resolution with every method.
+The quality is reported as the PSNR in dB with respect to the 'lanczos' method.
+Without input directory, synthetic 600 dpi scans are generated.
+"""
+# standard library imports
+import argparse
+import pathlib as pl
+import tempfile
+import time
+
+# third party library imports
+import numpy as np
+from PIL import Image
+
+# local application imports
+from smc_benchmark.preprocess import DOWNSCALE_METHODS, convert_image
+
+parser = argparse.ArgumentParser()
+parser.add_argument("-i", "--indir", type=str, default=None,
+                    help="Path to input image directory, defaults to synthetic scans")
+parser.add_argument("-d", "--dpi", type=int, default=150,
+                    help="Resolution of preprocessed images in dpi.")
+parser.add_argument("-r", "--repeat", type=int, default=3,
+                    help="Number of repetitions per image, defaults to 3.")
+args = parser.parse_args()
+
+
+def synthetic_scans(folder, n=2, size=(4800, 3600)):
+    """Write noisy scans with smooth structures, as JPEG and BMP at 600 dpi."""
+    rng = np.random.default_rng(0)
+    y, x = np.mgrid[0:size[1], 0:size[0]]
+    files = []
+    for i in range(n):
+        pattern = 128 + 60 * np.sin(x / (40 + 10 * i)) * np.cos(y / 55)
+        pixels = np.clip(pattern[..., None] + rng.normal(0, 12, (*pattern.shape, 3)), 0, 255)
+        img = Image.fromarray(pixels.astype(np.uint8))
+        for extension in ("jpg", "bmp"):
+            file = pl.Path(folder) / f"scan_{i}.{extension}"
+            img.save(file, dpi=(600, 600))
+            files.append(file)
+    return files
+
+
+def psnr(reference, image):
+    """Peak signal-to-noise ratio of two 8-bit images in dB."""
+    mse = np.mean((reference.astype(np.float64) - image.astype(np.float64)) ** 2)
+    return np.inf if mse == 0 else 10 * np.log10(255 ** 2 / mse)
+
+
+with tempfile.TemporaryDirectory() as temp:
+    if args.indir is None:
+        image_files = synthetic_scans(temp)
+    else:
+        image_files = sorted(pl.Path(args.indir).glob("*.*"))
+
+    print(f"{'image':<30} {'method':<8} {'time in s':>10} {'PSNR in dB':>11}")
+    for image_path in image_files:
+        results = {}
+        for method in DOWNSCALE_METHODS:
+            output_folder = pl.Path(temp) / method
+            output_folder.mkdir(parents=True, exist_ok=True)
+            times = []
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                output_path = convert_image(image_path, output_folder=output_folder,
+                                            target_dpi=args.dpi, method=method)
+                times.append(time.perf_counter() - start)
+            with Image.open(output_path) as img:
+                results[method] = (min(times), np.asarray(img))
+
+        reference = results["lanczos"][1]
+        for method, (seconds, pixels) in results.items():
+            print(f"{image_path.name:<30} {method:<8} {seconds:>10.3f} "
+                  f"{psnr(reference, pixels):>11.1f}")
@@ -0,0 +1,64 @@
+"""
+Compare the parsers of KIT data files.
+
+Each file is parsed with np.loadtxt, the C parser of pandas and the fixed-width parser
+used by smc_benchmark.read, without the cache. The time per file is the shortest of
+several repetitions.
+"""
+# standard library imports
+import argparse
+import io
+import pathlib as pl
+import time
+
+# third party library imports
+import numpy as np
+import pandas as pd
+
+# local application imports
+from smc_benchmark._naming import KIT_NAMING
+from smc_benchmark.read import HEADER_LINES, KIT, _parse_fixed_width
+
+parser = argparse.ArgumentParser()
+parser.add_argument("-i", "--indir", type=str, default="tests/data/kit",
+                    help="Path to directory of KIT data files, defaults to tests/data/kit")
+parser.add_argument("-r", "--repeat", type=int, default=10,
+                    help="Number of repetitions per file, defaults to 10.")
+args = parser.parse_args()
+
+usecols = list(KIT_NAMING)
+
+
+def data_block(file):
+    """Return the data block of a file, after the header lines."""
+    with file.open("rb") as f:
+        for _ in range(HEADER_LINES[KIT]):
+            f.readline()
+        return f.read()
+
+
+def loadtxt(file):
+    return np.loadtxt(io.BytesIO(data_block(file)), delimiter=",", usecols=usecols, ndmin=2)
+
+
+def pandas_c(file):
+    return pd.read_csv(io.BytesIO(data_block(file)), sep=",", header=None, usecols=usecols,
+                       dtype=np.float64, engine="c").to_numpy()
+
+
+def fixed_width(file):
+    return _parse_fixed_width(data_block(file), usecols)
+
+
+parsers = {"loadtxt": loadtxt, "pandas c": pandas_c, "fixed width": fixed_width}
+print(f"{'file':<30} {'parser':<12} {'time in s':>10} {'equal':>6}")
+for file in sorted(pl.Path(args.indir).glob("*.TXT")):
+    reference = loadtxt(file)
+    for name, parse in parsers.items():
+        times = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            data = parse(file)
+            times.append(time.perf_counter() - start)
+        equal = data is not None and np.array_equal(data, reference)
+        print(f"{file.name:<30} {name:<12} {min(times):>10.4f} {equal!s:>6}")
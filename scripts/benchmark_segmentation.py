@@ -0,0 +1,66 @@
+"""
+Compare the speed and the masks of the fast segmentation mode with the default mode.
+
+Each preprocessed image is segmented with the default settings at full resolution and in
+fast mode. The time of the fast mode is reported as speedup, its mask as the IoU with
+respect to the mask of the default mode.
+"""
+# standard library imports
+import argparse
+import pathlib as pl
+import time
+
+# third party library imports
+import cv2
+import numpy as np
+
+# local application imports
+from smc_benchmark.segment import FastSettings, get_model, select_mask
+
+parser = argparse.ArgumentParser()
+parser.add_argument("-i", "--indir", type=str, required=True,
+                    help="Path to directory of preprocessed images")
+parser.add_argument("-s", "--side", type=int, nargs="+", default=[FastSettings.max_side],
+                    help="Longer sides of the downscaled copies in fast mode, defaults to 1024")
+parser.add_argument("-p", "--points", type=int, default=FastSettings.points_per_side,
+                    help="Points per side of the prompt grid in fast mode, defaults to 16")
+parser.add_argument("-r", "--repeat", type=int, default=1,
+                    help="Number of repetitions per image, defaults to 1.")
+args = parser.parse_args()
+
+
+def iou(reference, mask):
+    """Intersection over union of two boolean masks."""
+    union = np.logical_or(reference, mask).sum()
+    return 1.0 if union == 0 else np.logical_and(reference, mask).sum() / union
+
+
+def timed(image_rgb, fast):
+    """Select the mask of an image, returning the shortest time and the mask."""
+    times = []
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        mask = select_mask(image_rgb=image_rgb, model=model, fast=fast)
+        times.append(time.perf_counter() - start)
+    return min(times), mask
+
+
+model = get_model().load()
+modes = {"default": None}
+for side in args.side:
+    modes[f"fast-{side}"] = FastSettings(max_side=side, points_per_side=args.points)
+
+image_files = sorted(pl.Path(args.indir).glob("*.bmp"))
+print(f"{'image':<30} {'mode':<10} {'time in s':>10} {'speedup':>8} {'IoU':>6}")
+for image_path in image_files:
+    image_rgb = cv2.cvtColor(cv2.imread(str(image_path)), cv2.COLOR_BGR2RGB)
+    results = {mode: timed(image_rgb, fast) for mode, fast in modes.items()}
+
+    reference_seconds, reference = results["default"]
+    for mode, (seconds, mask) in results.items():
+        if mask is None or reference is None:
+            score = "-"
+        else:
+            score = f"{iou(reference, mask):.4f}"
+        print(f"{image_path.name:<30} {mode:<10} {seconds:>10.2f} "
+              f"{reference_seconds / seconds:>8.1f} {score:>6}")
@@ -6,7 +6,7 @@
 import argparse
 
 # local application imports
-from smc_benchmark.plot import plot_gap_force
+from smc_benchmark.plot import plot_gap_force, watch_gap_force
 
 parser = argparse.ArgumentParser()
 parser.add_argument("-d", "--dpi", type=int, default=300,
@@ -17,7 +17,20 @@ parser.add_argument("-o", "--outdir", type=str, default=None,
                     help=f"Path to output directory")
 parser.add_argument("-n", "--institution", type=str, required=True,
                     help=f"Name of the institution")
+parser.add_argument("-j", "--workers", type=int, default=None,
+                    help=f"Number of processes rendering the plots, -1 for all CPUs")
+parser.add_argument("-f", "--overwrite", action="store_true",
+                    help=f"Plot again even if the plots are newer than the data")
+parser.add_argument("-w", "--watch", action="store_true",
+                    help=f"Watch the data directory and plot new or changed experiments")
+parser.add_argument("--interval", type=float, default=10.0,
+                    help=f"Time between polls of the data directory in s, defaults to 10 s.")
 args = parser.parse_args()
 
-plot_gap_force(indir=args.indir, outdir=args.outdir,
-               institution=args.institution, dpi=args.dpi)
+if args.watch:
+    watch_gap_force(indir=args.indir, outdir=args.outdir,
+                    institution=args.institution, dpi=args.dpi, interval=args.interval)
+else:
+    plot_gap_force(indir=args.indir, outdir=args.outdir,
+                   institution=args.institution, dpi=args.dpi,
+                   workers=args.workers, overwrite=args.overwrite)
@@ -4,30 +4,49 @@
 """
 # standard library imports
 import argparse
+import logging
 
 # local application imports
-from smc_benchmark.preprocess import process_images
+from smc_benchmark.preprocess import DOWNSCALE_METHODS, process_images
 
 parser = argparse.ArgumentParser()
 parser.add_argument("-e", "--excel", type=str, required=True,
                     help=f"Path to excel test plan")
 parser.add_argument("-i", "--indir", type=str, required=True,
                     help=f"Path to input image directory")
-parser.add_argument("-t", "--tempdir", type=str, default='temp',
-                    help=f"Path to temporary directory")
+parser.add_argument("-t", "--tempdir", type=str, default=None,
+                    help=f"Path to temporary directory for resized images, "
+                         f"defaults to converting each image in a single pass")
 parser.add_argument("-o", "--outdir", type=str, required=True,
                     help=f"Path to output directory")
 parser.add_argument("-d", "--dpi", type=int, default=150,
                     help=f"Resolution of preprocessed images in dpi.")
 parser.add_argument("-b", "--batchsize", type=int, default=10,
-                    help=f"Batch size, defaults to 10.")
-parser.add_argument("-w", "--waittime", type=float, default=0.1,
-                    help=f"Wait time, defaults to 0.1 s.")
+                    help=f"Maximum number of images processed at a time, defaults to 10.")
+parser.add_argument("-j", "--workers", type=int, default=None,
+                    help=f"Number of worker processes, -1 for all CPUs, "
+                         f"defaults to serial processing.")
+parser.add_argument("-w", "--waittime", type=float, default=None,
+                    help=f"Deprecated and ignored, images are no longer processed in batches "
+                         f"separated by sleeps.")
+parser.add_argument("-m", "--method", type=str, default='lanczos', choices=DOWNSCALE_METHODS,
+                    help=f"Downscale method, defaults to lanczos "
+                         f"(see scripts/benchmark_downscale.py).")
+parser.add_argument("-f", "--overwrite", action="store_true",
+                    help=f"Process all images, even if they are unchanged since the last run")
+parser.add_argument("--bandheight", type=int, default=None,
+                    help=f"Process images in bands of this many rows to bound the memory usage")
 args = parser.parse_args()
 
+logging.basicConfig(level=logging.INFO, format='%(message)s')
+
 process_images(input_folder=args.indir,
                output_folder=args.outdir,
                temp_folder=args.tempdir,
                target_dpi=args.dpi,
                batch_size=args.batchsize,
+               workers=args.workers,
+               method=args.method,
+               overwrite=args.overwrite,
+               band_height=args.bandheight,
                wait_time=args.waittime)
@@ -0,0 +1,57 @@
+"""
+Preprocess, sort and segment scans in one resumable run.
+"""
+# standard library imports
+import argparse
+import logging
+
+# local application imports
+from smc_benchmark.pipeline import run_pipeline
+from smc_benchmark.preprocess import DOWNSCALE_METHODS
+from smc_benchmark.segment import BACKENDS
+from smc_benchmark.sort import PLACEMENT_MODES
+
+parser = argparse.ArgumentParser()
+parser.add_argument("-e", "--excel", type=str, required=True,
+                    help="Path to excel test plan")
+parser.add_argument("-i", "--indir", type=str, required=True,
+                    help="Path to input image directory")
+parser.add_argument("-o", "--outdir", type=str, required=True,
+                    help="Path to output directory")
+parser.add_argument("-n", "--institution", type=str, required=True,
+                    help="Name of the institution")
+parser.add_argument("-d", "--dpi", type=int, default=150,
+                    help="Resolution of preprocessed images in dpi.")
+parser.add_argument("-m", "--method", type=str, default='lanczos', choices=DOWNSCALE_METHODS,
+                    help="Downscale method, defaults to lanczos.")
+parser.add_argument("--bandheight", type=int, default=None,
+                    help="Process images in bands of this many rows to bound the memory usage")
+parser.add_argument("--placement", type=str, default='copy', choices=PLACEMENT_MODES,
+                    help="How sorted images are placed in the output directory, defaults to copy")
+parser.add_argument("-j", "--workers", type=int, default=None,
+                    help="Number of preprocessing processes, -1 for all CPUs, defaults to one.")
+parser.add_argument("--segmentworkers", type=int, default=1,
+                    help="Number of segmentation processes, defaults to one.")
+parser.add_argument("--backend", type=str, default='sam', choices=BACKENDS,
+                    help="Segmentation backend, 'auto' uses SAM only where OpenCV fails")
+parser.add_argument("--fastsegment", action="store_true",
+                    help="Segment in fast mode, generating masks on downscaled copies")
+parser.add_argument("--nosegment", action="store_true",
+                    help="Only preprocess and sort the images")
+args = parser.parse_args()
+
+logging.basicConfig(level=logging.INFO, format='%(message)s')
+
+run_pipeline(excel=args.excel,
+             indir=args.indir,
+             outdir=args.outdir,
+             institution=args.institution,
+             target_dpi=args.dpi,
+             method=args.method,
+             band_height=args.bandheight,
+             mode=args.placement,
+             segment=not args.nosegment,
+             fast=args.fastsegment,
+             backend=args.backend,
+             workers=args.workers,
+             segment_workers=args.segmentworkers)
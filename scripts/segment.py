@@ -6,17 +6,31 @@
 import argparse
 
 # local application imports
-from smc_benchmark.sort import sort_image_dir
+from smc_benchmark.segment import BACKENDS, FastSettings, segment_images
 
 parser = argparse.ArgumentParser()
-parser.add_argument("-e", "--excel", type=str, required=True,
-                    help=f"Path to excel test plan")
 parser.add_argument("-i", "--indir", type=str, required=True,
                     help=f"Path to input image directory")
 parser.add_argument("-o", "--outdir", type=str, required=True,
                     help=f"Path to output directory")
-parser.add_argument("-n", "--institution", type=str, required=True,
-                    help=f"Name of the institution")
+parser.add_argument("-l", "--logfile", type=str, default="process.log",
+                    help=f"Path to log file, defaults to process.log")
+parser.add_argument("-j", "--workers", type=int, default=None,
+                    help=f"Number of worker processes sharing the model, -1 for all CPUs")
+parser.add_argument("-t", "--threads", type=int, default=None,
+                    help=f"Number of torch threads per worker, defaults to CPUs / workers")
+parser.add_argument("-b", "--backend", type=str, default='sam', choices=BACKENDS,
+                    help=f"Segmentation backend, 'auto' uses SAM only where OpenCV fails")
+parser.add_argument("--fast", action="store_true",
+                    help=f"Generate masks on a downscaled copy of each image")
+parser.add_argument("--fastside", type=int, default=FastSettings.max_side,
+                    help=f"Longer side of the downscaled copy in fast mode, defaults to 1024")
 args = parser.parse_args()
 
-sort_image_dir(excel=args.excel, indir=args.indir, outdir=args.outdir, institution=args.institution)
+segment_images(input_folder=args.indir,
+               output_folder=args.outdir,
+               log_file_path=args.logfile,
+               workers=args.workers,
+               threads_per_worker=args.threads,
+               backend=args.backend,
+               fast=FastSettings(max_side=args.fastside) if args.fast else None)
@@ -6,7 +6,7 @@
 import argparse
 
 # local application imports
-from smc_benchmark.sort import sort_image_dir
+from smc_benchmark.sort import PLACEMENT_MODES, sort_image_dir
 
 parser = argparse.ArgumentParser()
 parser.add_argument("-e", "--excel", type=str, required=True,
@@ -17,9 +17,15 @@ parser.add_argument("-o", "--outdir", type=str, required=True,
                     help=f"Path to output directory")
 parser.add_argument("-n", "--institution", type=str, required=True,
                     help=f"Name of the institution")
+parser.add_argument("-m", "--mode", type=str, default='copy', choices=PLACEMENT_MODES,
+                    help=f"How images are placed in the output directory, defaults to copy")
+parser.add_argument("-j", "--workers", type=int, default=None,
+                    help=f"Number of threads placing the images, defaults to one")
 args = parser.parse_args()
 
 sort_image_dir(excel=args.excel,
                indir=args.indir,
                outdir=args.outdir,
-               institution=args.institution)
+               institution=args.institution,
+               mode=args.mode,
+               workers=args.workers)
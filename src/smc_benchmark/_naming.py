@@ -7,7 +7,30 @@ TEMP = "T"  # temperature
 FORCE = "F"  # force
 DISPLACEMENT = "d"  # displacement
 VELOCITY = "v"  # velocity
+FORCE_SMOOTH = "F_s"  # smoothed force
+FORCE_SLOPE = "dF/dh"  # derivative of force with respect to gap
 
 # Column names; used in read functions
 KIT_NAMING = {0: TIME, 2: FORCE, 3: DISPLACEMENT, 4: GAP}
 UT_NAMING = [TIME, DISPLACEMENT, FORCE, "L1", "L2"]  # L(VDT)1 & 2 not used
+
+# Column names of TUM data files, normalized to lower case without units. If several columns
+# of a file map to the same channel, e.g., 'Prüfzeit' and 'Zeit', the first one is used.
+TUM_NAMING = {
+    "time": TIME,
+    "zeit": TIME,
+    "prüfzeit": TIME,
+    "force": FORCE,
+    "load": FORCE,
+    "kraft": FORCE,
+    "standardkraft": FORCE,
+    "displacement": DISPLACEMENT,
+    "extension": DISPLACEMENT,
+    "weg": DISPLACEMENT,
+    "standardweg": DISPLACEMENT,
+    "gap": GAP,
+    "spalt": GAP,
+    "spalthöhe": GAP,
+    "temperature": TEMP,
+    "temperatur": TEMP,
+}
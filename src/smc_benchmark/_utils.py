@@ -1,4 +1,11 @@
+import os
 import re
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, as_completed, wait
+from concurrent.futures.process import BrokenProcessPool
+
+import numpy as np
+
+from smc_benchmark import cache as _cache
 
 NAMING_PATTERN = r"(\w+)-(\w+)-(\d+)"
 
@@ -11,3 +18,84 @@ def decode_filename(filename):
     else:
         raise Exception(f"File name does not match pattern: {filename}")
     return organization, material, number
+
+
+def parallel_map(func, items, workers=None):
+    """Apply a function to all items, optionally in a process pool.
+
+    The results are returned in the order of the items. With ``workers`` None or 1, or if
+    no process pool can be started on this platform, the items are processed serially.
+    ``workers=-1`` uses all CPUs. The workers use the cache directory of this process, also
+    where they are spawned instead of forked. Exceptions raised by ``func`` are re-raised.
+    """
+    items = list(items)
+    if workers == -1:
+        workers = os.cpu_count()
+    if workers is not None and workers > 1 and len(items) > 1:
+        executor = None
+        try:
+            executor = ProcessPoolExecutor(
+                max_workers=min(workers, len(items)),
+                initializer=_cache.set_cache_dir,
+                initargs=(_cache.get_cache_dir(),),
+            )
+            futures = [executor.submit(func, item) for item in items]
+        except (OSError, NotImplementedError, BrokenProcessPool):
+            # No process pool available, e.g., in restricted environments
+            if executor is not None:
+                executor.shutdown(cancel_futures=True)
+        else:
+            with executor:
+                return [future.result() for future in futures]
+    return [func(item) for item in items]
+
+
+def pad_ragged(arrays, fill_value=np.nan):
+    """Stack 1D arrays of different lengths into a 2D array, padded at the end.
+
+    Returns the padded array of shape (len(arrays), max length) and the lengths.
+    """
+    lengths = np.array([len(a) for a in arrays], dtype=np.intp)
+    padded = np.full((len(arrays), lengths.max(initial=0)), fill_value, dtype=np.float64)
+    padded[np.arange(padded.shape[1]) < lengths[:, None]] = np.concatenate(
+        [np.asarray(a, dtype=np.float64) for a in arrays] or [np.empty(0)]
+    )
+    return padded, lengths
+
+
+def bounded_map(func, items, workers=None, max_in_flight=None, executor=ProcessPoolExecutor):
+    """Apply a function to all items, yielding ``(item, result, error)`` as they complete.
+
+    With ``workers`` greater than 1 (-1 uses all CPUs), the items are processed in a pool
+    of ``executor`` type, with at most ``max_in_flight`` items (default: ``workers``)
+    submitted at a time, so the number of items held in memory stays bounded. Otherwise,
+    the items are processed serially. Exceptions raised by ``func`` are yielded as
+    ``error``, with ``result`` None, instead of being raised.
+    """
+    if workers == -1:
+        workers = os.cpu_count()
+    if workers is None or workers <= 1:
+        for item in items:
+            try:
+                yield item, func(item), None
+            except Exception as e:  # errors are collected per item
+                yield item, None, e
+        return
+
+    max_in_flight = max(max_in_flight or workers, 1)
+    with executor(max_workers=workers) as pool:
+        pending = {}
+        for item in items:
+            if len(pending) >= max_in_flight:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield _outcome(pending.pop(future), future)
+            pending[pool.submit(func, item)] = item
+        for future in as_completed(pending):
+            yield _outcome(pending[future], future)
+
+
+def _outcome(item, future):
+    """Return ``(item, result, error)`` of a completed future."""
+    error = future.exception()
+    return item, None if error else future.result(), error
@@ -0,0 +1,227 @@
+"""Memory-mapped archive of the squeeze experiments of several institutions.
+
+An archive is a folder containing one contiguous binary file per channel, in which the
+experiments are stored one after another, and an index with the position and metadata
+of each experiment. Opening an archive only maps the channel files into memory,
+and queries return views of the mapped files without copying data.
+"""
+
+import json
+import pathlib as pl
+from contextlib import ExitStack
+from dataclasses import fields
+
+import numpy as np
+import pandas as pd
+
+from smc_benchmark._naming import (
+    DISPLACEMENT,
+    FORCE,
+    GAP,
+    KIT_NAMING,
+    TIME,
+    TUM_NAMING,
+    UT_NAMING,
+)
+from smc_benchmark.read import KIT, TUM, UT, Header, read
+
+# Channels shared by all institutions, stored first in an archive. They are followed by
+# the further channels of the exported institutions, e.g., the LVDTs of UT. Missing
+# channels of an experiment are filled with NaN.
+CHANNELS = [TIME, FORCE, DISPLACEMENT, GAP]
+
+# Channels of the data files of each institution
+INSTITUTION_CHANNELS = {
+    KIT: list(KIT_NAMING.values()),
+    UT: list(UT_NAMING),
+    TUM: list(dict.fromkeys(TUM_NAMING.values())),
+}
+
+# Files of an archive
+META_FILE = "archive.json"
+INDEX_FILE = "index.csv"
+
+# Categorical columns of the index
+CATEGORIES = ["institution", "material", "config"]
+
+# Columns of the index, followed by the fields of the header
+INDEX_COLUMNS = [*CATEGORIES, "number", "start", "stop"]
+
+ARCHIVE_VERSION = 1
+DTYPE = "<f8"
+
+
+def export_archive(path, folders, *, cache=True):
+    """Consolidate the experiments of several institutions into one archive.
+
+    All channels of the institutions' data files are stored, see ``INSTITUTION_CHANNELS``.
+
+    Parameters
+    ----------
+    path : str | pathlib.Path
+        Folder of the archive. It is created if it does not exist.
+    folders : dict[str, str | pathlib.Path]
+        Folders containing the data, by abbreviation of the institution.
+    cache : bool, optional
+        Whether to use the on-disk cache when reading the data, see :func:`read`.
+
+    Returns
+    -------
+    Archive
+        The newly written archive.
+    """
+    path = pl.Path(path)
+    path.mkdir(parents=True, exist_ok=True)
+    channels = list(
+        dict.fromkeys(CHANNELS + [c for i in folders for c in INSTITUTION_CHANNELS.get(i, [])])
+    )
+
+    rows = []
+    offset = 0
+    with ExitStack() as stack:
+        channel_files = [
+            stack.enter_context((path / _channel_file(i)).open("wb"))
+            for i in range(len(channels))
+        ]
+        for institution, folder in folders.items():
+            # Read one experiment at a time, so memory usage is bounded by the largest one
+            data = read(institution, folder, cache=cache, lazy=True, max_loaded=0)
+            for configs in data.values():
+                for experiments in configs.values():
+                    for experiment in experiments:
+                        df = experiment.data
+                        for channel, f in zip(channels, channel_files):
+                            if channel in df.columns:
+                                values = df[channel].to_numpy(dtype=DTYPE)
+                            else:
+                                values = np.full(len(df), np.nan, dtype=DTYPE)
+                            f.write(values.tobytes())
+                        rows.append(
+                            {
+                                "institution": experiment.institution,
+                                "material": experiment.material,
+                                "config": experiment.config,
+                                "number": experiment.number,
+                                "start": offset,
+                                "stop": offset + len(df),
+                                **vars(df.attrs["header"]),
+                            }
+                        )
+                        offset += len(df)
+
+    # The columns are given, so an archive without experiments has a complete index, too
+    columns = INDEX_COLUMNS + [field.name for field in fields(Header)]
+    pd.DataFrame(rows, columns=columns).to_csv(path / INDEX_FILE, index=False)
+    meta = {
+        "version": ARCHIVE_VERSION,
+        "dtype": DTYPE,
+        "length": offset,
+        "channels": {channel: _channel_file(i) for i, channel in enumerate(channels)},
+    }
+    (path / META_FILE).write_text(json.dumps(meta, indent=2))
+    return Archive(path)
+
+
+def open_archive(path):
+    """Open an archive written by :func:`export_archive`."""
+    return Archive(path)
+
+
+def _channel_file(i):
+    """Return the file name of the i-th channel."""
+    # Channel names, e.g., 't' and 'T', may clash on case-insensitive file systems
+    return f"channel_{i}.bin"
+
+
+class Archive:
+    """Memory-mapped archive of squeeze experiments.
+
+    Parameters
+    ----------
+    path : str | pathlib.Path
+        Folder of the archive.
+
+    Attributes
+    ----------
+    index : pd.DataFrame
+        One row per experiment with institution, material and config as categorical
+        columns, specimen number, start and stop of the experiment in the channel
+        arrays, and the header metadata.
+    channels : dict[str, np.memmap]
+        Contiguous, read-only array of each channel.
+    """
+
+    def __init__(self, path):
+        self.path = pl.Path(path)
+        meta = json.loads((self.path / META_FILE).read_text())
+        if meta["version"] != ARCHIVE_VERSION:
+            raise ValueError(f"Unsupported archive version: {meta['version']}")
+        self.channels = {
+            channel: _memmap(self.path / file, meta["dtype"], meta["length"])
+            for channel, file in meta["channels"].items()
+        }
+        self.index = pd.read_csv(
+            self.path / INDEX_FILE,
+            dtype=dict.fromkeys(CATEGORIES, "category"),
+            parse_dates=["date"],
+        )
+        self._starts = self.index["start"].to_numpy()
+        self._stops = self.index["stop"].to_numpy()
+
+    def __len__(self):
+        return len(self.index)
+
+    def __getitem__(self, i):
+        """Return the channels of the i-th experiment as views of the archive."""
+        start, stop = self._starts[i], self._stops[i]
+        return {channel: values[start:stop] for channel, values in self.channels.items()}
+
+    def select(self, **criteria):
+        """Return the rows of the index matching all criteria.
+
+        Parameters
+        ----------
+        **criteria
+            Values of index columns, e.g., ``material="CF503K"``, or lists of values,
+            e.g., ``number=[1, 5]``.
+
+        Returns
+        -------
+        pd.DataFrame
+            Matching rows of the index.
+        """
+        return self.index[self._mask(criteria)]
+
+    def query(self, **criteria):
+        """Return the channels of all experiments matching the criteria.
+
+        Parameters
+        ----------
+        **criteria
+            See :meth:`select`.
+
+        Returns
+        -------
+        list[dict[str, np.ndarray]]
+            Channels of each matching experiment as views of the archive, in the order of
+            the index.
+        """
+        return [self[i] for i in np.flatnonzero(self._mask(criteria))]
+
+    def _mask(self, criteria):
+        """Return a boolean mask of the rows of the index matching all criteria."""
+        mask = np.ones(len(self.index), dtype=bool)
+        for column, value in criteria.items():
+            if column not in self.index.columns:
+                raise KeyError(f"Unknown index column: {column}")
+            values = value if isinstance(value, (list, tuple, set)) else [value]
+            mask &= self.index[column].isin(values).to_numpy()
+        return mask
+
+
+def _memmap(file, dtype, length):
+    """Map a channel file into memory, read-only."""
+    if length == 0:
+        # Empty files cannot be mapped
+        return np.empty(0, dtype=dtype)
+    return np.memmap(file, dtype=dtype, mode="r", shape=(length,))
@@ -0,0 +1,221 @@
+"""On-disk cache of parsed experiment files and tables.
+
+Each parsed experiment is stored as one ``.npz`` file in the cache directory. An entry is
+only used if the size and modification time of the source file match the ones recorded
+when the entry was written, so edited or replaced data files are parsed again. Tables with
+text columns, e.g., parsed test plans, are stored column by column, see :func:`store_table`.
+"""
+
+import hashlib
+import json
+import os
+import pathlib as pl
+import tempfile
+import warnings
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import is_numeric_dtype
+
+# Environment variable to override the default cache directory
+CACHE_DIR_ENV = "SMC_BENCHMARK_CACHE_DIR"
+
+# Bump whenever the readers change their output, so that stale entries are ignored
+CACHE_VERSION = 3
+
+_cache_dir = None
+
+
+def get_cache_dir():
+    """Return the cache directory.
+
+    Returns
+    -------
+    pathlib.Path
+        The directory set by :func:`set_cache_dir`, else the directory given by the
+        environment variable ``SMC_BENCHMARK_CACHE_DIR``, else ``~/.cache/smc_benchmark``.
+    """
+    if _cache_dir is not None:
+        return _cache_dir
+    if os.environ.get(CACHE_DIR_ENV):
+        return pl.Path(os.environ[CACHE_DIR_ENV])
+    return pl.Path.home() / ".cache" / "smc_benchmark"
+
+
+def set_cache_dir(path):
+    """Set the cache directory.
+
+    Parameters
+    ----------
+    path : str | pathlib.Path | None
+        New cache directory. ``None`` restores the default.
+    """
+    global _cache_dir
+    _cache_dir = None if path is None else pl.Path(path)
+
+
+def clear_cache():
+    """Delete all entries in the cache directory.
+
+    Temporary files left behind by interrupted writes are deleted as well.
+
+    Returns
+    -------
+    int
+        Number of deleted entries, not counting temporary files.
+    """
+    count = 0
+    for entry in get_cache_dir().glob("*.npz"):
+        entry.unlink(missing_ok=True)
+        count += 1
+    for tmp in get_cache_dir().glob("*.tmp"):
+        tmp.unlink(missing_ok=True)
+    return count
+
+
+def fingerprint(file):
+    """Return the fingerprint (size, modification time) of a file."""
+    stat = pl.Path(file).stat()
+    return stat.st_size, stat.st_mtime_ns
+
+
+def _entry_path(institution, file, variant=""):
+    """Return the path of the cache entry of a data file."""
+    file = pl.Path(file)
+    key = hashlib.sha1(f"{institution}:{file.resolve()}:{variant}".encode()).hexdigest()[:16]
+    return get_cache_dir() / f"{file.stem}-{key}.npz"
+
+
+def load(institution, file, variant=""):
+    """Load a parsed experiment from the cache.
+
+    Parameters
+    ----------
+    institution : str
+        Abbreviation of the institution, e.g., 'kit' or 'ut'.
+    file : str | pathlib.Path
+        Path to the data file.
+    variant : str, optional
+        Identifies processed versions of the experiment, e.g., with derived channels.
+        Defaults to the parsed file.
+
+    Returns
+    -------
+    tuple[pd.DataFrame, dict] | None
+        The cached experiment and its metadata, or None if there is no valid entry.
+    """
+    try:
+        with np.load(_entry_path(institution, file, variant), allow_pickle=False) as entry:
+            if int(entry["version"]) != CACHE_VERSION:
+                return None
+            if tuple(entry["fingerprint"]) != fingerprint(file):
+                return None
+            df = pd.DataFrame(entry["data"], columns=entry["columns"].tolist())
+            return df, json.loads(str(entry["metadata"]))
+    except (OSError, KeyError, ValueError):
+        # Missing, unreadable or corrupt entry
+        return None
+
+
+def store(institution, file, df, metadata=None, variant=""):
+    """Store a parsed experiment in the cache.
+
+    Parameters
+    ----------
+    institution : str
+        Abbreviation of the institution, e.g., 'kit' or 'ut'.
+    file : str | pathlib.Path
+        Path to the data file.
+    df : pd.DataFrame
+        The parsed experiment.
+    metadata : dict, optional
+        JSON-serializable metadata stored along with the experiment.
+    variant : str, optional
+        Identifies processed versions of the experiment, see :func:`load`.
+    """
+    path = _entry_path(institution, file, variant)
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Write to a temporary file first, so readers never see partial entries
+        with tempfile.NamedTemporaryFile(dir=path.parent, suffix=".tmp", delete=False) as tmp:
+            np.savez(
+                tmp,
+                version=CACHE_VERSION,
+                fingerprint=np.array(fingerprint(file), dtype=np.int64),
+                columns=np.array(df.columns, dtype=str),
+                data=df.to_numpy(),
+                metadata=json.dumps(metadata or {}),
+            )
+        pl.Path(tmp.name).replace(path)
+    except OSError as e:
+        warnings.warn(f"Could not write cache entry {path}: {e}", stacklevel=2)
+
+
+def load_table(namespace, file, version, variant=""):
+    """Load a table with numeric and text columns from the cache.
+
+    Parameters
+    ----------
+    namespace : str
+        Kind of the table, e.g., 'testplan'.
+    file : str | pathlib.Path
+        Path to the file the table was parsed from.
+    version : int
+        Version of the parser of the namespace, entries of other versions are ignored.
+    variant : str, optional
+        Identifies the options the table was parsed with, e.g., the rows read.
+
+    Returns
+    -------
+    pd.DataFrame | None
+        The cached table, or None if there is no valid entry.
+    """
+    try:
+        with np.load(_entry_path(namespace, file, variant), allow_pickle=False) as entry:
+            if int(entry["version"]) != version:
+                return None
+            if tuple(entry["fingerprint"]) != fingerprint(file):
+                return None
+            columns = entry["columns"].tolist()
+            return pd.DataFrame({c: entry[f"column_{i}"] for i, c in enumerate(columns)})
+    except (OSError, KeyError, ValueError):
+        # Missing, unreadable or corrupt entry
+        return None
+
+
+def store_table(namespace, file, df, version, variant=""):
+    """Store a table with numeric and text columns in the cache.
+
+    Each column is stored as a separate array, text columns as fixed-width unicode, so no
+    pickling is needed to load them.
+
+    Parameters
+    ----------
+    namespace : str
+        Kind of the table, see :func:`load_table`.
+    file : str | pathlib.Path
+        Path to the file the table was parsed from.
+    df : pd.DataFrame
+        The table. Text columns must not contain missing values.
+    version, variant
+        See :func:`load_table`.
+    """
+    path = _entry_path(namespace, file, variant)
+    columns = {
+        f"column_{i}": df[c].to_numpy(dtype=str if not is_numeric_dtype(df[c]) else None)
+        for i, c in enumerate(df.columns)
+    }
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Write to a temporary file first, so readers never see partial entries
+        with tempfile.NamedTemporaryFile(dir=path.parent, suffix=".tmp", delete=False) as tmp:
+            np.savez(
+                tmp,
+                version=version,
+                fingerprint=np.array(fingerprint(file), dtype=np.int64),
+                columns=np.array(df.columns, dtype=str),
+                **columns,
+            )
+        pl.Path(tmp.name).replace(path)
+    except OSError as e:
+        warnings.warn(f"Could not write cache entry {path}: {e}", stacklevel=2)
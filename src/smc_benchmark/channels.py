@@ -0,0 +1,177 @@
+"""Derived channels: velocity, smoothed force, and force-gap slope.
+
+The channels are computed with Savitzky-Golay filters, i.e., local polynomial fits,
+which smooth noisy signals and yield their derivatives at the same time. All experiments
+are filtered at once by applying the filter to padded 2D arrays.
+"""
+
+from math import factorial
+
+import numpy as np
+
+from smc_benchmark._naming import (
+    DISPLACEMENT,
+    FORCE,
+    FORCE_SLOPE,
+    FORCE_SMOOTH,
+    GAP,
+    TIME,
+    VELOCITY,
+)
+from smc_benchmark._utils import pad_ragged
+
+# Bump whenever the computation of the channels changes, so that cached channels are ignored
+CHANNELS_VERSION = 1
+
+
+def savgol_coefficients(window, polyorder, deriv=0):
+    """Return the Savitzky-Golay coefficients of all positions in a window.
+
+    Parameters
+    ----------
+    window : int
+        Odd number of samples in the window.
+    polyorder : int
+        Order of the fitted polynomial, less than ``window``.
+    deriv : int, optional
+        Order of the derivative. Defaults to 0, i.e., smoothing.
+
+    Returns
+    -------
+    np.ndarray
+        Array of shape (window, window). Row i holds the coefficients which, applied to
+        the samples of a window, yield the (derivative of the) fitted polynomial at the
+        i-th sample of the window, for unit sample spacing.
+    """
+    if window % 2 == 0 or polyorder >= window:
+        raise ValueError("window must be odd and greater than polyorder")
+    k = np.arange(window) - window // 2
+    vander = np.vander(k, polyorder + 1, increasing=True)
+    fit = np.linalg.pinv(vander)  # polynomial coefficients from samples
+    # Derivative of the polynomial, evaluated at each position of the window
+    powers = np.arange(polyorder + 1)
+    scale = np.array([factorial(p) / factorial(p - deriv) if p >= deriv else 0.0 for p in powers])
+    exponents = np.clip(powers - deriv, 0, None)
+    evaluate = np.where(powers >= deriv, scale * k[:, None] ** exponents, 0.0)
+    return evaluate @ fit
+
+
+def savgol_filter(values, lengths, window, polyorder, deriv=0):
+    """Apply a Savitzky-Golay filter to each row of a padded 2D array.
+
+    The first and last ``window // 2`` samples of each row are evaluated from the
+    polynomial fitted to the first and last window, respectively.
+
+    Parameters
+    ----------
+    values : np.ndarray
+        2D array, one signal per row, padded at the end.
+    lengths : np.ndarray
+        Number of valid samples of each row.
+    window, polyorder, deriv
+        See :func:`savgol_coefficients`.
+
+    Returns
+    -------
+    np.ndarray
+        Filtered array of the same shape, for unit sample spacing. Rows shorter than the
+        window are NaN.
+    """
+    coefficients = savgol_coefficients(window, polyorder, deriv)
+    half = window // 2
+    result = np.full(values.shape, np.nan)
+    if values.shape[1] < window:
+        return result
+
+    # Interior samples: weighted sum of shifted copies of all rows
+    n_interior = values.shape[1] - window + 1
+    interior = np.zeros((len(values), n_interior))
+    for j, c in enumerate(coefficients[half]):
+        interior += c * values[:, j : j + n_interior]
+    result[:, half : half + n_interior] = interior
+
+    # Edge samples: fitted to the first and last valid window of each row
+    rows = np.flatnonzero(lengths >= window)
+    first = values[rows, :window]
+    result[rows, :half] = first @ coefficients[:half].T
+    last_start = lengths[rows] - window
+    last = values[rows[:, None], last_start[:, None] + np.arange(window)]
+    tail = last @ coefficients[half + 1 :].T
+    result[rows[:, None], last_start[:, None] + half + 1 + np.arange(half)] = tail
+
+    # Clear values computed from padding
+    result[np.arange(values.shape[1]) >= lengths[:, None]] = np.nan
+    result[lengths < window] = np.nan
+    return result
+
+
+def add_channels(frames, *, window=31, polyorder=3, smooth=True, slope=True, min_velocity=1e-3):
+    """Add derived channels to experiments.
+
+    Adds the velocity ``v`` (time derivative of the displacement, in mm/s) and, optionally,
+    the smoothed force ``F_s`` and the force-gap slope ``dF/dh`` (in N/mm). The velocity is
+    only added to experiments with a displacement channel, the slope only to experiments
+    with a gap channel.
+
+    Parameters
+    ----------
+    frames : list[pd.DataFrame]
+        Experimental data.
+    window : int, optional
+        Odd number of samples of the Savitzky-Golay filter. Defaults to 31.
+    polyorder : int, optional
+        Order of the fitted polynomials. Defaults to 3.
+    smooth : bool, optional
+        Whether to add the smoothed force. Defaults to True.
+    slope : bool, optional
+        Whether to add the force-gap slope. Defaults to True.
+    min_velocity : float, optional
+        Gap velocity in mm/s below which the slope is undefined (NaN), e.g., while the
+        press holds its position. Defaults to 1e-3.
+
+    Returns
+    -------
+    list[pd.DataFrame]
+        Copies of the experiments with the derived channels.
+    """
+    if not frames:
+        return []
+    # Assumes uniform sampling; the sample spacing of each experiment is its median
+    dt = np.array(
+        [np.median(np.diff(df[TIME].to_numpy())) if len(df) > 1 else np.nan for df in frames]
+    )
+    force, lengths = pad_ragged([df[FORCE].to_numpy() for df in frames])
+    channels = {}
+    has_displacement = np.array([DISPLACEMENT in df.columns for df in frames])
+    if has_displacement.any():
+        displacement, _ = pad_ragged([_column(df, DISPLACEMENT) for df in frames])
+        velocity = savgol_filter(displacement, lengths, window, polyorder, 1) / dt[:, None]
+        channels[VELOCITY] = velocity
+
+    if smooth:
+        channels[FORCE_SMOOTH] = savgol_filter(force, lengths, window, polyorder)
+    has_gap = np.array([GAP in df.columns for df in frames])
+    if slope and has_gap.any():
+        gap, _ = pad_ragged([_column(df, GAP) for df in frames])
+        dforce = savgol_filter(force, lengths, window, polyorder, 1)
+        dgap = savgol_filter(gap, lengths, window, polyorder, 1)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            channels[FORCE_SLOPE] = np.where(
+                np.abs(dgap) / dt[:, None] >= min_velocity, dforce / dgap, np.nan
+            )
+
+    result = []
+    for i, df in enumerate(frames):
+        n = len(df)
+        new = {
+            name: values[i, :n]
+            for name, values in channels.items()
+            if (name != VELOCITY or has_displacement[i]) and (name != FORCE_SLOPE or has_gap[i])
+        }
+        result.append(df.assign(**new))
+    return result
+
+
+def _column(df, name):
+    """Return a column of an experiment, or NaN if the experiment has no such column."""
+    return df[name].to_numpy() if name in df.columns else np.full(len(df), np.nan)
@@ -0,0 +1,79 @@
+"""Shape-preserving decimation of experiment curves."""
+
+import numpy as np
+
+from smc_benchmark._naming import FORCE, TIME
+
+
+def lttb_indices(x, y, n_out):
+    """Select points of a curve with the largest-triangle-three-buckets algorithm.
+
+    The first and last points are always kept. The interior points are split into
+    ``n_out - 2`` buckets, and from each bucket the point spanning the largest triangle
+    with the previously selected point and the mean of the next bucket is selected.
+
+    Parameters
+    ----------
+    x, y : array_like
+        Coordinates of the curve.
+    n_out : int
+        Number of points to select, at least 3.
+
+    Returns
+    -------
+    np.ndarray
+        Sorted indices of the selected points. All indices if ``n_out >= len(x)``.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    n = len(x)
+    if n_out < 3:
+        raise ValueError(f"At least 3 points must be selected, got {n_out}")
+    if n_out >= n:
+        return np.arange(n)
+
+    # Bucket i comprises the points edges[i]:edges[i + 1]
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.intp)
+    counts = np.diff(edges)
+    mean_x = np.add.reduceat(x[: n - 1], edges[:-1]) / counts
+    mean_y = np.add.reduceat(y[: n - 1], edges[:-1]) / counts
+    # The last bucket is followed by the last point
+    next_x = np.append(mean_x[1:], x[-1])
+    next_y = np.append(mean_y[1:], y[-1])
+
+    indices = np.empty(n_out, dtype=np.intp)
+    indices[0], indices[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        start, stop = edges[i], edges[i + 1]
+        area = np.abs(
+            (x[a] - next_x[i]) * (y[start:stop] - y[a])
+            - (x[a] - x[start:stop]) * (next_y[i] - y[a])
+        )
+        a = start + np.argmax(area)
+        indices[i + 1] = a
+    return indices
+
+
+def decimate(df, n_points, *, x=TIME, y=FORCE):
+    """Decimate an experiment to a number of points, preserving the curve's shape.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        Experimental data.
+    n_points : int
+        Number of points to keep.
+    x : str, optional
+        Column used as abscissa. Defaults to the time, which, unlike the gap, is
+        strictly monotonic, so force peaks at a constant gap are kept.
+    y : str, optional
+        Column used as ordinate. Defaults to the force.
+
+    Returns
+    -------
+    pd.DataFrame
+        Rows of ``df`` selected by :func:`lttb_indices`, with all columns.
+    """
+    indices = lttb_indices(df[x].to_numpy(), df[y].to_numpy(), n_points)
+    return df.iloc[indices].reset_index(drop=True)
@@ -6,58 +6,55 @@ import matplotlib.pyplot as plt
 import numpy as np
 import pandas as pd
 
+from smc_benchmark.testplan import read_testplan
+
 ###############################################################################
 # Define path to Excel file
 ###############################################################################
 excel_file_path = pl.Path(r"path/to/file")
 
 ###############################################################################
-# Load data from Excel sheets
+# Load data from the test plan
 ###############################################################################
 materials_to_plot = ["CF5050K", "CF5012K", "CF503K", "CF6012K", "CF4012K"]
 material_data = {mat: [] for mat in materials_to_plot}
 
-# Load data from Excel sheets
-sheets = ["Day 1", "Day 2", "Day 3", "Day 4", "Day 5"]
-data_dict = {}
-
-# Loop through each sheet
-for sheet in sheets:
-    df = pd.read_excel(excel_file_path, sheet_name=sheet, skiprows=18)  # Start from row 20
-    df = df.dropna(subset=[df.columns[1]], how="all")  # Stop when empty row
-
-    for _index, row in df.iterrows():
-        material = row.iloc[1]
-        weight = float(row.iloc[10]) if not pd.isna(row.iloc[10]) else np.nan
-        Thickness = float(row.iloc[11]) / 1000 if not pd.isna(row.iloc[11]) else np.nan
-        side_lengths = float(row.iloc[4]) / 1000 if not pd.isna(row.iloc[4]) else np.nan
-
-        if not pd.isna(side_lengths) and isinstance(side_lengths, (int, float)):
-            area = side_lengths**2
-        else:
-            area = np.nan
-
-        density = row.iloc[12] if not pd.isna(row.iloc[12]) else np.nan
-
-        if not pd.isna(weight) and not pd.isna(area) and area > 0:
-            surface_weight = weight / area / 6
-        else:
-            surface_weight = np.nan
-
-        # Split material name at the hyphen and take the first part
-        material_name = material.split("-")[0]
-
-        # Check if the material name is in the materials_to_plot list
-        if material_name in materials_to_plot:
-            material_data[material_name].append(
-                {
-                    "Specimen Weight": weight,
-                    "Specimen Thickness": Thickness,
-                    "Area": area,
-                    "Density": density,
-                    "Surface Weight": surface_weight,
-                }
-            )
+# Load all sheets of the test plan at once (cached, see smc_benchmark.testplan)
+testplan = read_testplan(excel_file_path)
+
+# Loop through all specimens
+for specimen in testplan.itertuples(index=False):
+    material = specimen.file_name
+    weight = specimen.weight
+    Thickness = specimen.measured_thickness / 1000
+    side_lengths = specimen.size / 1000
+
+    if not pd.isna(side_lengths):
+        area = side_lengths**2
+    else:
+        area = np.nan
+
+    density = specimen.density
+
+    if not pd.isna(weight) and not pd.isna(area) and area > 0:
+        surface_weight = weight / area / 6
+    else:
+        surface_weight = np.nan
+
+    # Split material name at the hyphen and take the first part
+    material_name = material.split("-")[0]
+
+    # Check if the material name is in the materials_to_plot list
+    if material_name in materials_to_plot:
+        material_data[material_name].append(
+            {
+                "Specimen Weight": weight,
+                "Specimen Thickness": Thickness,
+                "Area": area,
+                "Density": density,
+                "Surface Weight": surface_weight,
+            }
+        )
 # Convert to DataFrame
 for material, data in material_data.items():
     material_data[material] = pd.DataFrame(data)
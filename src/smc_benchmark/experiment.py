@@ -0,0 +1,167 @@
+"""Lazy handles of squeeze experiments."""
+
+from collections import OrderedDict
+from functools import cached_property, partial
+
+import pandas as pd
+
+
+class ExperimentStore:
+    """Least-recently-used store of loaded experiment data.
+
+    Parameters
+    ----------
+    maxsize : int | None, optional
+        Maximum number of experiments kept in memory. If exceeded, the least recently
+        used experiment is evicted. None (default) keeps all loaded experiments, 0 keeps
+        none, so data is loaded again on every access.
+    """
+
+    def __init__(self, maxsize=None):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+
+    def __len__(self):
+        return len(self._data)
+
+    def get(self, key, load):
+        """Return the data stored for key, calling load() on a miss."""
+        if key in self._data:
+            self._data.move_to_end(key)
+            return self._data[key]
+        data = load()
+        if self.maxsize is None or self.maxsize > 0:
+            self._data[key] = data
+            if self.maxsize is not None and len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+        return data
+
+    def clear(self):
+        """Evict all experiments."""
+        self._data.clear()
+
+
+class Experiment:
+    """Handle of a single squeeze experiment whose data is loaded on access.
+
+    Parameters
+    ----------
+    institution : str
+        Abbreviation of the institution, e.g., 'kit' or 'ut'.
+    material : str
+        Name of the material.
+    number : int
+        Specimen number.
+    config : str
+        Test configuration, e.g., '3mm 100x100'.
+    file : pathlib.Path
+        Path to the data file.
+    loader : callable
+        Function that reads the data file and returns a pd.DataFrame.
+    raw_loader : callable, optional
+        Function that reads the data file in full resolution. Defaults to ``loader``.
+    header_loader : callable, optional
+        Function that reads only the header of the data file.
+    store : ExperimentStore, optional
+        Store holding the loaded data. Defaults to a private store without eviction.
+    """
+
+    def __init__(
+        self,
+        *,
+        institution,
+        material,
+        number,
+        config,
+        file,
+        loader,
+        raw_loader=None,
+        header_loader=None,
+        store=None,
+    ):
+        self.institution = institution
+        self.material = material
+        self.number = number
+        self.config = config
+        self.file = file
+        self._loader = loader
+        self._raw_loader = loader if raw_loader is None else raw_loader
+        self._header_loader = header_loader
+        self._store = ExperimentStore() if store is None else store
+
+    @classmethod
+    def from_data(cls, data):
+        """Wrap the in-memory data of an experiment, e.g., from ``read()``, in a handle.
+
+        The institution, material, number, config and file are taken from ``data.attrs``,
+        as set by :func:`~smc_benchmark.read.read`, and are None if missing.
+        """
+        attrs = data.attrs
+        return cls(
+            institution=attrs.get("institution"),
+            material=attrs.get("material"),
+            number=attrs.get("number"),
+            config=attrs.get("config"),
+            file=attrs.get("file"),
+            loader=partial(_loaded, data),
+        )
+
+    def __repr__(self):
+        return (
+            f"Experiment(institution={self.institution!r}, material={self.material!r}, "
+            f"number={self.number!r}, config={self.config!r})"
+        )
+
+    def __getitem__(self, key):
+        return self.data[key]
+
+    @cached_property
+    def header(self):
+        """Header: Metadata from the header of the data file, read without the data."""
+        if self._header_loader is None:
+            return self.data.attrs.get("header")
+        return self._header_loader(self.file)
+
+    @property
+    def data(self):
+        """pd.DataFrame: Experimental data, loaded on first access."""
+        return self._store.get(self.file, lambda: self._loader(self.file))
+
+    @property
+    def raw(self):
+        """pd.DataFrame: Full-resolution experimental data, read on every access."""
+        return self._raw_loader(self.file)
+
+
+def iter_experiments(data):
+    """Iterate over the experiment handles in the (nested) output of read().
+
+    Parameters
+    ----------
+    data : Experiment | pd.DataFrame | dict | list
+        Output of ``read()``, a dictionary of such outputs, e.g., by institution, or a
+        list of experiment handles. DataFrames, e.g., of ``read()`` without ``lazy``, are
+        wrapped in handles with :meth:`Experiment.from_data`.
+
+    Yields
+    ------
+    Experiment
+        Experiment handles in the order of ``data``.
+    """
+    if isinstance(data, Experiment):
+        yield data
+    elif isinstance(data, pd.DataFrame):
+        yield Experiment.from_data(data)
+    elif isinstance(data, dict):
+        for value in data.values():
+            yield from iter_experiments(value)
+    elif isinstance(data, (list, tuple)):
+        for value in data:
+            yield from iter_experiments(value)
+    else:
+        raise TypeError(f"Expected experiments, got {type(data).__name__}")
+
+
+def _loaded(data, file):
+    """Loader of an experiment whose data is already in memory."""
+    return data
@@ -0,0 +1,110 @@
+"""Characteristic values of squeeze experiments, computed for all experiments at once."""
+
+import re
+
+import numpy as np
+import pandas as pd
+
+from smc_benchmark._naming import FORCE, GAP, TIME
+from smc_benchmark._utils import pad_ragged
+from smc_benchmark.experiment import iter_experiments
+
+# Index of the feature table
+INDEX = ["institution", "material", "config", "specimen"]
+
+# Default force thresholds in N, at which the gap is evaluated
+FORCE_THRESHOLDS = (100.0, 1000.0, 10000.0)
+
+
+def extract_features(data, *, force_thresholds=FORCE_THRESHOLDS, target_gap=None, tol=0.01):
+    """Compute characteristic values of all squeeze experiments.
+
+    The channels of all experiments are padded into 2D arrays, so each value is computed
+    for all experiments in one vectorized operation.
+
+    Parameters
+    ----------
+    data : dict | list
+        Experiment handles, e.g., the output of ``read(..., lazy=True)`` or a dictionary
+        of such outputs by institution, see
+        :func:`~smc_benchmark.experiment.iter_experiments`.
+    force_thresholds : sequence of float, optional
+        Forces in N at which the gap is evaluated.
+    target_gap : float | None, optional
+        Target gap in mm. None (default) uses the nominal thickness of each experiment's
+        configuration, e.g., 3 mm for '3mm 100x100'.
+    tol : float, optional
+        Tolerance in mm within which the target gap counts as reached. Defaults to 0.01.
+
+    Returns
+    -------
+    pd.DataFrame
+        One row per experiment, indexed by institution, material, config and specimen,
+        with the columns
+
+        - ``peak_force``: maximum force in N,
+        - ``gap_at_<F>N``: gap in mm when the force first reaches F,
+        - ``final_gap``: last gap in mm,
+        - ``work``: compression work -∫F dh in J,
+        - ``time_to_target``: time in s until the gap first reaches the target gap.
+
+        Values that cannot be determined, e.g., gaps of experiments without a gap
+        channel, are NaN.
+    """
+    experiments = list(iter_experiments(data))
+    index = pd.MultiIndex.from_tuples(
+        [(e.institution, e.material, e.config, e.number) for e in experiments], names=INDEX
+    )
+    if not experiments:
+        return pd.DataFrame(index=index)
+
+    frames = [e.data for e in experiments]
+    t, lengths = pad_ragged([df[TIME].to_numpy() for df in frames])
+    force, _ = pad_ragged([df[FORCE].to_numpy() for df in frames])
+    gap, _ = pad_ragged(
+        [df[GAP].to_numpy() if GAP in df.columns else np.full(len(df), np.nan) for df in frames]
+    )
+    rows = np.arange(len(frames))
+    columns = [
+        "peak_force",
+        *(f"gap_at_{threshold:g}N" for threshold in force_thresholds),
+        "final_gap",
+        "work",
+        "time_to_target",
+    ]
+    if force.shape[1] == 0:
+        # All experiments are empty, so there is nothing to reduce
+        return pd.DataFrame(np.nan, index=index, columns=columns)
+
+    features = {"peak_force": np.fmax.reduce(force, axis=1)}
+    for threshold in force_thresholds:
+        features[f"gap_at_{threshold:g}N"] = _first(force >= threshold, gap)
+    features["final_gap"] = np.where(lengths > 0, gap[rows, np.maximum(lengths - 1, 0)], np.nan)
+    # Trapezoidal rule; padding yields NaN increments, which are ignored. N mm to J.
+    increments = 0.5 * (force[:, 1:] + force[:, :-1]) * (gap[:, :-1] - gap[:, 1:])
+    work = np.nansum(increments, axis=1) / 1000
+    features["work"] = np.where(np.isnan(increments).all(axis=1), np.nan, work)
+
+    if target_gap is None:
+        targets = np.array([_nominal_gap(e.config) for e in experiments])
+    else:
+        targets = np.full(len(experiments), target_gap, dtype=np.float64)
+    features["time_to_target"] = _first(gap <= targets[:, None] + tol, t) - t[:, 0]
+
+    return pd.DataFrame(features, index=index, columns=columns)
+
+
+def _first(condition, values):
+    """Return the values at the first column where the condition holds, row-wise.
+
+    Rows in which the condition never holds yield NaN.
+    """
+    first = np.argmax(condition, axis=1)
+    found = condition[np.arange(len(condition)), first]
+    return np.where(found, values[np.arange(len(values)), first], np.nan)
+
+
+def _nominal_gap(config):
+    """Return the nominal thickness in mm of a configuration, e.g., 3.0 for '3mm 100x100'."""
+    match = re.match(r"([\d.]+)mm", config)
+    return float(match.group(1)) if match else np.nan
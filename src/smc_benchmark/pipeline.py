@@ -0,0 +1,382 @@
+"""Resumable image workflow: preprocess, sort, and segment each scan as soon as possible.
+
+The stages of the workflow are chained per image instead of per folder: as soon as a scan
+is preprocessed, it is sorted into the folder of its specimen and queued for
+segmentation, while later scans are still being preprocessed. Each completed stage is
+appended to a journal in the output folder, so an interrupted run resumes where it
+stopped, and only stages whose input or parameters changed are run again.
+"""
+
+import json
+import logging
+import os
+import pathlib as pl
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from contextlib import ExitStack, contextmanager
+from dataclasses import asdict
+from functools import partial
+
+from smc_benchmark.cache import fingerprint
+from smc_benchmark.preprocess import convert_image, list_images
+from smc_benchmark.segment import FastSettings, create_pool, segment_image
+from smc_benchmark.sort import FIRST_ROW, LAST_ROW, place_image, specimen_folder
+from smc_benchmark.testplan import read_testplan
+
+logger = logging.getLogger(__name__)
+
+# Stages of the workflow, in order
+PREPROCESS = "preprocess"
+SORT = "sort"
+SEGMENT = "segment"
+STAGES = (PREPROCESS, SORT, SEGMENT)
+
+# Subfolders of the output folder holding the results of each stage
+STAGE_FOLDERS = {PREPROCESS: "preprocessed", SORT: "sorted", SEGMENT: "segmented"}
+
+# Name of the journal of completed stages in the output folder
+JOURNAL_NAME = "pipeline_journal.jsonl"
+
+# Name of the log of the segmentation results in the output folder
+SEGMENT_LOG_NAME = "segment.log"
+
+# Logger writing the segmentation results to the segmentation log only
+_segment_log = logger.getChild("segment_log")
+_segment_log.propagate = False
+_segment_log.setLevel(logging.INFO)
+
+
+def run_pipeline(
+    *,
+    excel,
+    indir,
+    outdir,
+    institution,
+    target_dpi=150,
+    method="lanczos",
+    band_height=None,
+    mode="copy",
+    segment=True,
+    fast=None,
+    backend="sam",
+    workers=None,
+    segment_workers=1,
+    threads_per_worker=None,
+    max_in_flight=None,
+):
+    """Preprocess, sort and segment all scans of an input folder.
+
+    The results of the stages are written to the subfolders 'preprocessed', 'sorted' and
+    'segmented' of the output folder. Scans are named '<institution>-<file name>' after
+    the file names of the test plan, e.g., 'kit-CF503K-1.bmp'.
+
+    Parameters
+    ----------
+    excel : str | pathlib.Path
+        Path to the Excel file containing the test plan of the institution.
+    indir : str | pathlib.Path
+        Folder containing the scans.
+    outdir : str | pathlib.Path
+        Output folder, created if it does not exist.
+    institution : str
+        Abbreviation of the institution, e.g., 'kit'.
+    target_dpi, method, band_height
+        See :func:`smc_benchmark.preprocess.convert_images`.
+    mode : str, optional
+        Placement mode of the sorted images, see :func:`smc_benchmark.sort.sort_image_dir`.
+    segment : bool, optional
+        Whether to segment the sorted images. Defaults to True.
+    fast : smc_benchmark.segment.FastSettings | bool | None, optional
+        Settings of the fast segmentation mode, True for the default settings. None
+        (default) segments at full resolution.
+    backend : str, optional
+        Segmentation backend, see :func:`smc_benchmark.segment.find_mask`. Defaults to SAM.
+    workers : int | None, optional
+        Number of processes preprocessing the scans, -1 for all CPUs. Defaults to one.
+    segment_workers : int, optional
+        Number of processes segmenting the images, which share one model. Defaults to one.
+    threads_per_worker : int | None, optional
+        Number of torch threads of each segmentation process, see
+        :func:`smc_benchmark.segment.create_pool`.
+    max_in_flight : int | None, optional
+        Maximum number of scans being preprocessed at a time. Defaults to twice the number
+        of workers.
+
+    Returns
+    -------
+    dict[str, str]
+        Error messages of the scans for which a stage failed, by scan path.
+    """
+    indir = pl.Path(indir)
+    outdir = pl.Path(outdir)
+    outdir.mkdir(parents=True, exist_ok=True)
+    if workers == -1:
+        workers = os.cpu_count()
+    workers = max(workers or 1, 1)
+    max_in_flight = max_in_flight or 2 * workers
+
+    # Stage parameters include those of the previous stages, whose results they depend on
+    stages = STAGES if segment else STAGES[:-1]
+    preprocess_options = {"target_dpi": target_dpi, "method": method, "band_height": band_height}
+    if fast is True:
+        fast = FastSettings()
+    segment_options = {"fast": asdict(fast)} if fast else {}
+    if backend != "sam":
+        segment_options["backend"] = backend
+    stage_params = {PREPROCESS: preprocess_options, SORT: {"mode": mode}, SEGMENT: segment_options}
+    params = {}
+    for stage in stages:
+        params[stage] = {**params.get(_previous(stages, stage), {}), stage: stage_params[stage]}
+
+    folders = {stage: outdir / STAGE_FOLDERS[stage] for stage in stages}
+    folders[PREPROCESS].mkdir(exist_ok=True)
+
+    # Specimen folder of each scan, by the name of the scan
+    testplan = read_testplan(excel, first_row=FIRST_ROW, last_row=LAST_ROW)
+    specimens = {
+        f"{institution}-{specimen.file_name}": specimen_folder(specimen, institution)
+        for specimen in testplan.itertuples(index=False)
+    }
+
+    journal_path = outdir / JOURNAL_NAME
+    records = _load_journal(journal_path)
+    runner = _Runner(
+        stages=stages,
+        params=params,
+        folders=folders,
+        specimens=specimens,
+        records=records,
+        preprocess_options=preprocess_options,
+        mode=mode,
+        fast=fast or None,
+        backend=backend,
+    )
+
+    images = sorted(str(image) for image in list_images(indir))
+    with ExitStack() as stack:
+        runner.pools = {PREPROCESS: stack.enter_context(ProcessPoolExecutor(max_workers=workers))}
+        # The segmentation workers share one model, which is only loaded if needed
+        if backend == "classical":
+            segment_pool = partial(ProcessPoolExecutor, max_workers=max(segment_workers, 1))
+        else:
+            segment_pool = partial(
+                create_pool, max(segment_workers, 1), threads_per_worker=threads_per_worker
+            )
+        runner.pool_factories = {SEGMENT: lambda: stack.enter_context(segment_pool())}
+        runner.journal = stack.enter_context(_open_journal(journal_path))
+        stack.enter_context(_log_to(_segment_log, outdir / SEGMENT_LOG_NAME))
+        runner.run(images, max_in_flight)
+
+    if runner.errors:
+        logger.warning(f"{len(runner.errors)} scan(s) could not be processed completely.")
+    return runner.errors
+
+
+class _Runner:
+    """Schedule the stages of all scans, recording completed stages in the journal."""
+
+    def __init__(self, *, stages, params, folders, specimens, records, preprocess_options, mode,
+                 fast=None, backend="sam"):
+        self.stages = stages
+        self.params = params
+        self.folders = folders
+        self.specimens = specimens
+        self.records = records
+        self.preprocess_options = preprocess_options
+        self.mode = mode
+        self.fast = fast
+        self.backend = backend
+        self.pools = {}
+        self.pool_factories = {}
+        self.journal = None
+        self.pending = {}
+        self.errors = {}
+        self.fingerprints = {}
+
+    def run(self, images, max_in_flight):
+        """Run all stages of all images, keeping at most max_in_flight in preprocessing."""
+        try:
+            done_count = self._run(iter(images), max_in_flight)
+        except KeyboardInterrupt:
+            # Do not start queued stages, completed ones are already in the journal
+            for future in self.pending:
+                future.cancel()
+            raise
+        logger.info(f"{done_count} of {len(images)} scan(s) processed completely.")
+
+    def _run(self, queue, max_in_flight):
+        """Schedule stages as their inputs complete, returning the number of complete scans."""
+        done_count = 0
+        while True:
+            # Start images until max_in_flight are being preprocessed
+            while self._n_preprocessing() < max_in_flight:
+                image = next(queue, None)
+                if image is None:
+                    break
+                self.fingerprints[image] = list(fingerprint(image))
+                if self._advance(image, image, 0):
+                    done_count += 1
+            if not self.pending:
+                break
+
+            finished, _ = wait(self.pending, return_when=FIRST_COMPLETED)
+            for future in finished:
+                image, stage = self.pending.pop(future)
+                error = future.exception()
+                if error is not None:
+                    self._fail(image, stage, error)
+                    continue
+                output = future.result()
+                self._record(image, stage, output)
+                if self._advance(image, output, self.stages.index(stage) + 1):
+                    done_count += 1
+        return done_count
+
+    def _n_preprocessing(self):
+        """Return the number of scans being preprocessed."""
+        return sum(stage == PREPROCESS for _, stage in self.pending.values())
+
+    def _advance(self, image, source, start):
+        """Run the stages of an image from start on, until one is submitted to a pool.
+
+        Returns True if all stages of the image are complete.
+        """
+        for stage in self.stages[start:]:
+            record = self.records.get((stage, image))
+            if self._is_complete(record, image, stage):
+                source = record["output"]
+                continue
+
+            if stage == PREPROCESS:
+                future = self.pools[PREPROCESS].submit(
+                    convert_image, image, output_folder=str(self.folders[PREPROCESS]),
+                    **self.preprocess_options,
+                )
+            elif stage == SORT:
+                # Sorting only costs metadata, so it is done right away
+                try:
+                    source = self._sort(image, source)
+                except Exception as e:  # errors are collected per scan
+                    self._fail(image, stage, e)
+                    return False
+                self._record(image, stage, source)
+                continue
+            else:
+                destination = self.folders[SEGMENT] / pl.Path(source).relative_to(
+                    self.folders[SORT]
+                )
+                future = self._pool(SEGMENT).submit(
+                    _segment, source, str(destination), fast=self.fast, backend=self.backend
+                )
+            self.pending[future] = (image, stage)
+            return False
+        return True
+
+    def _pool(self, stage):
+        """Return the pool of a stage, creating it on first use."""
+        if stage not in self.pools:
+            self.pools[stage] = self.pool_factories[stage]()
+        return self.pools[stage]
+
+    def _sort(self, image, source):
+        """Place a preprocessed image in the folder of its specimen."""
+        name = pl.Path(image).stem
+        if name not in self.specimens:
+            raise KeyError(f"{name} is not in the test plan")
+        folder = self.folders[SORT] / self.specimens[name]
+        folder.mkdir(parents=True, exist_ok=True)
+        destination = folder / pl.Path(source).name
+        place_image(source, str(destination), self.mode)
+        return str(destination)
+
+    def _is_complete(self, record, image, stage):
+        """Check whether a journal record is up to date with a scan and the parameters."""
+        return (
+            record is not None
+            and record.get("fingerprint") == self.fingerprints[image]
+            and record.get("params") == self.params[stage]
+            and pl.Path(record.get("output", "")).exists()
+        )
+
+    def _record(self, image, stage, output):
+        """Append a completed stage to the journal."""
+        record = {
+            "stage": stage,
+            "image": image,
+            "fingerprint": self.fingerprints[image],
+            "params": self.params[stage],
+            "output": str(output),
+        }
+        self.records[(stage, image)] = record
+        self.journal.write(json.dumps(record) + "\n")
+        self.journal.flush()
+        logger.info(f"{stage}: {image} -> {output}")
+        if stage == SEGMENT:
+            _segment_log.info(f"{image} -> {output}")
+
+    def _fail(self, image, stage, error):
+        """Record the failure of a stage of a scan."""
+        logger.error(f"{stage} of {image} failed: {error}")
+        if stage == SEGMENT:
+            _segment_log.error(f"Error processing {image}: {error}")
+        self.errors[image] = f"{stage}: {error}"
+
+
+@contextmanager
+def _log_to(log, path):
+    """Write the messages of a logger to a file, which is created on the first message."""
+    handler = logging.FileHandler(path, delay=True, encoding="utf-8")
+    handler.setFormatter(logging.Formatter("%(asctime)s - %(levelname)s - %(message)s"))
+    log.addHandler(handler)
+    try:
+        yield handler
+    finally:
+        log.removeHandler(handler)
+        handler.close()
+
+
+def _previous(stages, stage):
+    """Return the stage before a stage, or None."""
+    index = stages.index(stage)
+    return stages[index - 1] if index > 0 else None
+
+
+def _load_journal(path):
+    """Load the latest record of each stage and scan from a journal."""
+    records = {}
+    try:
+        with pl.Path(path).open(encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                    records[(record["stage"], record["image"])] = record
+                except (ValueError, KeyError, TypeError):
+                    # Line cut off by an interruption
+                    continue
+    except FileNotFoundError:
+        pass
+    return records
+
+
+def _open_journal(path):
+    """Open a journal for appending records, completing a line cut off by an interruption."""
+    path = pl.Path(path)
+    complete = True
+    if path.exists() and path.stat().st_size > 0:
+        with path.open("rb") as f:
+            f.seek(-1, os.SEEK_END)
+            complete = f.read(1) == b"\n"
+    journal = path.open("a", encoding="utf-8")
+    if not complete:
+        journal.write("\n")
+    return journal
+
+
+def _segment(source, destination, fast=None, backend="sam"):
+    """Segment a sorted image with the model shared by the pool, see segment.create_pool."""
+    destination = pl.Path(destination)
+    destination.parent.mkdir(parents=True, exist_ok=True)
+    # Remove an earlier cutout, so a failed segmentation leaves no stale output
+    destination.unlink(missing_ok=True)
+    return segment_image(
+        in_filepath=source, out_filepath=str(destination), fast=fast, backend=backend
+    )
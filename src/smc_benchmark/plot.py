@@ -1,11 +1,31 @@
 """Plot all squeeze experiments of an institution."""
-import os
 import pathlib as pl
-import matplotlib.pyplot as plt
+
+from matplotlib.figure import Figure
+
+from smc_benchmark._naming import FORCE, GAP
+from smc_benchmark._utils import parallel_map
+from smc_benchmark.decimate import decimate
+from smc_benchmark.experiment import Experiment
 from smc_benchmark.read import read
+from smc_benchmark.watch import watch
+
+# Size of the figures in inches
+FIGSIZE = (6.4, 4.8)
+
+# Points per pixel of figure width to which curves are decimated before drawing
+POINTS_PER_PIXEL = 2
 
 
-def plot_gap_force(*, institution, indir, outdir=None, dpi=300):
+def plot_gap_force(*, institution, indir, outdir=None, dpi=300, workers=None, overwrite=False):
+    """Plot force over gap, one figure per material and configuration.
+
+    Figures which are newer than all of their data files are skipped, unless
+    ``overwrite`` is True. The figures are rendered by ``workers`` processes, see
+    :func:`smc_benchmark.read.read`.
+
+    Returns the paths of the rendered figures.
+    """
 
     # Folder with experimental data
     indir = pl.Path(indir)
@@ -16,18 +36,67 @@ def plot_gap_force(*, institution, indir, outdir=None, dpi=300):
     else:
         outdir = pl.Path(outdir)
 
-    # Read experimental data
-    data = read(institution, indir)
+    # Read experimental data on access, keeping only the experiment being plotted in memory
+    data = read(institution, indir, lazy=True, max_loaded=1)
 
-    # Plot all configurations
+    # Plot all configurations which changed since they were last plotted
+    tasks = []
     for material, configs in data.items():
         for config, experiments in configs.items():
-            fig, ax = plt.subplots(1, 1)
-            for experiment in experiments:
-                ax.plot(experiment["h"], experiment["F"])
-            ax.set_xlabel("Gap in mm")
-            ax.set_ylabel("Force in N")
-            ax.set_title(f"{material} {config}")
             fig_path = outdir / f"{material}_{config}.png"
-            plt.savefig(fig_path, dpi=dpi)
-            plt.close()
+            if overwrite or not _is_up_to_date(fig_path, [e.file for e in experiments]):
+                tasks.append((material, config, experiments, fig_path, dpi))
+    parallel_map(_render, tasks, workers)
+    return [task[3] for task in tasks]
+
+
+def watch_gap_force(*, institution, indir, outdir=None, dpi=300, interval=10.0, max_updates=None):
+    """Plot squeeze experiments whenever they are added to or changed in a folder.
+
+    Only the configurations with new or changed experiments are plotted again.
+    See :func:`smc_benchmark.watch.watch` for ``interval`` and ``max_updates``.
+    """
+
+    # Folder with experimental data
+    indir = pl.Path(indir)
+
+    # Set outdir for plots
+    if outdir is None:
+        outdir = indir
+    else:
+        outdir = pl.Path(outdir)
+
+    def replot(data, groups):
+        for material, config in sorted(groups):
+            experiments = data.get(material, {}).get(config, [])
+            fig_path = outdir / f"{material}_{config}.png"
+            _render((material, config, experiments, fig_path, dpi))
+
+    return watch(institution, indir, replot, interval=interval, max_updates=max_updates)
+
+
+def _render(task):
+    """Plot all experiments of a material and configuration."""
+    material, config, experiments, fig_path, dpi = task
+
+    # Object-oriented API without pyplot: no global state, no interactive backend
+    fig = Figure(figsize=FIGSIZE)
+    ax = fig.subplots(1, 1)
+    n_points = int(FIGSIZE[0] * dpi * POINTS_PER_PIXEL)
+    for experiment in experiments:
+        data = experiment.data if isinstance(experiment, Experiment) else experiment
+        data = decimate(data, n_points) if len(data) > n_points else data
+        ax.plot(data[GAP], data[FORCE])
+    ax.set_xlabel("Gap in mm")
+    ax.set_ylabel("Force in N")
+    ax.set_title(f"{material} {config}")
+    fig.savefig(fig_path, dpi=dpi)
+
+
+def _is_up_to_date(fig_path, files):
+    """Check whether a figure is newer than all files it was plotted from."""
+    try:
+        mtime = pl.Path(fig_path).stat().st_mtime_ns
+    except FileNotFoundError:
+        return False
+    return all(pl.Path(file).stat().st_mtime_ns < mtime for file in files)
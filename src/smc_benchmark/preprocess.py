@@ -5,102 +5,399 @@
 """
 
 # standard library imports
-import gc
 import glob
+import json
+import logging
 import os
+import pathlib as pl
 import shutil
-import time
+import tempfile
+import warnings
+from functools import partial
 
 # local application imports
-# none
+from smc_benchmark._utils import bounded_map
+from smc_benchmark.cache import fingerprint
+from smc_benchmark.tiled import convert_tiled
 
 # third party library imports
 import cv2
+import numpy as np
 from PIL import Image
 
+logger = logging.getLogger(__name__)
+
+# Methods to downscale images:
+# - 'lanczos': full decode and LANCZOS resampling (highest quality, slowest)
+# - 'fast': reduced-resolution decode where the format supports it (JPEG), integer-factor
+#   box reduction, and a light BILINEAR resampling to the exact size
+# - 'area': OpenCV's pixel area relation (cv2.INTER_AREA)
+DOWNSCALE_METHODS = ('lanczos', 'fast', 'area')
+
+# Name of the manifest in the output folder, which records the processed images
+MANIFEST_NAME = 'preprocess_manifest.json'
+
+# Bump whenever the output of the preprocessing changes, so that all images are processed again
+MANIFEST_VERSION = 1
+
 
 def create_folder(folder_path):
     """
     Create a folder if it doesn't exist
     """
     os.makedirs(str(folder_path), exist_ok=True)
-    print(f"Created folder: {folder_path}")
+    logger.info(f"Created folder: {folder_path}")
+
+
+def _target_size(img, image_path, target_dpi):
+    """
+    Return the size of an image at the target DPI.
+    """
+    # Get current DPI (if available, default to 600 DPI)
+    current_dpi = img.info.get('dpi', None)
+    if current_dpi is None or current_dpi[0] == 0:
+        logger.warning(f"Invalid or no DPI metadata found for {image_path}. Defaulting to 600 DPI.")
+        current_dpi = (600, 600)  # Default to 600 DPI if no DPI info is found, or it's zero
+
+    # Calculate the scaling factor based on the DPI change (halving DPI from 600 to 300)
+    scale_factor = target_dpi / current_dpi[0]  # Use current_dpi[0] (horizontal DPI)
+
+    # Calculate the new dimensions from the current image dimensions
+    width, height = img.size
+    return int(width * scale_factor), int(height * scale_factor)
+
+
+def downscale(img, size, method='lanczos'):
+    """
+    Downscale an image to the given size.
+
+    Parameters:
+    -----------
+    img : PIL.Image.Image
+        The image. For the 'fast' method, the image should not be loaded yet, so that
+        JPEG images can be decoded at reduced resolution.
+
+    size : tuple[int, int]
+        The new width and height.
+
+    method : str, optional, default='lanczos'
+        One of DOWNSCALE_METHODS.
+
+    Returns:
+    --------
+    PIL.Image.Image
+        The downscaled image.
+    """
+    if method == 'lanczos':
+        return img.resize(size, Image.Resampling.LANCZOS)
+
+    if method == 'fast':
+        # Let the decoder reduce the resolution by up to 8 (JPEG only, no-op otherwise),
+        # keeping the image at least as large as the requested size
+        img.draft(None, size)
+
+        # Average blocks of pixels by the largest integer factor
+        factor = min(img.width // size[0], img.height // size[1])
+        if factor > 1:
+            img = img.reduce(factor)
+        return img.resize(size, Image.Resampling.BILINEAR)
+
+    if method == 'area':
+        if img.mode not in ('L', 'RGB', 'RGBA'):
+            img = img.convert('RGB')
+        pixels = cv2.resize(np.asarray(img), size, interpolation=cv2.INTER_AREA)
+        return Image.fromarray(pixels)
+
+    raise ValueError(f"Unknown downscale method {method!r}, expected one of {DOWNSCALE_METHODS}")
 
 
-# Function to convert DPI and reduce image resolution in batches
+def _resize_image(image_path, *, output_folder, target_dpi, method='lanczos'):
+    """
+    Resize a single image to the target DPI and save it to the output folder.
+    Returns the path of the output image.
+    """
+    # Open the image; the context manager releases the decoded image afterwards
+    with Image.open(image_path) as img:
+        # Resize the image to the new dimensions with the selected downscale method
+        new_size = _target_size(img, image_path, target_dpi)
+        img_resized = downscale(img, new_size, method)
+
+    # Construct the output file path
+    filename = os.path.basename(image_path)
+    output_image_path = os.path.join(output_folder, filename)
+
+    # Save the image with the new DPI and resized dimensions
+    img_resized.save(output_image_path, dpi=(target_dpi, target_dpi))
+    return output_image_path
+
+
+def convert_image(image_path, *, output_folder, target_dpi, method='lanczos', band_height=None):
+    """
+    Convert a single image to 8-bit grayscale at the target DPI in one pass.
+    The image is decoded once, and the 8-bit BMP is written directly to the output folder.
+
+    Parameters:
+    -----------
+    image_path : str
+        The path to the image.
+
+    output_folder : str
+        The folder where the image is saved as '<name>_8bit.bmp'.
+
+    target_dpi, method, band_height
+        See convert_images.
+
+    Returns:
+    --------
+    str
+        The path of the output image.
+    """
+    # Construct the output file path as in convert_to_8bit
+    filename = os.path.splitext(os.path.basename(image_path))[0] + '_8bit.bmp'
+    output_image_path = os.path.join(output_folder, filename)
+
+    if band_height is not None:
+        convert_tiled(image_path, output_image_path, target_dpi, band_height)
+        return output_image_path
+
+    with Image.open(image_path) as img:
+        new_size = _target_size(img, image_path, target_dpi)
+
+        if method == 'fast':
+            # Decode JPEG images directly to grayscale at reduced resolution
+            img.draft('L', new_size)
+
+        # Convert to grayscale first, so only one channel has to be resampled.
+        # Uses the same luma weights as cv2.COLOR_BGR2GRAY (ITU-R 601-2).
+        img_gray = img.convert('L')
+    img_resized = downscale(img_gray, new_size, method)
+
+    # Save the 8-bit grayscale image with the new DPI and resized dimensions
+    img_resized.save(output_image_path, dpi=(target_dpi, target_dpi))
+    return output_image_path
+
+
+def list_images(input_folder):
+    """
+    List all image files (BMP, JPEG and PNG) in a folder.
+    """
+    return glob.glob(os.path.join(input_folder, "*.bmp")) + \
+        glob.glob(os.path.join(input_folder, "*.jpg")) + \
+        glob.glob(os.path.join(input_folder, "*.jpeg")) + \
+        glob.glob(os.path.join(input_folder, "*.png"))
+
+
+# Function to convert DPI and reduce image resolution
 def convert_dpi_and_resize(*,
                            input_folder,
                            output_folder,
                            target_dpi=150,
                            batch_size=10,
-                           wait_time=0.1):
-    # Get all image files
-    image_files = glob.glob(os.path.join(input_folder, "*.bmp")) + \
-                  glob.glob(os.path.join(input_folder, "*.jpg")) + \
-                  glob.glob(os.path.join(input_folder, "*.jpeg")) + \
-                  glob.glob(os.path.join(input_folder, "*.png"))
+                           workers=None,
+                           method='lanczos',
+                           wait_time=None):
+    """
+    Converts all images in a folder to a target DPI, reducing their resolution.
 
-    # Create the output folder
-    create_folder(output_folder)
+    Parameters:
+    -----------
+    input_folder : str | Path
+        The folder containing the images (bmp, jpg, jpeg, png).
 
-    # Process images in batches
-    for batch_start in range(0, len(image_files), batch_size):
-        batch = image_files[batch_start:batch_start+batch_size]
+    output_folder : str | Path
+        The folder where the resized images are saved with their original names.
 
-        print(f"Processing batch {batch_start // batch_size + 1} with {len(batch)} images...")
+    target_dpi : int, optional, default=150
+        The resolution of the resized images in DPI.
 
-        for image_path in batch:
-            try:
-                # Open the image
-                img = Image.open(image_path)
+    batch_size : int, optional, default=10
+        The maximum number of images being processed at a time in parallel mode,
+        which bounds the memory used by decoded images.
 
-                # Get current DPI (if available, default to 600 DPI)
-                current_dpi = img.info.get('dpi', None)
-                if current_dpi is None or current_dpi[0] == 0:
-                    print(f"Invalid or no DPI metadata found for {image_path}. Defaulting to 600 DPI.")
-                    current_dpi = (600, 600)  # Default to 600 DPI if no DPI info is found, or it's zero
-                else:
-                    print(f"Current DPI for {image_path}: {current_dpi}")
+    workers : int, optional, default=None
+        The number of worker processes; -1 uses all CPUs.
+        If None or 1, the images are processed one after another.
 
-                # Calculate the scaling factor based on the DPI change (halving DPI from 600 to 300)
-                scale_factor = target_dpi / current_dpi[0]  # Use current_dpi[0] (horizontal DPI)
+    method : str, optional, default='lanczos'
+        The downscale method, one of DOWNSCALE_METHODS (see downscale).
 
-                # Get the current image dimensions
-                width, height = img.size
+    wait_time : float, optional, default=None
+        Deprecated and ignored. The images are no longer processed in batches separated
+        by sleeps.
 
-                # Calculate the new dimensions
-                new_width = int(width * scale_factor)
-                new_height = int(height * scale_factor)
+    Returns:
+    --------
+    dict[str, str]
+        Error messages of the images which could not be converted, by image path.
+    """
+    _warn_wait_time(wait_time)
+    return _map_images(_resize_image,
+                       input_folder=input_folder,
+                       output_folder=output_folder,
+                       target_dpi=target_dpi,
+                       batch_size=batch_size,
+                       workers=workers,
+                       method=method)
 
-                # Resize the image to the new dimensions using LANCZOS (formerly ANTIALIAS)
-                img_resized = img.resize((new_width, new_height), Image.Resampling.LANCZOS)
 
-                # Construct the output file path
-                filename = os.path.basename(image_path)
-                output_image_path = os.path.join(output_folder, filename)
+def convert_images(*,
+                   input_folder,
+                   output_folder,
+                   target_dpi=150,
+                   batch_size=10,
+                   workers=None,
+                   method='lanczos',
+                   overwrite=False,
+                   band_height=None):
+    """
+    Converts all images in a folder to 8-bit grayscale at a target DPI in a single pass.
+
+    Each image is decoded once, converted to grayscale and resized in memory, and saved
+    as '<name>_8bit.bmp' in the output folder, without intermediate files.
+
+    The processed images are recorded in a manifest in the output folder (see
+    MANIFEST_NAME). Images whose size and modification time, target DPI and method match
+    the manifest, and whose output still exists, are skipped.
+
+    Parameters:
+    -----------
+    input_folder, output_folder, target_dpi, batch_size, workers, method
+        See convert_dpi_and_resize.
+
+    overwrite : bool, optional, default=False
+        If True, all images are processed regardless of the manifest. The manifest is
+        still updated, so later runs skip the overwritten outputs.
+
+    band_height : int, optional, default=None
+        If given, uncompressed BMP images are memory-mapped and processed in bands of
+        this many rows, so the memory per image is bounded by a few bands instead of the
+        full-resolution frame. The bands are resampled by pixel area averaging (like
+        method='area'), method is ignored. See tiled.convert_tiled.
+
+    Returns:
+    --------
+    dict[str, str]
+        Error messages of the images which could not be converted, by image path.
+    """
+    return _map_images(convert_image,
+                       input_folder=input_folder,
+                       output_folder=output_folder,
+                       target_dpi=target_dpi,
+                       batch_size=batch_size,
+                       workers=workers,
+                       method=method,
+                       manifest=True,
+                       overwrite=overwrite,
+                       band_height=band_height)
+
+
+def _map_images(func, *, input_folder, output_folder, target_dpi, batch_size, workers, method,
+                manifest=False, overwrite=False, **kwargs):
+    """
+    Apply a per-image function to all images in a folder, collecting errors per file.
+    With manifest, the processed images are recorded, and images recorded as processed with
+    the same parameters are skipped unless overwrite is True.
+    """
+    if method not in DOWNSCALE_METHODS:
+        raise ValueError(f"Unknown downscale method {method!r}, "
+                         f"expected one of {DOWNSCALE_METHODS}")
 
-                # Save the image with the new DPI and resized dimensions
-                img_resized.save(output_image_path, dpi=(target_dpi, target_dpi))
+    # Get all image files
+    image_files = list_images(input_folder)
 
-                print(f"Converted {image_path} -> {output_image_path} with {target_dpi} DPI.")
+    # Create the output folder
+    create_folder(output_folder)
 
-                # Explicitly delete the image objects and run garbage collection
-                del img
-                del img_resized
-                gc.collect()
+    # Skip images which are unchanged since they were last processed with the same parameters
+    params = {'version': MANIFEST_VERSION, 'step': func.__name__,
+              'target_dpi': target_dpi, 'method': method, **kwargs}
+    entries = _load_manifest(output_folder) if manifest else {}
+    fingerprints = {image_path: fingerprint(image_path) for image_path in image_files}
+    pending = [image_path for image_path in image_files
+               if overwrite or not _is_processed(entries.get(_manifest_key(image_path)),
+                                                 fingerprints[image_path], params,
+                                                 output_folder)]
+    if len(pending) < len(image_files):
+        logger.info(f"Skipping {len(image_files) - len(pending)} unchanged image(s).")
+
+    # Process images, collecting errors per file
+    errors = {}
+    task = partial(func, output_folder=str(output_folder), target_dpi=target_dpi, method=method,
+                   **kwargs)
+    outcomes = bounded_map(task, pending, workers=workers, max_in_flight=batch_size)
+    try:
+        for count, (image_path, output_image_path, error) in enumerate(outcomes, start=1):
+            key = _manifest_key(image_path)
+            if error is None:
+                logger.info(f"[{count}/{len(pending)}] Converted {image_path} -> "
+                            f"{output_image_path} with {target_dpi} DPI.")
+                entries[key] = {'size': fingerprints[image_path][0],
+                                'mtime_ns': fingerprints[image_path][1],
+                                'params': params,
+                                'output': os.path.basename(output_image_path)}
+            else:
+                logger.error(f"[{count}/{len(pending)}] Error processing {image_path}: {error}")
+                errors[image_path] = str(error)
+                entries.pop(key, None)
+    finally:
+        # Record progress even if interrupted, so a re-run continues where this one stopped
+        if manifest and pending:
+            _store_manifest(output_folder, entries)
+    return errors
+
+
+def _warn_wait_time(wait_time):
+    """
+    Warn that the wait_time argument is deprecated, if it is given.
+    """
+    if wait_time is not None:
+        warnings.warn("wait_time is deprecated and ignored, images are no longer processed "
+                      "in batches separated by sleeps.", DeprecationWarning, stacklevel=3)
 
-                # Optionally, wait for a short time after each image is processed
-                time.sleep(wait_time)  # Add a delay (in seconds)
 
-            except Exception as e:
-                print(f"Error processing {image_path}: {e}")
+def _manifest_key(image_path):
+    """
+    Return the key of an image in the manifest, i.e., its absolute path.
+    """
+    return str(pl.Path(image_path).resolve())
 
-        # After processing the batch, we can optionally clear memory again
-        gc.collect()
 
-        # Optionally, wait for a short time after each batch is processed
-        print(f"Waiting for {wait_time} seconds before processing the next batch...")
-        time.sleep(wait_time)  # Add a delay (in seconds)
+def _is_processed(entry, image_fingerprint, params, output_folder):
+    """
+    Check whether a manifest entry is up to date with an image and the parameters.
+    """
+    if entry is None:
+        return False
+    return ((entry.get('size'), entry.get('mtime_ns')) == image_fingerprint
+            and entry.get('params') == params
+            and os.path.exists(os.path.join(output_folder, entry.get('output', ''))))
+
+
+def _load_manifest(output_folder):
+    """
+    Load the manifest of an output folder, returning an empty one if it is missing or corrupt.
+    """
+    try:
+        with open(os.path.join(output_folder, MANIFEST_NAME), encoding='utf-8') as f:
+            entries = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return entries if isinstance(entries, dict) else {}
+
+
+def _store_manifest(output_folder, entries):
+    """
+    Write the manifest of an output folder atomically.
+    """
+    path = pl.Path(output_folder) / MANIFEST_NAME
+    try:
+        # Write to a temporary file first, so an interrupted write never corrupts the manifest
+        with tempfile.NamedTemporaryFile('w', dir=path.parent, suffix='.tmp', delete=False,
+                                         encoding='utf-8') as tmp:
+            json.dump(entries, tmp, indent=1)
+        pl.Path(tmp.name).replace(path)
+    except OSError as e:
+        logger.warning(f"Could not write manifest {path}: {e}")
 
 
 # Function to convert the image to 8-bit grayscale
@@ -117,46 +414,104 @@ def convert_to_8bit(input_folder, output_folder):
                 grayscale_image = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
 
                 # Define the output path for the 8-bit grayscale image in the output folder
-                grayscale_image_path = os.path.join(output_folder, os.path.splitext(filename)[0] + '_8bit.bmp')
+                grayscale_image_path = os.path.join(output_folder,
+                                                    os.path.splitext(filename)[0] + '_8bit.bmp')
 
                 # Save the 8-bit grayscale image
                 cv2.imwrite(grayscale_image_path, grayscale_image)
-                print(f"Converted {filename} to 8-bit grayscale as {os.path.basename(grayscale_image_path)}")
+                logger.info(f"Converted {filename} to 8-bit grayscale as "
+                            f"{os.path.basename(grayscale_image_path)}")
             except Exception as e:
-                print(f"Error converting {filename} to 8-bit grayscale: {e}")
+                logger.error(f"Error converting {filename} to 8-bit grayscale: {e}")
 
 
 # Function to delete the temporary folder and its contents
 def delete_temp_folder(*, folder_path):
     try:
         shutil.rmtree(folder_path)
-        print(f"Deleted temporary folder: {folder_path}")
+        logger.info(f"Deleted temporary folder: {folder_path}")
     except Exception as e:
-        print(f"Error deleting temporary folder {folder_path}: {e}")
+        logger.error(f"Error deleting temporary folder {folder_path}: {e}")
 
 
 # Main function to handle the entire process
 def process_images(*,
                    input_folder,
                    output_folder,
-                   temp_folder,
+                   temp_folder=None,
                    target_dpi=150,
                    batch_size=10,
-                   wait_time=0.1):
+                   workers=None,
+                   method='lanczos',
+                   overwrite=False,
+                   band_height=None,
+                   wait_time=None):
+    """
+    Converts all images in a folder to 8-bit grayscale BMPs at a target DPI.
 
-    # Create the output and temp folders
-    create_folder(output_folder)
-    create_folder(temp_folder)
+    Parameters:
+    -----------
+    input_folder : str | Path
+        The folder containing the images (bmp, jpg, jpeg, png).
 
-    # Step 1: Resize and adjust DPI
-    convert_dpi_and_resize(input_folder=input_folder,
-                           output_folder=temp_folder,
-                           target_dpi=target_dpi,
-                           batch_size=batch_size,
-                           wait_time=wait_time)
+    output_folder : str | Path
+        The folder where the images are saved as '<name>_8bit.bmp'.
 
-    # Step 2: Convert to 8-bit grayscale and save directly to the output folder
-    convert_to_8bit(temp_folder, output_folder)
+    temp_folder : str | Path, optional, default=None
+        If None, each image is converted in a single pass (see convert_images).
+        Otherwise, the images are first resized into this folder, then converted to
+        8-bit grayscale, and the folder is deleted afterwards.
 
-    # Step 3: Delete the temporary folder
-    delete_temp_folder(folder_path=temp_folder)
+    target_dpi, batch_size, workers, method
+        See convert_dpi_and_resize.
+
+    overwrite : bool, optional, default=False
+        If True, all images are processed. Otherwise, images which are unchanged since
+        they were last processed with the same parameters are skipped (see convert_images).
+        Only used without temp_folder.
+
+    band_height : int, optional, default=None
+        Process the images in bands of this many rows, see convert_images.
+        Only used without temp_folder.
+
+    wait_time : float, optional, default=None
+        Deprecated and ignored, see convert_dpi_and_resize.
+
+    Returns:
+    --------
+    dict[str, str]
+        Error messages of the images which could not be converted, by image path.
+    """
+    _warn_wait_time(wait_time)
+    if temp_folder is None:
+        # Decode, convert and resize each image once, writing the 8-bit BMP directly
+        errors = convert_images(input_folder=input_folder,
+                                output_folder=output_folder,
+                                target_dpi=target_dpi,
+                                batch_size=batch_size,
+                                workers=workers,
+                                method=method,
+                                overwrite=overwrite,
+                                band_height=band_height)
+    else:
+        # Create the output and temp folders
+        create_folder(output_folder)
+        create_folder(temp_folder)
+
+        # Step 1: Resize and adjust DPI
+        errors = convert_dpi_and_resize(input_folder=input_folder,
+                                        output_folder=temp_folder,
+                                        target_dpi=target_dpi,
+                                        batch_size=batch_size,
+                                        workers=workers,
+                                        method=method)
+
+        # Step 2: Convert to 8-bit grayscale and save directly to the output folder
+        convert_to_8bit(temp_folder, output_folder)
+
+        # Step 3: Delete the temporary folder
+        delete_temp_folder(folder_path=temp_folder)
+
+    if errors:
+        logger.warning(f"{len(errors)} image(s) could not be converted: {', '.join(errors)}")
+    return errors
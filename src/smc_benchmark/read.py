@@ -1,10 +1,31 @@
+from __future__ import annotations
+
+import csv
+import io
+import json
 import pathlib as pl
+import re
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from functools import partial
 
 import numpy as np
 import pandas as pd
 
-from smc_benchmark._naming import KIT_NAMING, UT_NAMING
-from smc_benchmark._utils import decode_filename
+from smc_benchmark import cache as _cache
+from smc_benchmark._naming import (
+    DISPLACEMENT,
+    FORCE,
+    GAP,
+    KIT_NAMING,
+    TIME,
+    TUM_NAMING,
+    UT_NAMING,
+)
+from smc_benchmark._utils import decode_filename, parallel_map
+from smc_benchmark.channels import CHANNELS_VERSION, add_channels
+from smc_benchmark.decimate import decimate as _decimate
+from smc_benchmark.experiment import Experiment, ExperimentStore, iter_experiments
 
 # Test configurations
 CONFIG1 = "3mm 100x100"
@@ -15,8 +36,9 @@ CONFIG4 = "7mm 100x100"
 # Name of institution
 KIT = "kit"
 UT = "ut"
+TUM = "tum"
 
-# Mapping between configuration and number for KIT, UT
+# Mapping between configuration and number for KIT, UT, TUM
 CONFIG_TO_NUMBER_KIT = {
     CONFIG1: [3, 7, 11, 15, 19, 23],
     CONFIG2: [4, 8, 12, 16, 20, 24],
@@ -25,11 +47,57 @@ CONFIG_TO_NUMBER_KIT = {
 }
 NUMBER_TO_CONFIG_KIT = {v: k for k, values in CONFIG_TO_NUMBER_KIT.items() for v in values}
 
-# File extensions of the data files
-FILE_EXTENSION = {KIT: "*.TXT", UT: "*.csv"}
+# File extensions of the data files. UT and TUM data files are both CSV files; they are
+# told apart by the institution passed to read, i.e., each institution has its own folder.
+FILE_EXTENSION = {KIT: "*.TXT", UT: "*.csv", TUM: "*.csv"}
+
+# Number of header lines of the data files
+HEADER_LINES = {KIT: 5, UT: 6}
+
+# Header keys of the data files, mapped to fields of Header
+KIT_HEADER_KEYS = {"Probenbezeichnung": "specimen", "Datum/Uhrzeit": "date"}
+UT_HEADER_KEYS = {
+    "Thickness": "thickness",
+    "Sample length (along Fibre)": "length",
+    "Width": "width",
+}
+KIT_DATE_FORMAT = "%d.%m.%Y %H:%M:%S"
+
+# Maximum number of lines searched for the column names of a TUM data file
+TUM_MAX_HEADER_LINES = 50
+
+# Order of the channels in the long-format frame of read_all
+CHANNELS = [TIME, FORCE, DISPLACEMENT, GAP]
+KEYS = ["institution", "material", "config", "specimen"]
+
+
+@dataclass(frozen=True)
+class Header:
+    """Metadata from the header of a data file.
+
+    Fields which are not contained in the header of an institution's files are None.
+    Lengths are in mm.
+    """
+
+    specimen: str | None = None
+    date: datetime | None = None
+    thickness: float | None = None
+    length: float | None = None
+    width: float | None = None
 
 
-def read(institution, folder):
+def read(
+    institution,
+    folder,
+    *,
+    cache=True,
+    workers=None,
+    lazy=False,
+    max_loaded=None,
+    dtype=None,
+    decimate=None,
+    derive=None,
+):
     """Read test data.
 
     Parameters
@@ -38,49 +106,425 @@ def read(institution, folder):
         Abbreviation of institution where the data was collected, e.g., 'kit' or 'ut'.
     folder : str | pathlib.Path
         Path to the folder containing the data.
+    cache : bool, optional
+        If True (default), parsed files are loaded from and stored in the on-disk cache,
+        see :mod:`smc_benchmark.cache`. If False, the cache is bypassed.
+    workers : int | None, optional
+        Number of processes used to parse the files concurrently; -1 uses all CPUs.
+        None (default) or 1 parses the files serially.
+    lazy : bool, optional
+        If True, return :class:`~smc_benchmark.experiment.Experiment` handles that load
+        their data on first access instead of DataFrames. Defaults to False.
+    max_loaded : int | None, optional
+        In lazy mode, maximum number of experiments kept in memory; the least recently
+        used ones are evicted. None (default) keeps all loaded experiments.
+    dtype : str | np.dtype | None, optional
+        Data type of the experimental data, e.g., 'float32' to halve memory usage.
+        None (default) keeps float64.
+    decimate : int | None, optional
+        If given, each experiment is decimated to this number of points with
+        :func:`smc_benchmark.decimate.decimate`. None (default) keeps all points.
+    derive : bool | dict | None, optional
+        If True, or a dictionary of options of :func:`smc_benchmark.channels.add_channels`,
+        derived channels (velocity, smoothed force, force-gap slope) are added to each
+        experiment before decimation. They are cached along with the data.
+
+    The cache always holds full-resolution float64 data, so reading again without
+    ``dtype`` and ``decimate`` is cheap. In lazy mode, the full-resolution data is also
+    available as ``experiment.raw``.
 
     Returns
     -------
-    dict[str, dict[str, list[pd.DataFrame]]]
-        Dictionary containing the experimental data.
+    dict[str, dict[str, list[pd.DataFrame | Experiment]]]
+        Dictionary containing the experimental data. The :class:`Header` of each
+        experiment is available as ``df.attrs["header"]``, or ``experiment.header``.
+        DataFrames also carry the ``institution``, ``material``, ``number``, ``config``
+        and ``file`` of the experiment in ``df.attrs``.
     """
     folder = pl.Path(folder)
     if not folder.exists():
         raise FileNotFoundError(f"Folder not found: {folder}")
 
+    # Collect files in a deterministic order, i.e., by material and number
+    files = sorted(folder.glob(FILE_EXTENSION[institution]), key=_decode)
+
+    # Read individual experiments, or create handles to read them on access
+    loader = partial(
+        _read_file, institution, use_cache=cache, dtype=dtype, decimate=decimate, derive=derive
+    )
+    if lazy:
+        store = ExperimentStore(max_loaded)
+        experiments = []
+        for file in files:
+            material, number = _decode(file)
+            experiments.append(
+                Experiment(
+                    institution=institution,
+                    material=material,
+                    number=number,
+                    config=NUMBER_TO_CONFIG_KIT[number],
+                    file=file,
+                    loader=loader,
+                    raw_loader=partial(_read_file, institution, use_cache=cache, derive=derive),
+                    header_loader=partial(_read_header, institution),
+                    store=store,
+                )
+            )
+    else:
+        if derive:
+            # Derive the channels of all experiments at once, see smc_benchmark.channels
+            experiments = _read_derived(institution, files, cache, _derive_options(derive), workers)
+            experiments = [_convert(pd_data, dtype, decimate) for pd_data in experiments]
+        else:
+            experiments = parallel_map(loader, files, workers)
+        for file, pd_data in zip(files, experiments):
+            material, number = _decode(file)
+            pd_data.attrs.update(
+                institution=institution,
+                material=material,
+                number=number,
+                config=NUMBER_TO_CONFIG_KIT[number],
+                file=file,
+            )
+
     # Read data
     all_data = {}
-    for file in folder.glob(FILE_EXTENSION[institution]):
-        _, material, number = decode_filename(file.stem)
-
-        # Read individual experiments
-        if institution == KIT:
-            pd_data = _read_kit(file)
-        elif institution == UT:
-            pd_data = _read_ut(file)
-        else:
-            raise ValueError(f"Institution '{institution}' not found")
+    for file, pd_data in zip(files, experiments):
+        material, number = _decode(file)
 
         # Add experiment to all data
         if material not in all_data:
             all_data[material] = {}
-        specification = NUMBER_TO_CONFIG_KIT[int(number)]
+        specification = NUMBER_TO_CONFIG_KIT[number]
         if specification not in all_data[material]:
             all_data[material][specification] = []
         all_data[material][specification].append(pd_data)
     return all_data
 
 
+def _decode(file):
+    """Return material and specimen number of a data file."""
+    _, material, number = decode_filename(file.stem)
+    return material, int(number)
+
+
+def _read_file(institution, file, use_cache=True, dtype=None, decimate=None, derive=None):
+    """Read a single data file, consulting the cache first."""
+    if derive:
+        (pd_data,) = _read_derived(institution, [file], use_cache, _derive_options(derive))
+    else:
+        pd_data = _read_full(institution, file, use_cache)
+    return _convert(pd_data, dtype, decimate)
+
+
+def _convert(pd_data, dtype=None, decimate=None):
+    """Decimate an experiment and convert its data type, if requested."""
+    if decimate is not None:
+        pd_data = _decimate(pd_data, decimate)
+    if dtype is not None:
+        pd_data = pd_data.astype(dtype)
+    return pd_data
+
+
+def _derive_options(derive):
+    """Return the options of add_channels given by the derive argument of read."""
+    return {} if derive is True else derive
+
+
+def _read_derived(institution, files, use_cache, options, workers=None):
+    """Read data files and add derived channels, consulting the cache first.
+
+    The channels of all files missing from the cache are derived in one batch.
+    """
+    variant = f"channels-{CHANNELS_VERSION}:{json.dumps(options, sort_keys=True)}"
+    experiments = [
+        _load_cached(institution, file, variant) if use_cache else None for file in files
+    ]
+    missing = [i for i, pd_data in enumerate(experiments) if pd_data is None]
+    raw = parallel_map(
+        partial(_read_full, institution, use_cache=use_cache),
+        [files[i] for i in missing],
+        workers,
+    )
+    for i, pd_data in zip(missing, add_channels(raw, **options)):
+        if use_cache:
+            _store_cached(institution, files[i], pd_data, variant)
+        experiments[i] = pd_data
+    return experiments
+
+
+def _read_full(institution, file, use_cache=True):
+    """Read a single data file in full resolution, consulting the cache first."""
+    pd_data = _load_cached(institution, file) if use_cache else None
+    if pd_data is not None:
+        return pd_data
+
+    if institution == KIT:
+        pd_data = _read_kit(file)
+    elif institution == UT:
+        pd_data = _read_ut(file)
+    elif institution == TUM:
+        pd_data = _read_tum(file)
+    else:
+        raise ValueError(f"Institution '{institution}' not found")
+
+    if use_cache:
+        _store_cached(institution, file, pd_data)
+    return pd_data
+
+
+def _load_cached(institution, file, variant=""):
+    """Load an experiment and its header from the cache."""
+    cached = _cache.load(institution, file, variant)
+    if cached is None:
+        return None
+    pd_data, metadata = cached
+    pd_data.attrs["header"] = _header_from_dict(metadata["header"])
+    return pd_data
+
+
+def _store_cached(institution, file, pd_data, variant=""):
+    """Store an experiment and its header in the cache."""
+    metadata = {"header": _header_to_dict(pd_data.attrs["header"])}
+    _cache.store(institution, file, pd_data, metadata, variant)
+
+
+def _read_header(institution, file):
+    """Read only the header of a data file."""
+    if institution == TUM:
+        # TUM data files contain no header metadata
+        return Header()
+    with pl.Path(file).open(encoding="latin1") as f:
+        lines = [f.readline() for _ in range(HEADER_LINES[institution])]
+    if institution == KIT:
+        return _parse_kit_header(lines)
+    if institution == UT:
+        return _parse_ut_header(lines)
+    raise ValueError(f"Institution '{institution}' not found")
+
+
 def _read_kit(file):
-    """Read KIT data file."""
-    data = np.loadtxt(file, delimiter=",", encoding="latin1", skiprows=5).T
-    return pd.DataFrame(data[list(KIT_NAMING.keys())].T, columns=list(KIT_NAMING.values()))
+    """Read KIT data file.
+
+    The data block is read at once and parsed by :func:`_parse_fixed_width`, which only
+    converts the used columns. Files whose columns are not of fixed width are parsed by
+    the C parser of pandas.
+    """
+    with pl.Path(file).open("rb") as f:
+        lines = [f.readline().decode("latin1") for _ in range(HEADER_LINES[KIT])]
+        block = f.read()
+    header = _parse_kit_header(lines)
+    usecols = list(KIT_NAMING)
+    data = _parse_fixed_width(block, usecols)
+    if data is None:
+        data = pd.read_csv(
+            io.BytesIO(block),
+            sep=",",
+            header=None,
+            usecols=usecols,
+            dtype=np.float64,
+            engine="c",
+        ).to_numpy()
+    pd_data = pd.DataFrame(data, columns=list(KIT_NAMING.values()))
+    pd_data.attrs["header"] = header
+    return pd_data
+
+
+def _parse_fixed_width(block, usecols):
+    """Parse comma-separated columns of a fixed width, e.g., as written by testXpert.
+
+    Every line of the block must have the same length and its commas at the same
+    positions, so the fields of each used column can be cut out of the block as one
+    array of strings and converted to float64 at once.
+
+    Returns
+    -------
+    np.ndarray | None
+        The data of the used columns, or None if the block is not of fixed width.
+    """
+    line_length = block.find(b"\n") + 1
+    field_width = block.find(b",") + 1
+    if line_length <= 0 or not 0 < field_width < line_length:
+        return None
+    n_fields = block[:line_length].count(b",") + 1
+    n_rows = len(block) // line_length
+    if max(usecols) >= n_fields or block[n_rows * line_length :].strip():
+        return None
+
+    rows = np.frombuffer(block, dtype=np.uint8, count=n_rows * line_length)
+    rows = rows.reshape(n_rows, line_length)
+    separators = rows[:, field_width - 1 : (n_fields - 1) * field_width : field_width]
+    if not ((separators == ord(",")).all() and (rows[:, -1] == ord("\n")).all()):
+        return None
+
+    data = np.empty((n_rows, len(usecols)), dtype=np.float64)
+    for j, column in enumerate(usecols):
+        start = column * field_width
+        stop = min(start + field_width - 1, line_length - 1)
+        fields = np.ascontiguousarray(rows[:, start:stop]).view(f"S{stop - start}")
+        data[:, j] = fields[:, 0].astype(np.float64)
+    return data
 
 
 def _read_ut(file):
     """Read UT/TPRC data file."""
-    return pd.read_csv(file, sep=",", names=UT_NAMING, skiprows=6, quotechar='"')
+    with pl.Path(file).open(encoding="latin1") as f:
+        header = _parse_ut_header([f.readline() for _ in range(HEADER_LINES[UT])])
+        pd_data = pd.read_csv(
+            f,
+            sep=",",
+            header=None,
+            names=UT_NAMING,
+            dtype=np.float64,
+            quotechar='"',
+        )
+    pd_data.attrs["header"] = header
+    return pd_data
+
+
+def _parse_kit_header(lines):
+    """Parse header lines of a KIT data file, e.g., 'Probenbezeichnung      CF503K-1'."""
+    fields = {}
+    for line in lines:
+        key, _, value = line.strip().partition("  ")
+        if key in KIT_HEADER_KEYS:
+            fields[KIT_HEADER_KEYS[key]] = value.strip()
+    if "date" in fields:
+        fields["date"] = datetime.strptime(fields["date"], KIT_DATE_FORMAT)
+    return Header(**fields)
+
+
+def _parse_ut_header(lines):
+    """Parse header lines of a UT data file, e.g., 'Specimen properties : Width,"100.0",mm'."""
+    fields = {}
+    for row in csv.reader(lines):
+        if len(row) >= 2 and ":" in row[0]:
+            key = row[0].split(":", 1)[1].strip()
+            if key in UT_HEADER_KEYS:
+                fields[UT_HEADER_KEYS[key]] = float(row[1])
+    return Header(**fields)
+
+
+def _header_to_dict(header):
+    """Convert a header to a JSON-serializable dictionary."""
+    fields = asdict(header)
+    if header.date is not None:
+        fields["date"] = header.date.isoformat()
+    return fields
+
+
+def _header_from_dict(fields):
+    """Inverse of _header_to_dict."""
+    if fields.get("date") is not None:
+        fields = {**fields, "date": datetime.fromisoformat(fields["date"])}
+    return Header(**fields)
+
+
+def _read_tum(file):
+    """Read TUM data file.
+
+    The columns are identified by their names in the first line containing a name of
+    ``TUM_NAMING``, rather than by position, and may be delimited by commas, semicolons
+    (with decimal commas) or tabs. If several columns map to the same channel, the first
+    one is used. A line of units after the column names is skipped.
+    """
+    with pl.Path(file).open(encoding="latin1") as f:
+        for _ in range(TUM_MAX_HEADER_LINES):
+            line = f.readline()
+            if any(_normalize_name(name) in TUM_NAMING for name in re.split(r"[,;\t]", line)):
+                break
+        else:
+            raise ValueError(f"No known column names found in {file}")
+        delimiter = csv.Sniffer().sniff(line, delimiters=",;\t").delimiter
+        names = next(csv.reader([line], delimiter=delimiter))
+        # Only the first column of each channel is used, e.g., 'Prüfzeit' rather than
+        # 'Zeit' in Zwick exports
+        usecols = {}
+        for i, name in enumerate(names):
+            channel = TUM_NAMING.get(_normalize_name(name))
+            if channel is not None and channel not in usecols.values():
+                usecols[i] = channel
+        if TIME not in usecols.values() or FORCE not in usecols.values():
+            raise ValueError(f"Time or force column missing in {file}")
+
+        # Skip a line of units, if any
+        position = f.tell()
+        if not re.match(r"\s*[-+\d.]", f.readline()):
+            position = f.tell()
+        f.seek(position)
+
+        pd_data = pd.read_csv(
+            f,
+            sep=delimiter,
+            header=None,
+            usecols=list(usecols),
+            dtype=np.float64,
+            decimal="," if delimiter == ";" else ".",
+        )
+    pd_data = pd_data.rename(columns=usecols)
+    pd_data.attrs["header"] = Header()
+    return pd_data
+
+
+def _normalize_name(name):
+    """Normalize a column name, e.g., ' "Force [N]" ' to 'force'."""
+    return re.sub(r"[\[(].*", "", name).strip().strip('"').strip().lower()
+
+
+def read_all(folders, *, cache=True, workers=None, dtype=None, decimate=None, derive=None):
+    """Read test data of several institutions into one long-format frame.
+
+    Parameters
+    ----------
+    folders : dict[str, str | pathlib.Path]
+        Folders containing the data, by abbreviation of the institution.
+    cache, workers, dtype, decimate, derive
+        See :func:`read`.
+
+    Returns
+    -------
+    pd.DataFrame
+        One row per sample of all experiments, with the categorical columns institution,
+        material, config and specimen (number), followed by the channels. Channels not
+        recorded by an institution, e.g., the gap for UT, are NaN.
+    """
+    experiments = []
+    for institution, folder in folders.items():
+        data = read(
+            institution,
+            folder,
+            cache=cache,
+            lazy=True,
+            max_loaded=0,
+            dtype=dtype,
+            decimate=decimate,
+            derive=derive,
+        )
+        experiments.extend(iter_experiments(data))
+    frames = parallel_map(_experiment_data, experiments, workers)
+
+    lengths = np.array([len(df) for df in frames], dtype=np.intp)
+    columns = {}
+    for key, attribute in zip(KEYS, ["institution", "material", "config", "number"]):
+        values = [getattr(e, attribute) for e in experiments]
+        categories = list(dict.fromkeys(values))
+        codes = np.repeat([categories.index(v) for v in values], lengths).astype(np.int32)
+        columns[key] = pd.Categorical.from_codes(codes, categories=categories)
+
+    # Known channels first, then any further ones, e.g., derived channels
+    names = list(dict.fromkeys(c for df in frames for c in df.columns))
+    names = [c for c in CHANNELS if c in names] + [c for c in names if c not in CHANNELS]
+    for name in names:
+        columns[name] = np.concatenate(
+            [
+                df[name].to_numpy() if name in df.columns else np.full(len(df), np.nan)
+                for df in frames
+            ]
+            or [np.empty(0)]
+        )
+    return pd.DataFrame(columns)
 
 
-def _read_tum():
-    pass
+def _experiment_data(experiment):
+    """Return the data of an experiment handle."""
+    return experiment.data
@@ -0,0 +1,171 @@
+"""Resampling of experiments onto a common grid and ensemble statistics."""
+
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from smc_benchmark._naming import FORCE, GAP
+from smc_benchmark._utils import pad_ragged
+from smc_benchmark.experiment import iter_experiments
+
+# Attributes of experiment handles by which ensembles are grouped
+GROUP_BY = ("institution", "material", "config")
+
+
+def monotonic_mask(x, decreasing=True):
+    """Mask the points of each row at which x reaches a new extremum.
+
+    Squeeze experiments are not strictly monotonic in the gap, e.g., due to noise or
+    machine compliance. Keeping only the points at which the gap reaches a new minimum
+    yields a strictly decreasing curve, i.e., the lower envelope of the closing motion.
+
+    Parameters
+    ----------
+    x : np.ndarray
+        2D array, one curve per row, padded with NaN.
+    decreasing : bool, optional
+        If True (default), keep new minima, else new maxima.
+
+    Returns
+    -------
+    np.ndarray
+        Boolean mask of the same shape as x.
+    """
+    sign = 1.0 if decreasing else -1.0
+    running = np.fmin.accumulate(sign * x, axis=1)
+    previous = np.concatenate([np.full((len(x), 1), np.inf), running[:, :-1]], axis=1)
+    return sign * x < previous
+
+
+def resample(data, grid, *, x=GAP, y=FORCE, decreasing=None):
+    """Interpolate all experiments onto a common grid in one batched operation.
+
+    Parameters
+    ----------
+    data : dict | list
+        Experiment handles, see :func:`~smc_benchmark.experiment.iter_experiments`.
+    grid : array_like
+        Common values of x.
+    x : str, optional
+        Channel of the grid. Defaults to the gap.
+    y : str, optional
+        Channel to interpolate. Defaults to the force.
+    decreasing : bool | None, optional
+        Whether x decreases during an experiment, see :func:`monotonic_mask`. Defaults to
+        True for the gap and False otherwise.
+
+    Returns
+    -------
+    np.ndarray
+        Array of shape (number of experiments, len(grid)). Grid points outside the range
+        of an experiment, or experiments without channel x, yield NaN.
+    """
+    experiments = list(iter_experiments(data))
+    grid = np.asarray(grid, dtype=np.float64)
+    if decreasing is None:
+        decreasing = x == GAP
+    if not experiments:
+        return np.empty((0, len(grid)))
+
+    frames = [e.data for e in experiments]
+    xs, _ = pad_ragged(
+        [df[x].to_numpy() if x in df.columns else np.full(len(df), np.nan) for df in frames]
+    )
+    ys, _ = pad_ragged([df[y].to_numpy() for df in frames])
+
+    # Make each curve strictly increasing in u, with NaN (padding) excluded
+    sign = -1.0 if decreasing else 1.0
+    keep = monotonic_mask(xs, decreasing) & ~np.isnan(ys)
+    u = np.where(keep, sign * xs, np.nan)
+    lower = np.fmin.reduce(u, axis=1)
+    upper = np.fmax.reduce(u, axis=1)
+
+    if not keep.any():
+        return np.full((len(u), len(grid)), np.nan)
+
+    # Shift the rows apart, so that all curves form one increasing sequence, which is
+    # interpolated by a single call of np.interp
+    span = np.nanmax(upper - lower)
+    shift = np.arange(len(u)) * (span + 1.0) - np.nan_to_num(lower)
+    rows, cols = np.nonzero(keep)
+    query = sign * grid[None, :]
+    result = np.interp(query + shift[:, None], u[rows, cols] + shift[rows], ys[rows, cols])
+
+    # Interpolation across rows is meaningless
+    outside = (query < lower[:, None]) | (query > upper[:, None]) | np.isnan(lower)[:, None]
+    result[outside] = np.nan
+    return result
+
+
+def ensemble(data, grid=None, *, by=GROUP_BY, percentiles=(5, 50, 95), x=GAP, y=FORCE):
+    """Compute ensemble statistics of groups of experiments on a common grid.
+
+    Parameters
+    ----------
+    data : dict | list
+        Experiment handles, see :func:`~smc_benchmark.experiment.iter_experiments`.
+    grid : array_like | None, optional
+        Common values of x. None (default) uses 200 points spanning all experiments.
+    by : sequence of str, optional
+        Attributes of the experiment handles to group by. Defaults to institution,
+        material and config.
+    percentiles : sequence of float, optional
+        Percentiles to compute, in %.
+    x, y : str, optional
+        Channel of the grid and channel to aggregate, see :func:`resample`.
+
+    Returns
+    -------
+    pd.DataFrame
+        Indexed by the group attributes and the grid values, with the columns ``count``
+        (number of experiments covering the grid point), ``mean``, ``std`` (sample
+        standard deviation), and ``p<q>`` for each percentile q.
+    """
+    experiments = list(iter_experiments(data))
+    if grid is None:
+        grid = _default_grid(experiments, x)
+    grid = np.asarray(grid, dtype=np.float64)
+    values = resample(experiments, grid, x=x, y=y)
+
+    keys = [tuple(getattr(e, attribute) for attribute in by) for e in experiments]
+    groups = {}
+    for i, key in enumerate(keys):
+        groups.setdefault(key, []).append(i)
+
+    frames = []
+    for key, members in groups.items():
+        frame = _statistics(values[members], percentiles)
+        frame.index = pd.MultiIndex.from_tuples([(*key, g) for g in grid], names=[*by, x])
+        frames.append(frame)
+    if not frames:
+        return pd.DataFrame()
+    return pd.concat(frames)
+
+
+def _statistics(values, percentiles):
+    """Compute NaN-aware statistics over the rows of values."""
+    valid = ~np.isnan(values)
+    count = valid.sum(axis=0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = np.nansum(values, axis=0) / count
+        std = np.sqrt(np.nansum((values - mean) ** 2, axis=0) / (count - 1))
+    statistics = {"count": count, "mean": mean, "std": std}
+    with warnings.catch_warnings():
+        # Grid points not covered by any experiment
+        warnings.simplefilter("ignore", RuntimeWarning)
+        for q, p in zip(percentiles, np.nanpercentile(values, percentiles, axis=0)):
+            statistics[f"p{q:g}"] = p
+    return pd.DataFrame(statistics)
+
+
+def _default_grid(experiments, x, n_points=200):
+    """Return a grid spanning channel x of all experiments."""
+    lower, upper = np.inf, -np.inf
+    for experiment in experiments:
+        if x in experiment.data.columns:
+            lower = min(lower, experiment.data[x].min())
+            upper = max(upper, experiment.data[x].max())
+    if lower > upper:
+        return np.empty(0)
+    return np.linspace(lower, upper, n_points)
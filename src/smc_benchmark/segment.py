@@ -6,23 +6,188 @@
 
 import cv2
 import logging
+import multiprocessing
 import numpy as np
 import os
-import torch
-from segment_anything import sam_model_registry, SamPredictor, SamAutomaticMaskGenerator
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass
+from functools import cache, cached_property, partial
 from pathlib import Path
 
-# Allow multiple instances of the Intel OpenMP (KMP) runtime
-os.environ["KMP_DUPLICATE_LIB_OK"] = "TRUE"
+from smc_benchmark._utils import bounded_map
 
-# Construct the path to the SAM model file ...
-model_path = Path(__file__).parent.parent / 'resources' / 'sam' / 'sam_vit_h_4b8939.pth'
-# ... and load the SAM model
-sam = sam_model_registry["vit_h"](checkpoint=model_path)
-device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
-sam.to(device)
-predictor = SamPredictor(sam)
-mask_generator = SamAutomaticMaskGenerator(sam)
+logger = logging.getLogger(__name__)
+
+# Path to the default SAM model file, see install/download_sam.py
+MODEL_PATH = Path(__file__).parent.parent / 'resources' / 'sam' / 'sam_vit_h_4b8939.pth'
+
+# Default SAM model type, matching the default model file
+MODEL_TYPE = "vit_h"
+
+# Default selection of the object: the darkest of the masks of at least this many pixels
+LARGEST_MASK_INDEX = 1
+MIN_AREA_THRESHOLD = 160000
+
+# Segmentation backends: SAM, the classical OpenCV backend, or the classical backend with
+# fallback to SAM for images where its quality score is below MIN_QUALITY
+BACKENDS = ('sam', 'classical', 'auto')
+MIN_QUALITY = 0.9
+
+# Number of masks whose intensities are averaged in one matrix-vector product
+_MASK_CHUNK = 8
+
+
+@dataclass(frozen=True)
+class FastSettings:
+    """
+    Settings of the fast segmentation mode.
+
+    The masks are generated on a copy of the image downscaled to max_side pixels with a
+    sparser point grid and without crops. SAM embeds images at 1024 pixels anyway, so
+    this mainly saves mask decoding and post-processing at full resolution. Only the
+    selected mask is upsampled to full resolution and, with refine, its boundary is
+    refined on the full-resolution image.
+
+    Parameters:
+    -----------
+    max_side : int, optional, default=1024
+        The length of the longer side of the downscaled image in pixels.
+
+    points_per_side : int, optional, default=16
+        The number of prompt points along each side of the image (default mode: 32).
+
+    pred_iou_thresh, stability_score_thresh : float, optional, default=0.86, 0.9
+        Minimum predicted IoU and stability of the generated masks.
+
+    crop_n_layers : int, optional, default=0
+        The number of layers of image crops to generate masks on.
+
+    refine : bool, optional, default=True
+        Whether to refine the boundary of the upsampled mask by thresholding the
+        full-resolution image between the mean intensities inside and outside the mask.
+    """
+    max_side: int = 1024
+    points_per_side: int = 16
+    pred_iou_thresh: float = 0.86
+    stability_score_thresh: float = 0.9
+    crop_n_layers: int = 0
+    refine: bool = True
+
+    def generator_kwargs(self):
+        """
+        Return the keyword arguments of SamAutomaticMaskGenerator.
+        """
+        kwargs = asdict(self)
+        del kwargs['max_side'], kwargs['refine']
+        return kwargs
+
+
+class SamModel:
+    """
+    Handle to a SAM model, which is only loaded when it is used first.
+
+    Parameters:
+    -----------
+    checkpoint : str | Path, optional, default=MODEL_PATH
+        The path to the SAM model file.
+
+    model_type : str, optional, default="vit_h"
+        The type of the model, a key of segment_anything.sam_model_registry.
+
+    device : str, optional, default=None
+        The device the model runs on, e.g., 'cpu' or 'cuda'. If None, CUDA is used if
+        it is available.
+    """
+
+    def __init__(self, checkpoint=None, model_type=MODEL_TYPE, device=None):
+        self.checkpoint = Path(checkpoint) if checkpoint is not None else MODEL_PATH
+        self.model_type = model_type
+        self._device = device
+
+    def __repr__(self):
+        return (f"SamModel(checkpoint={str(self.checkpoint)!r}, model_type={self.model_type!r}, "
+                f"device={self._device!r})")
+
+    def load(self):
+        """
+        Load the model now instead of on first use, e.g., before forking workers.
+        Returns the handle itself.
+        """
+        _ = self.mask_generator  # loads the model, too
+        return self
+
+    @cached_property
+    def device(self):
+        """The torch device of the model."""
+        import torch
+
+        if self._device is None:
+            return torch.device('cuda' if torch.cuda.is_available() else 'cpu')
+        return torch.device(self._device)
+
+    @cached_property
+    def sam(self):
+        """The SAM model, loaded from the checkpoint and moved to the device."""
+        # Allow multiple instances of the Intel OpenMP (KMP) runtime, which torch may load
+        os.environ.setdefault("KMP_DUPLICATE_LIB_OK", "TRUE")
+        from segment_anything import sam_model_registry
+
+        sam = sam_model_registry[self.model_type](checkpoint=self.checkpoint)
+        sam.to(self.device)
+        return sam
+
+    @cached_property
+    def predictor(self):
+        """SamPredictor of the model."""
+        from segment_anything import SamPredictor
+
+        return SamPredictor(self.sam)
+
+    @cached_property
+    def mask_generator(self):
+        """SamAutomaticMaskGenerator of the model."""
+        from segment_anything import SamAutomaticMaskGenerator
+
+        return SamAutomaticMaskGenerator(self.sam)
+
+    def mask_generator_with(self, **kwargs):
+        """
+        Return a SamAutomaticMaskGenerator of the model with the given settings, which is
+        created once per combination of settings.
+        """
+        if not kwargs:
+            return self.mask_generator
+        generators = self.__dict__.setdefault('_generators', {})
+        key = tuple(sorted(kwargs.items()))
+        if key not in generators:
+            from segment_anything import SamAutomaticMaskGenerator
+
+            generators[key] = SamAutomaticMaskGenerator(self.sam, **kwargs)
+        return generators[key]
+
+
+@cache
+def _get_model(checkpoint, model_type, device):
+    return SamModel(checkpoint, model_type, device)
+
+
+def get_model(checkpoint=None, model_type=MODEL_TYPE, device=None):
+    """
+    Return the shared handle to a SAM model, see SamModel.
+    The model is loaded once per process and configuration, when it is used first.
+    """
+    checkpoint = str(Path(checkpoint).resolve()) if checkpoint is not None else None
+    return _get_model(checkpoint, model_type, device)
+
+
+def __getattr__(name):
+    """
+    Load the default model on access of the former module attributes sam, device,
+    predictor and mask_generator.
+    """
+    if name in ("sam", "device", "predictor", "mask_generator"):
+        return getattr(get_model(), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 def setup_logging(log_file_path):
@@ -50,22 +215,49 @@ def calculate_darkness(*, image_rgb, mask):
     """
     # Convert the image to grayscale
     grayscale_image = cv2.cvtColor(image_rgb, cv2.COLOR_RGB2GRAY)
-    # Apply the mask to the grayscale image
-    masked_image = cv2.bitwise_and(grayscale_image, grayscale_image,
-                                   mask=mask.astype(np.uint8) * 255)
-    # Calculate the average pixel intensity (darkness)
-    masked_pixels = masked_image[masked_image > 0]
-    # Default to white if no pixels
-    average_intensity = np.mean(masked_pixels) if masked_pixels.size > 0 else 255
-    return average_intensity
+    return mask_darkness(grayscale_image=grayscale_image, masks=[mask])[0]
+
+
+def mask_darkness(*, grayscale_image, masks):
+    """
+    Calculates the average intensity of the masked regions of a grayscale image, for all
+    masks at once as a matrix-vector product of the mask stack and the image. Masks without
+    pixels are white (255).
+
+    Parameters:
+    -----------
+    grayscale_image : np.ndarray
+        The image in 8-bit grayscale, of shape (height, width).
+
+    masks : sequence of np.ndarray
+        The boolean masks, each of shape (height, width).
+
+    Returns:
+    --------
+    np.ndarray
+        The average intensity of each mask.
+    """
+    pixels = grayscale_image.ravel().astype(np.float64)
+    sums = np.empty(len(masks))
+    areas = np.empty(len(masks))
+    # Stack the masks in chunks, bounding the memory of their float copies
+    for start in range(0, len(masks), _MASK_CHUNK):
+        chunk = np.asarray(masks[start:start + _MASK_CHUNK], dtype=bool)
+        chunk = chunk.reshape(len(chunk), -1).view(np.uint8)
+        sums[start:start + len(chunk)] = chunk @ pixels
+        areas[start:start + len(chunk)] = np.count_nonzero(chunk, axis=1)
+    return np.where(areas > 0, sums / np.maximum(areas, 1), 255.0)
 
 
 def process_image(*,
                   in_filepath,
                   out_filepath,
                   log_file_path="process.log",
-                  largest_mask_index=1,
-                  min_area_threshold=160000):
+                  largest_mask_index=LARGEST_MASK_INDEX,
+                  min_area_threshold=MIN_AREA_THRESHOLD,
+                  model=None,
+                  fast=None,
+                  backend='sam'):
     """
     Processes an image located at the given file path and logs the processing steps.
 
@@ -86,6 +278,16 @@ def process_image(*,
         The minimum area threshold (in pixels) for a mask to be considered valid.
         Masks with areas smaller than this threshold will be ignored.
 
+    model : SamModel, optional, default=None
+        The SAM model. If None, the default model is used, see get_model.
+
+    fast : FastSettings | bool, optional, default=None
+        If given (True uses the default settings), the masks are generated on a
+        downscaled copy of the image, see FastSettings.
+
+    backend : str | callable, optional, default='sam'
+        The segmentation backend, see find_mask.
+
     Returns:
     --------
     This function does not return anything.
@@ -99,62 +301,465 @@ def process_image(*,
     setup_logging(log_file_path)
 
     try:
-        image_bgr = cv2.imread(in_filepath)
-        image_rgb = cv2.cvtColor(image_bgr, cv2.COLOR_BGR2RGB)
+        if _cutout(in_filepath=in_filepath,
+                   out_filepath=out_filepath,
+                   largest_mask_index=largest_mask_index,
+                   min_area_threshold=min_area_threshold,
+                   model=model,
+                   fast=fast,
+                   backend=backend):
+            logger.info(
+                f"{largest_mask_index}th largest and darkest object cutout saved to {str(out_filepath)}.")
+        else:
+            logger.warning(
+                f"Not enough valid masks in {in_filepath} to select the {largest_mask_index}th largest mask.")
 
-        # Generate masks
-        sam_result = mask_generator.generate(image_rgb)
+    except Exception as e:
+        logger.error(f"Error processing {in_filepath}: {str(e)}")
+    reset_logging()
 
-        # Sort masks by area (descending order)
-        sorted_masks = sorted(sam_result, key=lambda x: x['area'], reverse=True)
 
-        # Filter out masks that are smaller than the minimum area threshold
-        filtered_masks = [mask_data for mask_data in sorted_masks if mask_data['area'] >= min_area_threshold]
+def select_mask(*,
+                image_rgb,
+                largest_mask_index=LARGEST_MASK_INDEX,
+                min_area_threshold=MIN_AREA_THRESHOLD,
+                model=None,
+                fast=None):
+    """
+    Selects the mask of the object in an image: among the masks of at least
+    min_area_threshold pixels, the largest_mask_index-th darkest one.
 
-        # Select the top masks and calculate their "darkness" based on average intensity
-        mask_darkness = []
-        for mask_data in filtered_masks:
-            segmentation = mask_data['segmentation']
-            darkness = calculate_darkness(image_rgb=image_rgb,
-                                          mask=segmentation)
-            mask_darkness.append((mask_data, darkness))
+    Parameters:
+    -----------
+    image_rgb : np.ndarray
+        The image in RGB.
 
-        # Sort by darkness (ascending order), so the darkest comes first
-        mask_darkness.sort(key=lambda x: x[1])
+    largest_mask_index, min_area_threshold, model
+        See process_image.
 
-        # Select the mask based on the darkness criterion
-        if len(mask_darkness) >= largest_mask_index:
-            selected_mask_data = mask_darkness[largest_mask_index - 1]  # Subtract 1 for 0-based indexing
-            selected_mask = selected_mask_data[0]['segmentation']
+    fast : FastSettings | bool, optional, default=None
+        If given (True uses the default settings), the masks are generated on a
+        downscaled copy of the image, see FastSettings.
 
-            # Create a cutout of the object using the selected mask
-            cutout = cv2.bitwise_and(image_rgb, image_rgb, mask=selected_mask.astype(np.uint8) * 255)
+    Returns:
+    --------
+    np.ndarray | None
+        The boolean mask at the resolution of the image, or None if there are not enough
+        valid masks.
+    """
+    if model is None:
+        model = get_model()
+    if fast is True:
+        fast = FastSettings()
+
+    # Generate masks, in fast mode on a downscaled copy
+    image_small, scale = image_rgb, 1.0
+    generator = model.mask_generator
+    if fast:
+        scale = min(1.0, fast.max_side / max(image_rgb.shape[:2]))
+        if scale < 1.0:
+            size = (round(image_rgb.shape[1] * scale), round(image_rgb.shape[0] * scale))
+            image_small = cv2.resize(image_rgb, size, interpolation=cv2.INTER_AREA)
+        generator = model.mask_generator_with(**fast.generator_kwargs())
+    sam_result = generator.generate(image_small)
+
+    # Sort masks by area (descending order)
+    sorted_masks = sorted(sam_result, key=lambda x: x['area'], reverse=True)
+
+    # Filter out masks that are smaller than the minimum area threshold (at the scale of the masks)
+    min_area = min_area_threshold * scale ** 2
+    filtered_masks = [mask_data for mask_data in sorted_masks if mask_data['area'] >= min_area]
+
+    # Select the mask based on the darkness criterion
+    if len(filtered_masks) < largest_mask_index:
+        return None
+
+    # Calculate the "darkness" of all masks based on their average intensity, converting the
+    # image to grayscale once
+    grayscale_image = cv2.cvtColor(image_small, cv2.COLOR_RGB2GRAY)
+    darkness = mask_darkness(grayscale_image=grayscale_image,
+                             masks=[mask_data['segmentation'] for mask_data in filtered_masks])
+
+    # Sort by darkness (ascending order), so the darkest comes first
+    order = np.argsort(darkness, kind='stable')
+    selected_mask = filtered_masks[order[largest_mask_index - 1]]['segmentation']
+
+    if scale < 1.0:
+        # Upsample only the selected mask to full resolution
+        height, width = image_rgb.shape[:2]
+        selected_mask = cv2.resize(selected_mask.astype(np.float32), (width, height),
+                                   interpolation=cv2.INTER_LINEAR) > 0.5
+        if fast.refine:
+            selected_mask = refine_mask(image_rgb=image_rgb, mask=selected_mask,
+                                        width=int(np.ceil(1 / scale)))
+    return selected_mask
+
+
+def refine_mask(*, image_rgb, mask, width):
+    """
+    Refines the boundary of a mask, e.g., one upsampled from a lower resolution.
 
-            # Create a white background
-            white_background = np.ones_like(image_rgb) * 255
+    Within width pixels of the boundary, pixels are assigned to the mask if their
+    intensity is closer to the mean intensity inside the mask than to the one outside.
+    Returns the refined boolean mask.
+    """
+    grayscale_image = cv2.cvtColor(image_rgb, cv2.COLOR_RGB2GRAY)
+    mask_u8 = mask.astype(np.uint8)
+    kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (2 * width + 1, 2 * width + 1))
+    inner = cv2.erode(mask_u8, kernel).astype(bool)
+    outer = cv2.dilate(mask_u8, kernel).astype(bool)
+    if not inner.any() or outer.all():
+        return mask
+
+    inside = grayscale_image[inner].mean()
+    outside = grayscale_image[~outer].mean()
+    band = outer & ~inner
+    refined = mask.copy()
+    values = grayscale_image[band]
+    refined[band] = np.abs(values - inside) < np.abs(values - outside)
+    return refined
+
+
+def classical_mask(*, image_rgb, min_area_threshold=MIN_AREA_THRESHOLD):
+    """
+    Segments the darkest object of an image on a light background with classical image
+    processing: Otsu threshold, morphological closing, and the largest contour.
 
-            # Place the cutout on the white background
-            mask_inv = cv2.bitwise_not(selected_mask.astype(np.uint8) * 255)
-            white_background = cv2.bitwise_and(white_background, white_background, mask=mask_inv)
-            cutout_on_white = cv2.add(white_background, cutout)
+    The quality score rates how well the image fits this approach. It is the minimum of
+    - the separability of the dark and light pixels by the threshold, i.e., the between-
+      class variance divided by the total variance of the intensities,
+    - the fraction of the dark pixels belonging to the object, which is low for several
+      dark regions,
+    - the solidity of the object, i.e., its area divided by that of its convex hull,
+    and it is 0 if the object touches the border of the image.
 
-            # Save the cutout of the object on the white background
-            cv2.imwrite(str(out_filepath), cutout_on_white)
-            logging.info(
-                f"{largest_mask_index}th largest and darkest object cutout saved to {str(out_filepath)}.")
-        else:
-            logging.warning(
-                f"Not enough valid masks in {in_filepath} to select the {largest_mask_index}th largest mask.")
+    Parameters:
+    -----------
+    image_rgb : np.ndarray
+        The image in RGB.
 
-    except Exception as e:
-        logging.error(f"Error processing {in_filepath}: {str(e)}")
-    reset_logging()
+    min_area_threshold : int, optional, default=160000
+        The minimum area (in pixels) of the object.
+
+    Returns:
+    --------
+    tuple[np.ndarray | None, float]
+        The boolean mask, or None if there is no object of at least min_area_threshold
+        pixels, and the quality score between 0 and 1.
+    """
+    grayscale_image = cv2.cvtColor(image_rgb, cv2.COLOR_RGB2GRAY)
+    threshold, dark = cv2.threshold(grayscale_image, 0, 1,
+                                    cv2.THRESH_BINARY_INV | cv2.THRESH_OTSU)
+
+    # Close gaps, e.g., light fibres, with a kernel scaled to the image. Specks are
+    # dropped with all contours but the largest one.
+    size = max(3, min(grayscale_image.shape) // 200 * 2 + 1)
+    kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (size, size))
+    dark = cv2.morphologyEx(dark, cv2.MORPH_CLOSE, kernel)
+
+    contours, _ = cv2.findContours(dark, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    if not contours:
+        return None, 0.0
+    contour = max(contours, key=cv2.contourArea)
+    mask = np.zeros_like(dark)
+    cv2.drawContours(mask, [contour], -1, 1, thickness=cv2.FILLED)
+    mask = mask.astype(bool)
+    area = mask.sum()
+    if area < min_area_threshold:
+        return None, 0.0
+
+    # Separability of the intensities by the threshold (Otsu's effectiveness metric)
+    below = grayscale_image <= threshold
+    weight = below.mean()
+    variance = grayscale_image.var()
+    if variance == 0 or weight in (0, 1):
+        return None, 0.0
+    between = weight * (1 - weight) * (
+        grayscale_image[below].mean() - grayscale_image[~below].mean()) ** 2
+    separability = between / variance
+
+    dominance = min(1.0, area / max(dark.sum(), 1))
+    solidity = cv2.contourArea(contour) / max(cv2.contourArea(cv2.convexHull(contour)), 1)
+    x, y, w, h = cv2.boundingRect(contour)
+    touches_border = x == 0 or y == 0 or x + w == mask.shape[1] or y + h == mask.shape[0]
+    score = 0.0 if touches_border else float(min(separability, dominance, solidity))
+    return mask, score
+
+
+def find_mask(*,
+              image_rgb,
+              backend='sam',
+              largest_mask_index=LARGEST_MASK_INDEX,
+              min_area_threshold=MIN_AREA_THRESHOLD,
+              model=None,
+              fast=None):
+    """
+    Finds the mask of the object in an image with a segmentation backend.
+
+    Parameters:
+    -----------
+    image_rgb : np.ndarray
+        The image in RGB.
+
+    backend : str | callable, optional, default='sam'
+        The segmentation backend, one of BACKENDS:
+        - 'sam': the largest_mask_index-th darkest SAM mask, see select_mask,
+        - 'classical': the darkest object found by classical_mask, regardless of its
+          quality and of largest_mask_index,
+        - 'auto': the classical mask if its quality score is at least MIN_QUALITY and
+          largest_mask_index is 1, else the SAM mask. SAM thus only runs on the images
+          that are not a single dark object on a light background.
+        Or a function called like select_mask, returning the boolean mask or None.
+
+    largest_mask_index, min_area_threshold, model, fast
+        See select_mask.
+
+    Returns:
+    --------
+    np.ndarray | None
+        The boolean mask, or None if no object is found.
+    """
+    kwargs = {'image_rgb': image_rgb, 'largest_mask_index': largest_mask_index,
+              'min_area_threshold': min_area_threshold, 'model': model, 'fast': fast}
+    if callable(backend):
+        return backend(**kwargs)
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown segmentation backend {backend!r}, expected one of {BACKENDS}")
+    if backend == 'sam':
+        return select_mask(**kwargs)
+
+    mask, score = classical_mask(image_rgb=image_rgb, min_area_threshold=min_area_threshold)
+    if backend == 'classical':
+        return mask
+    if mask is not None and score >= MIN_QUALITY and largest_mask_index == 1:
+        logger.debug(f"Classical segmentation accepted with quality score {score:.2f}.")
+        return mask
+    logger.info(f"Classical segmentation quality score {score:.2f} below {MIN_QUALITY}, "
+                f"falling back to SAM.")
+    return select_mask(**kwargs)
+
+
+def _cutout(*, in_filepath, out_filepath, largest_mask_index, min_area_threshold, model=None,
+            fast=None, backend='sam'):
+    """
+    Cut out the selected object of an image and save it on a white background.
+    Returns False if there are not enough valid masks to select the object.
+    """
+    image_bgr = cv2.imread(str(in_filepath))
+    image_rgb = cv2.cvtColor(image_bgr, cv2.COLOR_BGR2RGB)
+
+    selected_mask = find_mask(image_rgb=image_rgb,
+                              backend=backend,
+                              largest_mask_index=largest_mask_index,
+                              min_area_threshold=min_area_threshold,
+                              model=model,
+                              fast=fast)
+    if selected_mask is None:
+        return False
+
+    # Place the cutout of the object on a white background, in one pass over the image
+    cutout_on_white = np.full_like(image_bgr, 255)
+    cv2.copyTo(image_bgr, np.asarray(selected_mask, dtype=bool).view(np.uint8), cutout_on_white)
+
+    # Save the cutout of the object on the white background
+    cv2.imwrite(str(out_filepath), cutout_on_white)
+    return True
+
+
+def create_pool(max_workers, *, model=None, threads_per_worker=None):
+    """
+    Creates a process pool for segmentation whose workers share the weights of a SAM model.
+
+    Where processes can be forked (Linux) and the model runs on the CPU, the model is
+    loaded once before the workers are forked, so they share its weights read-only
+    (copy-on-write) instead of loading the checkpoint each. Otherwise, each worker loads
+    the model itself.
+
+    Parameters:
+    -----------
+    max_workers : int
+        The number of worker processes.
+
+    model : SamModel, optional, default=None
+        The SAM model. If None, the default model is used, see get_model.
+
+    threads_per_worker : int, optional, default=None
+        The number of torch threads of each worker. If None, the CPUs are divided evenly
+        among the workers, so they do not compete for cores.
+
+    Returns:
+    --------
+    concurrent.futures.ProcessPoolExecutor
+        The pool. Functions run in it use the shared model if they are called with
+        model=None, e.g., process_image. The model is released when the pool shuts down.
+    """
+    global _worker_model
+
+    model = model if model is not None else get_model()
+    if threads_per_worker is None:
+        threads_per_worker = max(1, (os.cpu_count() or 1) // max_workers)
+
+    if "fork" in multiprocessing.get_all_start_methods() and model.device.type == "cpu":
+        # Load the model in this process, the forked workers inherit it
+        _worker_model = model.load()
+        context = multiprocessing.get_context("fork")
+        config = None
+    else:
+        # Forking after CUDA has been initialized is not supported
+        context = multiprocessing.get_context("spawn")
+        config = (model.checkpoint, model.model_type, model._device)
+    return _SegmentationPool(max_workers=max_workers,
+                             mp_context=context,
+                             initializer=_init_worker,
+                             initargs=(threads_per_worker, config),
+                             model=_worker_model if config is None else None)
+
+
+# Model shared by the workers of a pool created with create_pool
+_worker_model = None
+
+
+class _SegmentationPool(ProcessPoolExecutor):
+    """
+    Process pool which releases the model loaded for its workers when it shuts down.
+    """
+
+    def __init__(self, *args, model=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._model = model
+
+    def shutdown(self, wait=True, *, cancel_futures=False):
+        global _worker_model
+        super().shutdown(wait=wait, cancel_futures=cancel_futures)
+        # Keep the model of another pool created in the meantime
+        if self._model is not None and _worker_model is self._model:
+            _worker_model = None
+        self._model = None
+
+
+def _init_worker(threads, config):
+    """
+    Initialize a segmentation worker: limit its torch threads and load the model, if it
+    is not inherited from the parent process.
+    """
+    global _worker_model
+    import torch
+
+    torch.set_num_threads(threads)
+    if config is not None:
+        _worker_model = get_model(*config)
+
+
+def segment_image(*,
+                  in_filepath,
+                  out_filepath,
+                  largest_mask_index=LARGEST_MASK_INDEX,
+                  min_area_threshold=MIN_AREA_THRESHOLD,
+                  model=None,
+                  fast=None,
+                  backend='sam'):
+    """
+    Segments a single image, raising an error if no object can be cut out.
+
+    Unlike process_image, errors are raised instead of logged, so the caller can collect
+    them, e.g., in a pool created with create_pool.
+
+    Parameters:
+    -----------
+    in_filepath : str | Path
+        The path to the input image file.
+
+    out_filepath : str | Path
+        The path where the cutout is saved.
+
+    largest_mask_index, min_area_threshold, fast, backend
+        See process_image.
+
+    model : SamModel, optional, default=None
+        The SAM model. If None, the model shared by the workers of a pool created with
+        create_pool is used.
+
+    Returns:
+    --------
+    str | Path
+        The path of the output image.
+
+    Raises:
+    -------
+    RuntimeError
+        If there are not enough valid masks to select the requested mask.
+    """
+    if model is None:
+        model = _worker_model
+    if not _cutout(in_filepath=in_filepath,
+                   out_filepath=out_filepath,
+                   largest_mask_index=largest_mask_index,
+                   min_area_threshold=min_area_threshold,
+                   model=model,
+                   fast=fast,
+                   backend=backend):
+        raise RuntimeError(
+            f"Not enough valid masks to select the {largest_mask_index}th largest mask.")
+    return out_filepath
+
+
+def _segment_task(task, model=None):
+    """
+    Segment an image given as a task tuple, see segment_image.
+    """
+    in_filepath, out_filepath, largest_mask_index, min_area_threshold, fast, backend = task
+    return segment_image(in_filepath=in_filepath,
+                         out_filepath=out_filepath,
+                         largest_mask_index=largest_mask_index,
+                         min_area_threshold=min_area_threshold,
+                         model=model,
+                         fast=fast,
+                         backend=backend)
 
 
 def segment_images(*,
                    input_folder,
                    output_folder,
-                   log_file_path='process.log'):
+                   log_file_path='process.log',
+                   model=None,
+                   workers=None,
+                   threads_per_worker=None,
+                   largest_mask_index=LARGEST_MASK_INDEX,
+                   min_area_threshold=MIN_AREA_THRESHOLD,
+                   fast=None,
+                   backend='sam'):
+    """
+    Segments all BMP images in a folder, see process_image.
+
+    Parameters:
+    -----------
+    input_folder : str | Path
+        The folder containing the images.
+
+    output_folder : str | Path
+        The folder where the cutouts are saved with the names of the images.
+
+    log_file_path : str or Path, optional, default="process.log"
+        The path to the log file where processing information will be recorded.
+
+    model : SamModel, optional, default=None
+        The SAM model. If None, the default model is used, see get_model.
+
+    workers : int, optional, default=None
+        The number of worker processes, -1 for all CPUs. If None or 1, the images are
+        segmented one after another. The workers share the model, see create_pool.
+
+    threads_per_worker : int, optional, default=None
+        The number of torch threads of each worker, see create_pool.
+
+    largest_mask_index, min_area_threshold, fast, backend
+        See process_image.
+
+    Returns:
+    --------
+    dict[str, str]
+        Error messages of the images which could not be segmented, by image path.
+    """
 
     setup_logging(log_file_path)
 
@@ -164,13 +769,37 @@ def segment_images(*,
     if not os.path.exists(output_folder):
         os.makedirs(output_folder)
 
-    # Process images sequentially
-    for filename in os.listdir(input_folder):
+    # Collect all images
+    tasks = []
+    for filename in sorted(os.listdir(input_folder)):
         if filename.endswith(".bmp"):
             in_filepath = Path(input_folder) / filename
             out_filepath = Path(output_folder) / filename
-            process_image(in_filepath=in_filepath,
-                          out_filepath=out_filepath,
-                          log_file_path=log_file_path)
+            tasks.append((str(in_filepath), str(out_filepath), largest_mask_index,
+                          min_area_threshold, fast, backend))
+
+    if workers == -1:
+        workers = os.cpu_count()
+    if workers is not None and workers > 1 and backend == 'classical':
+        # The classical backend does not need the model
+        outcomes = bounded_map(_segment_task, tasks, workers=workers)
+    elif workers is not None and workers > 1:
+        # The workers use the model shared by create_pool
+        executor = partial(create_pool, model=model, threads_per_worker=threads_per_worker)
+        outcomes = bounded_map(_segment_task, tasks, workers=workers, executor=executor)
+    else:
+        func = partial(_segment_task, model=model if model is not None else get_model())
+        outcomes = bounded_map(func, tasks)
+
+    # Segment the images, aggregating the results of all workers here
+    errors = {}
+    for count, (task, out_filepath, error) in enumerate(outcomes, start=1):
+        if error is None:
+            logger.info(f"[{count}/{len(tasks)}] {largest_mask_index}th largest and darkest "
+                        f"object cutout saved to {out_filepath}.")
+        else:
+            logger.error(f"[{count}/{len(tasks)}] Error processing {task[0]}: {error}")
+            errors[task[0]] = str(error)
 
     reset_logging()
+    return errors
@@ -4,17 +4,39 @@
 @author: Andreas Gebhard, andreas.gebhard@ivw.uni-kl.de
 """
 # standard library imports
+import errno
 import os
-from shutil import copy2
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from shutil import copy2, copystat
 
 # local application imports
-# none
+from smc_benchmark._utils import bounded_map
+from smc_benchmark.testplan import read_testplan
 
 # third party library imports
-import pandas as pd
+# none
+
+# Ways to place an image in its destination folder:
+# - 'copy': independent copy with metadata (shutil.copy2)
+# - 'hardlink': additional directory entry of the same file, no extra storage
+# - 'reflink': copy-on-write clone (Btrfs, XFS, ...), falls back to a copy where unsupported
+# - 'symlink': symbolic link to the absolute path of the source image
+PLACEMENT_MODES = ('copy', 'hardlink', 'reflink', 'symlink')
+
+# Excel rows (1-based, inclusive) of the test plan which list the specimens to be sorted
+FIRST_ROW = 21
+LAST_ROW = 45
+
+# ioctl request to clone a file on Linux (FICLONE from linux/fs.h)
+FICLONE = 0x40049409
 
+# Errors which indicate that a file system does not support cloning files
+_NO_REFLINK = {errno.EOPNOTSUPP, errno.ENOTTY, errno.EXDEV, errno.EINVAL, errno.ENOSYS}
 
-def sort_image_dir(*, excel, indir, outdir, institution):
+
+def sort_image_dir(*, excel, indir, outdir, institution, mode='copy', workers=None):
     """
     Sorts images which are stored in an input directory.
 
@@ -32,60 +54,171 @@ def sort_image_dir(*, excel, indir, outdir, institution):
     institution : str
         The name of the institution associated with the images being sorted.
 
+    mode : str, optional, default='copy'
+        How the images are placed in the output directory, one of PLACEMENT_MODES.
+        Hardlinks, reflinks and symlinks only cost metadata instead of copying the images.
+
+    workers : int, optional, default=None
+        The number of threads placing the images, which mainly helps on network shares.
+        If None or 1, the images are placed one after another.
+
     Returns:
     --------
-    None
-        This function does not return any value. It performs sorting and saves the result to the specified output directory.
+    dict[str, str]
+        Error messages of the images which could not be placed, by source path.
 
     Notes:
     ------
     - The `indir` path should be a valid directory in the filesystem.
     - The `outdir` path gets created if it does not exist
+    - Existing files in the output directory are replaced.
     """
-
-    # Loop through all sheets
-    for sheet_name in ['Day 1', 'Day 2', 'Day 3', 'Day 4', 'Day 5']:
-        # Read the sheet into a DataFrame
-        df = pd.read_excel(excel, sheet_name=sheet_name)
-
-        # Get the number of rows in the current sheet
-        num_rows = len(df)
-
-        # Loop through rows 20 to 44 (inclusive), which are rows 19 to 43 in 0-based indexing
-        # Make sure we don't go beyond the number of rows in the DataFrame
-        for row in range(19, min(44, num_rows)):  # Ensures no out-of-bounds error
-            material_name = df.iloc[row, 3]  # get material name from column D (index 3 in pandas)
-            specimen_size = df.iloc[row, 4]  # get specimen size from column E (index 4 in pandas)
-            specimen_thickness = df.iloc[row, 9]  # get specimen thickness from column J (index 9 in pandas)
-            specimen_thickness_with_mm = f"{specimen_thickness}mm"  # Append 'mm' to the specimen thickness
-            # Create subfolder name by combining the institution with material name, specimen size, and thickness
-            folder_name = f"{institution}-{material_name}_{specimen_size}_{specimen_thickness_with_mm}"
-
-            image_file_name = df.iloc[row, 1]  # get image file name from column B (index 1 in pandas)
-            # Add institution prefix to the image filename and append '_8bit.bmp'
-            image_file_name = f"{institution}-{image_file_name.strip()}_8bit.bmp"
-
-            # Construct the folder path for the new folder
-            # created from institution, material name, size and thickness
-            folder_path = os.path.join(outdir, folder_name)
-
-            # Create the folder if it doesn't exist
-            if not os.path.exists(folder_path):
-                os.makedirs(folder_path)
-
-            # Construct the full source file path (with the name from column B)
-            source_file_path = os.path.join(indir, image_file_name)
-
-            # Construct the destination file path (keeping the original filename)
-            destination_file_path = os.path.join(folder_path, image_file_name)
-
-            # Copy the image to the corresponding folder with the original name (including _8bit.bmp)
-            try:
-                copy2(source_file_path, destination_file_path)
-                print(f"Image '{image_file_name}' copied to '{folder_path}'")
-            except FileNotFoundError:
-                print(f"File '{source_file_path}' not found, skipping.")
-            except Exception as e:
-                print(f"Error processing file {source_file_path}: {e}")
+    if mode not in PLACEMENT_MODES:
+        raise ValueError(f"Unknown placement mode {mode!r}, expected one of {PLACEMENT_MODES}")
+
+    # Read all sheets of the test plan at once (cached, see smc_benchmark.testplan)
+    testplan = read_testplan(excel, first_row=FIRST_ROW, last_row=LAST_ROW)
+
+    # Collect source and destination of all specimens of the test plan
+    tasks = []
+    for specimen in testplan.itertuples(index=False):
+        folder_name = specimen_folder(specimen, institution)
+
+        # Add institution prefix to the image filename (column B) and append '_8bit.bmp'
+        image_file_name = f"{institution}-{specimen.file_name}_8bit.bmp"
+
+        # Construct the folder path for the new folder
+        # created from institution, material name, size and thickness
+        folder_path = Path(outdir) / folder_name
+
+        # Construct the full source file path (with the name from column B)
+        source_file_path = str(Path(indir) / image_file_name)
+
+        # Construct the destination file path (keeping the original filename)
+        destination_file_path = str(folder_path / image_file_name)
+        tasks.append((source_file_path, destination_file_path, mode))
+
+    # Create all folders at once
+    for folder_path in {Path(task[1]).parent for task in tasks}:
+        folder_path.mkdir(parents=True, exist_ok=True)
+
+    # Place the images in the corresponding folders with the original name (including _8bit.bmp)
+    errors = {}
+    for (source_file_path, destination_file_path, _), _, error in bounded_map(
+            _place, tasks, workers=workers, executor=ThreadPoolExecutor):
+        if error is None:
+            print(f"Image '{Path(source_file_path).name}' placed in "
+                  f"'{Path(destination_file_path).parent}' ({mode})")
+        elif isinstance(error, FileNotFoundError):
+            print(f"File '{source_file_path}' not found, skipping.")
+            errors[source_file_path] = str(error)
+        else:
+            print(f"Error processing file {source_file_path}: {error}")
+            errors[source_file_path] = str(error)
 
     print("Process completed.")
+    return errors
+
+
+def specimen_folder(specimen, institution):
+    """
+    Return the name of the folder of a specimen of the test plan, e.g., 'kit-CF503K_100_3mm'.
+    """
+    material_name = specimen.material  # material name from column D
+    specimen_size = f"{specimen.size:g}"  # specimen size from column E
+    specimen_thickness = f"{specimen.thickness:g}"  # specimen thickness from column J
+    specimen_thickness_with_mm = f"{specimen_thickness}mm"  # Append 'mm' to the specimen thickness
+    # Create subfolder name by combining the institution with material name, specimen size,
+    # and thickness
+    return f"{institution}-{material_name}_{specimen_size}_{specimen_thickness_with_mm}"
+
+
+def _place(task):
+    """
+    Place a source file at a destination, see place_image.
+    """
+    place_image(*task)
+
+
+def place_image(source, destination, mode='copy'):
+    """
+    Place a source file at a destination, replacing an existing file.
+
+    Parameters:
+    -----------
+    source : str | Path
+        The path of the source file.
+
+    destination : str | Path
+        The path of the destination, whose folder must exist.
+
+    mode : str, optional, default='copy'
+        How the file is placed, one of PLACEMENT_MODES.
+
+    Notes:
+    ------
+    - The file is placed under a temporary name in the destination folder first and then
+      renamed to the destination. An existing destination is thus replaced as a directory
+      entry and never written through, which would truncate the source if the destination
+      is a hardlink or symlink to it from an earlier run.
+    """
+    source, destination = Path(source), Path(destination)
+    if not source.exists():
+        raise FileNotFoundError(errno.ENOENT, "No such file", str(source))
+    if mode == 'hardlink' and _is_hardlink(source, destination):
+        # Renaming a file onto another link of the same file does nothing
+        return
+
+    temporary = destination.with_name(f".{destination.name}.{uuid.uuid4().hex}.tmp")
+    try:
+        if mode == 'copy':
+            copy2(source, temporary)
+        elif mode == 'reflink':
+            _reflink(source, temporary)
+        elif mode == 'hardlink':
+            os.link(source, temporary)
+        else:
+            temporary.symlink_to(source.absolute())
+        temporary.replace(destination)
+    except BaseException:
+        temporary.unlink(missing_ok=True)
+        raise
+
+
+def _is_hardlink(source, destination):
+    """
+    Check whether a destination is a directory entry (not a symlink) of the source file.
+    """
+    try:
+        link = Path(destination).lstat()
+    except FileNotFoundError:
+        return False
+    target = Path(source).stat()
+    return (link.st_dev, link.st_ino) == (target.st_dev, target.st_ino)
+
+
+def _reflink(source, destination):
+    """
+    Clone a file copy-on-write to a new file, falling back to a copy if the file system
+    does not support it.
+    """
+    try:
+        import fcntl
+    except ImportError:
+        # Not available on Windows
+        copy2(source, destination)
+        return
+
+    with Path(source).open('rb') as src, Path(destination).open('xb') as dst:
+        try:
+            fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+            cloned = True
+        except OSError as e:
+            if e.errno not in _NO_REFLINK:
+                raise
+            cloned = False
+    if cloned:
+        # Preserve the metadata, as copy2 does
+        copystat(source, destination)
+    else:
+        copy2(source, destination)
@@ -0,0 +1,143 @@
+"""Test plans: the Excel workbooks listing the specimens of each day of the benchmark.
+
+The workbook is parsed once into a typed table, which is cached on disk and only parsed
+again when the workbook changes, see :mod:`smc_benchmark.cache`.
+"""
+
+import logging
+
+import numpy as np
+import pandas as pd
+
+from smc_benchmark import cache as _cache
+
+logger = logging.getLogger(__name__)
+
+# Sheets of the test plan, one per day
+SHEETS = ("Day 1", "Day 2", "Day 3", "Day 4", "Day 5")
+
+# Default Excel rows (1-based, inclusive) listing the specimens of a day, i.e., all rows
+# below the header in row 19. Callers pass narrower ranges where needed.
+FIRST_ROW = 20
+LAST_ROW = None
+
+# Columns of the test plan table
+SHEET = "sheet"
+ROW = "row"
+FILE_NAME = "file_name"
+MATERIAL = "material"
+SIZE = "size"
+THICKNESS = "thickness"
+WEIGHT = "weight"
+MEASURED_THICKNESS = "measured_thickness"
+DENSITY = "density"
+
+# Excel columns (0-based) of the specimen properties, i.e., B, D, E, J, K, L, M
+EXCEL_COLUMNS = {
+    FILE_NAME: 1,
+    MATERIAL: 3,
+    SIZE: 4,
+    THICKNESS: 9,
+    WEIGHT: 10,
+    MEASURED_THICKNESS: 11,
+    DENSITY: 12,
+}
+
+# Numeric columns
+NUMERIC = (SIZE, THICKNESS, WEIGHT, MEASURED_THICKNESS, DENSITY)
+
+# Namespace of test plans in the on-disk cache
+_CACHE_NAMESPACE = "testplan"
+
+# Bump whenever the parser changes its output, independent of the experiment cache
+CACHE_VERSION = 1
+
+
+def read_testplan(excel, *, first_row=FIRST_ROW, last_row=LAST_ROW, cache=True):
+    """Read the specimens of all days of a test plan.
+
+    Parameters
+    ----------
+    excel : str | pathlib.Path
+        Path to the Excel file containing the test plan of an institution.
+    first_row : int, optional
+        First Excel row (1-based) of the specimens, defaults to 20.
+    last_row : int | None, optional
+        Last Excel row (1-based, inclusive) of the specimens. If None (default), all rows
+        from ``first_row`` on are read.
+    cache : bool, optional
+        If True (default), the parsed table is cached on disk and reused as long as the
+        size and modification time of the workbook are unchanged.
+
+    Returns
+    -------
+    pd.DataFrame
+        One row per specimen, in the order of the test plan, with the columns
+
+        - ``sheet``, ``row``: sheet and Excel row (1-based) of the specimen,
+        - ``file_name``: name of the specimen, e.g., 'CF503K-1', used to name its images,
+        - ``material``: name of the material,
+        - ``size``: side length in mm,
+        - ``thickness``: nominal thickness in mm,
+        - ``weight``: weight in g,
+        - ``measured_thickness``: measured thickness in mm,
+        - ``density``: density in kg/m³.
+
+        Rows without file name are skipped. Missing or invalid numbers are NaN.
+    """
+    # Tables of different row ranges are cached separately
+    variant = f"rows{first_row}-{'' if last_row is None else last_row}"
+    if cache:
+        table = _cache.load_table(_CACHE_NAMESPACE, excel, CACHE_VERSION, variant)
+        if table is not None:
+            return table
+
+    # Parse all sheets in one pass over the workbook
+    sheets = pd.read_excel(excel, sheet_name=list(SHEETS), header=None)
+    table = pd.concat(
+        [_parse_sheet(name, sheets[name], first_row, last_row) for name in SHEETS],
+        ignore_index=True,
+    )
+    _validate(table, excel)
+
+    if cache:
+        _cache.store_table(_CACHE_NAMESPACE, excel, table, CACHE_VERSION, variant)
+    return table
+
+
+def _parse_sheet(name, raw, first_row, last_row):
+    """Extract the typed specimen table from the given rows of the raw cells of a sheet."""
+    n_columns = max(EXCEL_COLUMNS.values()) + 1
+    raw = raw.iloc[first_row - 1 : last_row].reindex(columns=range(n_columns))
+    file_names = raw[EXCEL_COLUMNS[FILE_NAME]]
+    file_names = file_names.where(file_names.isna(), file_names.astype(str).str.strip())
+    raw = raw[file_names.notna() & (file_names != "")]
+
+    table = {
+        SHEET: np.full(len(raw), name),
+        ROW: raw.index.to_numpy(dtype=np.int64) + 1,
+        FILE_NAME: file_names[raw.index].to_numpy(dtype=str),
+        MATERIAL: raw[EXCEL_COLUMNS[MATERIAL]].fillna("").astype(str).str.strip().to_numpy(),
+    }
+    for column in NUMERIC:
+        values = raw[EXCEL_COLUMNS[column]]
+        numbers = pd.to_numeric(values, errors="coerce")
+        for row in values.index[values.notna() & numbers.isna()]:
+            logger.warning(f"Invalid {column} {values[row]!r} in sheet '{name}', row {row + 1}.")
+        table[column] = numbers.to_numpy(dtype=np.float64)
+    return pd.DataFrame(table)
+
+
+def _validate(table, excel):
+    """Warn about specimens with missing properties or duplicate file names."""
+    for row in table.itertuples(index=False):
+        missing = [MATERIAL] if row.material == "" else []
+        missing += [c for c in (SIZE, THICKNESS) if np.isnan(getattr(row, c))]
+        if missing:
+            logger.warning(
+                f"Specimen {row.file_name} in sheet '{row.sheet}', row {row.row} of {excel} "
+                f"is missing {', '.join(missing)}."
+            )
+    duplicates = table[FILE_NAME][table[FILE_NAME].duplicated()].unique()
+    if len(duplicates):
+        logger.warning(f"Duplicate file names in {excel}: {', '.join(duplicates)}")
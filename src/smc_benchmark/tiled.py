@@ -0,0 +1,225 @@
+"""Memory-bounded conversion of large scans to 8-bit grayscale, band by band.
+
+Uncompressed BMP scans are memory-mapped and processed in horizontal bands of rows: each
+band is converted to grayscale, resampled by pixel area averaging, and written to an
+8-bit BMP output, which is also memory-mapped. The peak memory per image is thus a small
+multiple of one band instead of the full-resolution frame. Other formats cannot be
+decoded in bands and are decoded fully, JPEG images at reduced resolution.
+"""
+
+import logging
+import math
+import pathlib as pl
+import struct
+
+import cv2
+import numpy as np
+from PIL import Image
+
+logger = logging.getLogger(__name__)
+
+# Default number of input rows per band
+BAND_HEIGHT = 256
+
+# Resolution assumed for scans without DPI metadata
+DEFAULT_DPI = 600
+
+# Meters per inch, BMP headers store the resolution in pixels per meter
+INCH = 0.0254
+
+# Size of the BMP file header and of the BITMAPINFOHEADER
+_FILE_HEADER_SIZE = 14
+_INFO_HEADER_SIZE = 40
+
+
+class BmpBands:
+    """Read rows of an uncompressed BMP file as 8-bit grayscale, without loading the file.
+
+    Supports 8-bit (palette), 24-bit and 32-bit uncompressed BMP files.
+
+    Parameters
+    ----------
+    path : str | pathlib.Path
+        Path to the BMP file.
+
+    Raises
+    ------
+    ValueError
+        If the file is not an uncompressed BMP file of a supported bit depth.
+    """
+
+    def __init__(self, path):
+        with pl.Path(path).open("rb") as f:
+            header = f.read(_FILE_HEADER_SIZE + _INFO_HEADER_SIZE)
+            if len(header) < _FILE_HEADER_SIZE + _INFO_HEADER_SIZE or header[:2] != b"BM":
+                raise ValueError(f"Not a BMP file: {path}")
+            offset, dib_size = struct.unpack_from("<II", header, 10)
+            width, height, _, bits, compression = struct.unpack_from("<iiHHI", header, 18)
+            if dib_size < _INFO_HEADER_SIZE or compression != 0 or bits not in (8, 24, 32):
+                raise ValueError(f"Unsupported BMP file (compressed or {bits} bit): {path}")
+            lut = None
+            if bits == 8:
+                f.seek(_FILE_HEADER_SIZE + dib_size)
+                palette = np.frombuffer(f.read(4 * 256), dtype=np.uint8).reshape(-1, 4)
+                lut = np.zeros(256, dtype=np.uint8)
+                lut[: len(palette)] = cv2.cvtColor(palette[None, :, :3], cv2.COLOR_BGR2GRAY)[0]
+
+        self.width = width
+        self.height = abs(height)
+        self._bottom_up = height > 0
+        self._channels = bits // 8
+        self._lut = lut
+        stride = (width * bits + 31) // 32 * 4
+        self._pixels = np.memmap(path, dtype=np.uint8, mode="r", offset=offset,
+                                 shape=(self.height, stride))
+
+    def rows(self, start, stop):
+        """Return the rows ``start`` to ``stop`` (top to bottom) as 8-bit grayscale."""
+        if self._bottom_up:
+            band = self._pixels[self.height - stop : self.height - start][::-1]
+        else:
+            band = self._pixels[start:stop]
+        band = np.ascontiguousarray(band[:, : self.width * self._channels])
+        if self._channels == 1:
+            return self._lut[band]
+        band = band.reshape(stop - start, self.width, self._channels)
+        code = cv2.COLOR_BGR2GRAY if self._channels == 3 else cv2.COLOR_BGRA2GRAY
+        return cv2.cvtColor(band, code)
+
+
+class ArrayBands:
+    """Rows of any image format supported by PIL, decoded fully as 8-bit grayscale.
+
+    Parameters
+    ----------
+    path : str | pathlib.Path
+        Path to the image.
+    size : tuple[int, int] | None, optional
+        Final size of the image. JPEG images are decoded at the lowest resolution that is
+        at least this size. None (default) decodes at full resolution.
+    """
+
+    def __init__(self, path, size=None):
+        with Image.open(path) as img:
+            if size is not None:
+                img.draft("L", size)
+            self._pixels = np.asarray(img.convert("L"))
+        self.height, self.width = self._pixels.shape
+
+    def rows(self, start, stop):
+        """Return the rows ``start`` to ``stop`` as 8-bit grayscale."""
+        return self._pixels[start:stop]
+
+
+def open_bands(path, size=None):
+    """Open an image for reading in bands.
+
+    Returns a :class:`BmpBands` for uncompressed BMP files, else an :class:`ArrayBands`.
+    """
+    try:
+        return BmpBands(path)
+    except ValueError:
+        return ArrayBands(path, size)
+
+
+def image_size(path):
+    """Return the width, height and horizontal DPI (None if unknown) of an image."""
+    with Image.open(path) as img:
+        dpi = img.info.get("dpi", (0, 0))[0]
+        return img.width, img.height, dpi or None
+
+
+def create_bmp(path, width, height, dpi):
+    """Create an 8-bit grayscale BMP file and memory-map its rows.
+
+    Parameters
+    ----------
+    path : str | pathlib.Path
+        Path to the BMP file, which is overwritten.
+    width, height : int
+        Size of the image.
+    dpi : float
+        Resolution of the image.
+
+    Returns
+    -------
+    np.memmap
+        Writable array of shape (height, width), top row first.
+    """
+    stride = (width + 3) // 4 * 4
+    offset = _FILE_HEADER_SIZE + _INFO_HEADER_SIZE + 4 * 256
+    ppm = round(dpi / INCH)
+    with pl.Path(path).open("wb") as f:
+        f.write(struct.pack("<2sIHHI", b"BM", offset + stride * height, 0, 0, offset))
+        f.write(struct.pack("<IiiHHIIiiII", _INFO_HEADER_SIZE, width, height, 1, 8, 0,
+                            stride * height, ppm, ppm, 256, 0))
+        gray = np.arange(256, dtype=np.uint8)
+        f.write(np.stack([gray, gray, gray, np.zeros_like(gray)], axis=1).tobytes())
+        f.truncate(offset + stride * height)
+    pixels = np.memmap(path, dtype=np.uint8, mode="r+", offset=offset, shape=(height, stride))
+    # Bottom-up row order, as expected by most BMP readers
+    return pixels[::-1, :width]
+
+
+def area_weights(n_in, n_out, start, stop):
+    """Return the pixel area weights of output rows ``start`` to ``stop``.
+
+    Returns
+    -------
+    tuple[np.ndarray, int, int]
+        The weights of shape (stop - start, last - first) and the range ``first`` to
+        ``last`` of input rows they apply to.
+    """
+    scale = n_in / n_out
+    lower = np.arange(start, stop) * scale
+    upper = lower + scale
+    first = math.floor(lower[0])
+    last = min(math.ceil(upper[-1]), n_in)
+    rows = np.arange(first, last)
+    overlap = np.minimum(upper[:, None], rows + 1) - np.maximum(lower[:, None], rows)
+    return np.clip(overlap, 0, None) / scale, first, last
+
+
+def convert_tiled(image_path, output_path, target_dpi, band_height=BAND_HEIGHT):
+    """Convert an image to an 8-bit grayscale BMP at a target DPI, band by band.
+
+    The grayscale conversion uses the luma weights of ``cv2.COLOR_BGR2GRAY``, and the
+    resampling averages pixel areas, like ``cv2.INTER_AREA``.
+
+    Parameters
+    ----------
+    image_path : str | pathlib.Path
+        Path to the image.
+    output_path : str | pathlib.Path
+        Path to the BMP file to write.
+    target_dpi : int
+        Resolution of the output image.
+    band_height : int, optional
+        Number of input rows processed at a time. Defaults to 256.
+
+    Returns
+    -------
+    tuple[int, int]
+        The width and height of the output image.
+    """
+    width, height, dpi = image_size(image_path)
+    if dpi is None:
+        logger.warning(
+            f"Invalid or no DPI metadata found for {image_path}. Defaulting to {DEFAULT_DPI} DPI."
+        )
+        dpi = DEFAULT_DPI
+    scale = target_dpi / dpi
+    new_width, new_height = int(width * scale), int(height * scale)
+
+    source = open_bands(image_path, (new_width, new_height))
+    output = create_bmp(output_path, new_width, new_height, target_dpi)
+    rows_per_band = max(1, int(band_height * new_height / source.height))
+    for start in range(0, new_height, rows_per_band):
+        stop = min(start + rows_per_band, new_height)
+        weights, first, last = area_weights(source.height, new_height, start, stop)
+        band = source.rows(first, last).astype(np.float32)
+        band = cv2.resize(band, (new_width, last - first), interpolation=cv2.INTER_AREA)
+        output[start:stop] = np.clip(np.rint(weights @ band), 0, 255).astype(np.uint8)
+    output.flush()
+    del output
+    return new_width, new_height
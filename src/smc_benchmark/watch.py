@@ -0,0 +1,155 @@
+"""Incremental reading of data folders which are still being filled."""
+
+import logging
+import pathlib as pl
+import time
+from functools import partial
+
+from smc_benchmark._utils import parallel_map
+from smc_benchmark.cache import fingerprint
+from smc_benchmark.read import FILE_EXTENSION, NUMBER_TO_CONFIG_KIT, _decode, _read_file
+
+logger = logging.getLogger(__name__)
+
+
+class IncrementalReader:
+    """Keep the result of :func:`~smc_benchmark.read.read` up to date with a data folder.
+
+    Each call of :meth:`update` only parses files which are new or whose size or
+    modification time changed since they were last parsed. With the on-disk cache
+    enabled, restarting a reader on a folder only parses files changed in the meantime.
+
+    Parameters
+    ----------
+    institution : str
+        Abbreviation of institution where the data was collected, e.g., 'kit' or 'ut'.
+    folder : str | pathlib.Path
+        Path to the folder containing the data.
+    cache, workers, dtype, decimate, derive
+        See :func:`~smc_benchmark.read.read`.
+    """
+
+    def __init__(
+        self,
+        institution,
+        folder,
+        *,
+        cache=True,
+        workers=None,
+        dtype=None,
+        decimate=None,
+        derive=None,
+    ):
+        self.institution = institution
+        self.folder = pl.Path(folder)
+        self.workers = workers
+        self._loader = partial(
+            _read_file, institution, use_cache=cache, dtype=dtype, decimate=decimate, derive=derive
+        )
+        self._fingerprints = {}
+        self._experiments = {}
+
+    @property
+    def data(self):
+        """dict[str, dict[str, list[pd.DataFrame]]]: Experimental data read so far."""
+        all_data = {}
+        for file in sorted(self._experiments, key=_decode):
+            material, number = _decode(file)
+            configs = all_data.setdefault(material, {})
+            configs.setdefault(NUMBER_TO_CONFIG_KIT[number], []).append(self._experiments[file])
+        return all_data
+
+    def update(self):
+        """Read new and changed files, and forget deleted ones.
+
+        Files which cannot be parsed, e.g., because they are still being written, or which
+        disappear while they are read, e.g., because they are being moved, are retried on
+        the next update.
+
+        Returns
+        -------
+        set[tuple[str, str]]
+            (material, config) of all changed experiments.
+        """
+        if not self.folder.exists():
+            raise FileNotFoundError(f"Folder not found: {self.folder}")
+        current = {}
+        for file in self.folder.glob(FILE_EXTENSION[self.institution]):
+            try:
+                current[file] = fingerprint(file)
+            except OSError as e:
+                logger.warning(f"Could not read {file}, retrying on next update: {e}")
+        changed = sorted(
+            (file for file, fp in current.items() if self._fingerprints.get(file) != fp),
+            key=_decode,
+        )
+        removed = [file for file in self._fingerprints if file not in current]
+
+        groups = set()
+        for file in removed:
+            del self._fingerprints[file]
+            del self._experiments[file]
+            groups.add(self._group(file))
+
+        experiments = parallel_map(partial(_try_load, self._loader), changed, self.workers)
+        for file, pd_data in zip(changed, experiments):
+            if pd_data is None:
+                continue
+            self._fingerprints[file] = current[file]
+            self._experiments[file] = pd_data
+            groups.add(self._group(file))
+        return groups
+
+    @staticmethod
+    def _group(file):
+        """Return (material, config) of a data file."""
+        material, number = _decode(file)
+        return material, NUMBER_TO_CONFIG_KIT[number]
+
+
+def _try_load(loader, file):
+    """Read a file, returning None if it cannot be parsed (yet)."""
+    try:
+        return loader(file)
+    except (ValueError, OSError) as e:
+        logger.warning(f"Could not read {file}, retrying on next update: {e}")
+        return None
+
+
+def watch(institution, folder, callback, *, interval=10.0, max_updates=None, **kwargs):
+    """Watch a data folder and call back whenever experiments are added or changed.
+
+    Parameters
+    ----------
+    institution : str
+        Abbreviation of institution where the data was collected, e.g., 'kit' or 'ut'.
+    folder : str | pathlib.Path
+        Path to the folder containing the data.
+    callback : callable
+        Called as ``callback(data, groups)`` with the data read so far and the
+        (material, config) of the changed experiments.
+    interval : float, optional
+        Time between polls of the folder in seconds. Defaults to 10 s.
+    max_updates : int | None, optional
+        Stop after this many polls. None (default) watches until interrupted.
+    **kwargs
+        Passed to :class:`IncrementalReader`.
+
+    Returns
+    -------
+    IncrementalReader
+        The reader holding the data read so far.
+    """
+    reader = IncrementalReader(institution, folder, **kwargs)
+    updates = 0
+    try:
+        while max_updates is None or updates < max_updates:
+            groups = reader.update()
+            if groups:
+                callback(reader.data, groups)
+            updates += 1
+            if max_updates is None or updates < max_updates:
+                time.sleep(interval)
+    except KeyboardInterrupt:
+        pass
+    return reader
@@ -0,0 +1,46 @@
+import numpy as np
+import pandas as pd
+import pytest as pt
+
+
+@pt.fixture(autouse=True)
+def cache_dir(tmp_path):
+    """Use a fresh cache directory for every test."""
+    from smc_benchmark.cache import set_cache_dir
+
+    set_cache_dir(tmp_path / "cache")
+    yield tmp_path / "cache"
+    set_cache_dir(None)
+
+
+@pt.fixture
+def write_testplan():
+    """Return a function writing a test plan workbook, see :func:`_write_testplan`."""
+    pt.importorskip("openpyxl")
+    return _write_testplan
+
+
+def _write_testplan(path, n=3):
+    """Write a test plan with n specimens per day, named 'CF503K-<day><i>'.
+
+    The specimens start in the first row sorted by :mod:`smc_benchmark.sort`, remarks follow
+    below its last row.
+    """
+    from smc_benchmark import sort, testplan
+
+    with pd.ExcelWriter(path) as writer:
+        for day, sheet in enumerate(testplan.SHEETS, start=1):
+            cells = np.full((sort.LAST_ROW + 2, 13), None, dtype=object)
+            cells[0, 0] = "Test plan"
+            cells[18, 1] = "Specimen"  # header row above the specimens
+            for i in range(n):
+                row = sort.FIRST_ROW - 1 + i
+                cells[row, 1] = f" CF503K-{day}{i} "
+                cells[row, 3] = "CF503K"
+                cells[row, 4] = 100
+                cells[row, 9] = 3 if i < 2 else 2.5
+                cells[row, 10] = 60.0 + i
+                cells[row, 11] = 3.1
+                cells[row, 12] = "tbd" if i == 2 else 1900
+            cells[sort.LAST_ROW + 1, 1] = "Remarks below the specimens"
+            pd.DataFrame(cells).to_excel(writer, sheet_name=sheet, header=False, index=False)
@@ -0,0 +1,43 @@
+import pathlib as pl
+
+import numpy as np
+
+folders = {"kit": pl.Path("tests/data/kit"), "ut": pl.Path("tests/data/utw")}
+
+
+def test_archive(tmp_path):
+    """Test export of an archive and zero-copy queries."""
+    from smc_benchmark.archive import export_archive, open_archive
+    from smc_benchmark.read import read
+
+    export_archive(tmp_path / "archive", folders)
+    archive = open_archive(tmp_path / "archive")
+    assert len(archive) == 2
+    assert list(archive.index["institution"]) == ["kit", "ut"]
+    assert archive.index["thickness"].iloc[1] == 8.81
+    assert list(archive.channels) == ["t", "F", "d", "h", "L1", "L2"]
+
+    for institution, folder in folders.items():
+        (channels,) = archive.query(institution=institution, material="CF503K", number=[1, 2])
+        expected = read(institution, folder)["CF503K"]["7mm 100x100"][0]
+        for channel, values in channels.items():
+            assert isinstance(values, np.memmap)
+            if channel in expected.columns:
+                np.testing.assert_array_equal(values, expected[channel].to_numpy())
+            else:
+                assert np.isnan(values).all()
+
+    assert archive.query(config="3mm 50x50") == []
+    assert len(archive.select(config="7mm 100x100")) == 2
+
+
+def test_archive_empty(tmp_path):
+    """Test that an archive without experiments can be opened."""
+    from smc_benchmark.archive import CHANNELS, export_archive
+
+    (tmp_path / "kit").mkdir()
+    archive = export_archive(tmp_path / "archive", {"kit": tmp_path / "kit"})
+    assert len(archive) == 0
+    assert archive.query(material="CF503K") == []
+    assert list(archive.channels) == CHANNELS
+    assert {"institution", "start", "stop", "date"} <= set(archive.index.columns)
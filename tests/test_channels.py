@@ -0,0 +1,22 @@
+import numpy as np
+import pandas as pd
+
+
+def test_add_channels():
+    """Test that derived channels of polynomial signals are exact, including the edges."""
+    from smc_benchmark.channels import add_channels
+
+    t = np.arange(200) * 0.01
+    df = pd.DataFrame({"t": t, "d": t**3 - 2 * t, "F": 5 * t**2 + 1, "h": 10 - t**2})
+    frames = add_channels([df, df.iloc[:120], df.iloc[:5]], window=11, polyorder=3)
+
+    for frame in frames[:2]:
+        t = frame["t"].to_numpy()
+        np.testing.assert_allclose(frame["v"], 3 * t**2 - 2, atol=1e-9)
+        np.testing.assert_allclose(frame["F_s"], frame["F"], atol=1e-9)
+        # dF/dh = 10 t / (-2 t), undefined at standstill for t = 0
+        assert np.isnan(frame["dF/dh"].iloc[0])
+        np.testing.assert_allclose(frame["dF/dh"].iloc[1:], -5, atol=1e-6)
+
+    # Experiments shorter than the window
+    assert frames[2]["v"].isna().all()
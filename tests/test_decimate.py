@@ -0,0 +1,38 @@
+import numpy as np
+import pytest as pt
+
+
+def test_lttb_indices():
+    """Test that LTTB keeps end points and peaks of a curve."""
+    from smc_benchmark.decimate import lttb_indices
+
+    x = np.linspace(0, 1, 1001)
+    y = np.zeros_like(x)
+    y[[123, 500, 877]] = [1.0, -2.0, 3.0]
+
+    indices = lttb_indices(x, y, 10)
+    assert len(indices) == 10
+    assert indices[0] == 0 and indices[-1] == 1000
+    assert np.all(np.diff(indices) > 0)
+    assert {123, 500, 877} <= set(indices)
+
+    assert np.array_equal(lttb_indices(x[:5], y[:5], 10), np.arange(5))
+    with pt.raises(ValueError):
+        lttb_indices(x, y, 2)
+
+
+def test_read_decimate_float32():
+    """Test decimation and float32 storage at ingestion."""
+    import pathlib as pl
+
+    from smc_benchmark.read import read
+
+    full = read("kit", pl.Path("tests/data/kit"), lazy=True)["CF503K"]["7mm 100x100"][0]
+    compact = read("kit", pl.Path("tests/data/kit"), lazy=True, dtype="float32", decimate=500)
+    compact = compact["CF503K"]["7mm 100x100"][0]
+
+    assert len(compact.data) == 500
+    assert all(dtype == np.float32 for dtype in compact.data.dtypes)
+    assert compact.data["F"].max() == pt.approx(full.data["F"].max(), rel=0.02)
+    assert compact.data.attrs["header"] == full.header
+    assert len(compact.raw) == len(full.data)
@@ -0,0 +1,65 @@
+import pathlib as pl
+
+import numpy as np
+import pandas as pd
+import pytest as pt
+
+folders = {"kit": pl.Path("tests/data/kit"), "ut": pl.Path("tests/data/utw")}
+
+
+def test_extract_features():
+    """Test batch features against a straightforward computation per experiment."""
+    from smc_benchmark.features import extract_features
+    from smc_benchmark.read import read
+
+    data = {name: read(name, folder, lazy=True) for name, folder in folders.items()}
+    features = extract_features(data, force_thresholds=[1000])
+    assert list(features.index) == [
+        ("kit", "CF503K", "7mm 100x100", 1),
+        ("ut", "CF503K", "7mm 100x100", 1),
+    ]
+
+    kit = data["kit"]["CF503K"]["7mm 100x100"][0].data
+    h, f, t = kit["h"].to_numpy(), kit["F"].to_numpy(), kit["t"].to_numpy()
+    expected = {
+        "peak_force": f.max(),
+        "gap_at_1000N": h[np.flatnonzero(f >= 1000)[0]],
+        "final_gap": h[-1],
+        "work": np.sum(0.5 * (f[1:] + f[:-1]) * (h[:-1] - h[1:])) / 1000,
+        "time_to_target": t[np.flatnonzero(h <= 7.01)[0]],
+    }
+    assert features.iloc[0].to_dict() == pt.approx(expected)
+
+    ut = features.iloc[1]
+    assert ut["peak_force"] == data["ut"]["CF503K"]["7mm 100x100"][0].data["F"].max()
+    assert np.isnan(ut[["gap_at_1000N", "final_gap", "work", "time_to_target"]]).all()
+
+
+def test_extract_features_eager():
+    """Test that eagerly read DataFrames give the same features as experiment handles."""
+    from smc_benchmark.features import extract_features
+    from smc_benchmark.read import read
+
+    eager = {name: read(name, folder) for name, folder in folders.items()}
+    lazy = {name: read(name, folder, lazy=True) for name, folder in folders.items()}
+    pd.testing.assert_frame_equal(extract_features(eager), extract_features(lazy))
+
+
+def test_extract_features_empty():
+    """Test that experiments without samples yield NaN features."""
+    from smc_benchmark.features import extract_features
+    from smc_benchmark.read import read
+
+    data = read("kit", folders["kit"])
+    empty = data["CF503K"]["7mm 100x100"][0].iloc[:0]
+    features = extract_features([empty, empty], force_thresholds=[1000])
+    assert list(features.columns) == [
+        "peak_force", "gap_at_1000N", "final_gap", "work", "time_to_target"
+    ]
+    assert len(features) == 2
+    assert features.isna().all().all()
+
+    # Empty experiments next to non-empty ones
+    features = extract_features([empty, data["CF503K"]["7mm 100x100"][0]])
+    assert features.iloc[0].isna().all()
+    assert features.iloc[1].notna().all()
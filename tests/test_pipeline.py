@@ -0,0 +1,120 @@
+import json
+
+import numpy as np
+from PIL import Image
+
+
+def _write_scans(folder, names):
+    folder.mkdir(exist_ok=True)
+    for name in names:
+        pixels = np.full((120, 80, 3), 200, dtype=np.uint8)
+        Image.fromarray(pixels).save(folder / f"{name}.bmp", dpi=(600, 600))
+
+
+def _journal(outdir):
+    from smc_benchmark.pipeline import JOURNAL_NAME
+
+    with (outdir / JOURNAL_NAME).open() as f:
+        return [json.loads(line) for line in f]
+
+
+def test_run_pipeline(tmp_path, write_testplan):
+    from smc_benchmark.pipeline import run_pipeline
+
+    write_testplan(tmp_path / "plan.xlsx", n=2)
+    _write_scans(tmp_path / "scans", ["kit-CF503K-10", "kit-CF503K-11", "kit-unknown"])
+    kwargs = {"excel": tmp_path / "plan.xlsx", "indir": tmp_path / "scans",
+              "outdir": tmp_path / "out", "institution": "kit", "segment": False, "workers": 2}
+
+    errors = run_pipeline(**kwargs)
+
+    assert list(errors) == [str(tmp_path / "scans" / "kit-unknown.bmp")]
+    assert "not in the test plan" in errors[str(tmp_path / "scans" / "kit-unknown.bmp")]
+    sorted_image = tmp_path / "out" / "sorted" / "kit-CF503K_100_3mm" / "kit-CF503K-10_8bit.bmp"
+    with Image.open(sorted_image) as img:
+        assert img.mode == "L"
+        assert img.size == (20, 30)
+    assert len(_journal(tmp_path / "out")) == 5  # 3 preprocessed, 2 sorted
+
+    # Nothing to do on a second run
+    run_pipeline(**kwargs)
+    assert len(_journal(tmp_path / "out")) == 5
+
+    # A changed scan runs through all stages again, changed sorting parameters only sort again
+    _write_scans(tmp_path / "scans", ["kit-CF503K-11"])
+    run_pipeline(**kwargs)
+    records = _journal(tmp_path / "out")[5:]
+    assert [(r["stage"], r["image"].endswith("11.bmp")) for r in records] == [
+        ("preprocess", True), ("sort", True)
+    ]
+    run_pipeline(**kwargs, mode="hardlink")
+    records = _journal(tmp_path / "out")[7:]
+    assert sorted(r["stage"] for r in records) == ["sort", "sort"]
+    assert sorted_image.samefile(tmp_path / "out" / "preprocessed" / sorted_image.name)
+
+
+def test_run_pipeline_resumes(tmp_path, write_testplan):
+    from smc_benchmark.pipeline import JOURNAL_NAME, run_pipeline
+
+    write_testplan(tmp_path / "plan.xlsx", n=2)
+    _write_scans(tmp_path / "scans", ["kit-CF503K-10", "kit-CF503K-11"])
+    kwargs = {"excel": tmp_path / "plan.xlsx", "indir": tmp_path / "scans",
+              "outdir": tmp_path / "out", "institution": "kit", "segment": False}
+    run_pipeline(**kwargs)
+
+    # Interrupted while writing the last record: only the missing stage runs again
+    journal = tmp_path / "out" / JOURNAL_NAME
+    lines = journal.read_text().splitlines()
+    journal.write_text("\n".join(lines[:-1]) + "\n" + lines[-1][:10])
+    run_pipeline(**kwargs)
+
+    records = _journal_lines(journal)
+    assert len(records) == len(lines)
+    assert records[-1]["stage"] == "sort"
+
+
+def _journal_lines(path):
+    records = []
+    for line in path.read_text().splitlines():
+        try:
+            records.append(json.loads(line))
+        except ValueError:
+            continue
+    return records
+
+
+def test_run_pipeline_replaces_links(tmp_path, write_testplan):
+    from smc_benchmark.pipeline import run_pipeline
+
+    write_testplan(tmp_path / "plan.xlsx", n=1)
+    _write_scans(tmp_path / "scans", ["kit-CF503K-10"])
+    kwargs = {"excel": tmp_path / "plan.xlsx", "indir": tmp_path / "scans",
+              "outdir": tmp_path / "out", "institution": "kit", "segment": False}
+    preprocessed = tmp_path / "out" / "preprocessed" / "kit-CF503K-10_8bit.bmp"
+
+    for mode in ("hardlink", "reflink", "symlink", "copy"):
+        assert run_pipeline(**kwargs, mode=mode) == {}
+        with Image.open(preprocessed) as img:
+            assert img.size == (20, 30)
+    placed = tmp_path / "out" / "sorted" / "kit-CF503K_100_3mm" / preprocessed.name
+    assert placed.read_bytes() == preprocessed.read_bytes()
+    assert not placed.samefile(preprocessed)
+
+
+def test_run_pipeline_removes_stale_cutout(tmp_path, write_testplan):
+    from smc_benchmark.pipeline import SEGMENT_LOG_NAME, run_pipeline
+
+    write_testplan(tmp_path / "plan.xlsx", n=1)
+    _write_scans(tmp_path / "scans", ["kit-CF503K-10"])
+    stale = tmp_path / "out" / "segmented" / "kit-CF503K_100_3mm" / "kit-CF503K-10_8bit.bmp"
+    stale.parent.mkdir(parents=True)
+    stale.write_bytes(b"cutout of an earlier run")
+
+    # The blank scan contains no object, so its segmentation fails
+    errors = run_pipeline(excel=tmp_path / "plan.xlsx", indir=tmp_path / "scans",
+                          outdir=tmp_path / "out", institution="kit", backend="classical")
+
+    assert list(errors) == [str(tmp_path / "scans" / "kit-CF503K-10.bmp")]
+    assert errors[str(tmp_path / "scans" / "kit-CF503K-10.bmp")].startswith("segment: ")
+    assert not stale.exists()
+    assert "Error processing" in (tmp_path / "out" / SEGMENT_LOG_NAME).read_text()
@@ -0,0 +1,18 @@
+import os
+import pathlib as pl
+
+
+def test_plot_gap_force(tmp_path):
+    """Test that figures are only rendered again if their data changed."""
+    from smc_benchmark.plot import plot_gap_force
+
+    indir = pl.Path("tests/data/kit")
+    fig_path = tmp_path / "CF503K_7mm 100x100.png"
+
+    assert plot_gap_force(institution="kit", indir=indir, outdir=tmp_path, dpi=50) == [fig_path]
+    assert fig_path.exists()
+    assert plot_gap_force(institution="kit", indir=indir, outdir=tmp_path, dpi=50) == []
+
+    # Figure older than its data
+    os.utime(fig_path, ns=(0, 0))
+    assert plot_gap_force(institution="kit", indir=indir, outdir=tmp_path, dpi=50) == [fig_path]
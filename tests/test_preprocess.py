@@ -0,0 +1,165 @@
+import logging
+
+import numpy as np
+import pytest as pt
+from PIL import Image
+
+
+def _write_images(folder, n=3):
+    folder.mkdir()
+    rng = np.random.default_rng(0)
+    for i in range(n):
+        pixels = rng.integers(0, 256, size=(120, 80, 3), dtype=np.uint8)
+        Image.fromarray(pixels).save(folder / f"image_{i}.png", dpi=(600, 600))
+
+
+def test_convert_dpi_and_resize(tmp_path):
+    from smc_benchmark.preprocess import convert_dpi_and_resize
+
+    _write_images(tmp_path / "in")
+    (tmp_path / "in" / "broken.png").write_bytes(b"not an image")
+
+    errors = convert_dpi_and_resize(
+        input_folder=tmp_path / "in", output_folder=tmp_path / "out", target_dpi=150, workers=2,
+        batch_size=2,
+    )
+
+    assert list(errors) == [str(tmp_path / "in" / "broken.png")]
+    for i in range(3):
+        with Image.open(tmp_path / "out" / f"image_{i}.png") as img:
+            assert img.size == (20, 30)
+            assert round(img.info["dpi"][0]) == 150
+
+
+def test_convert_dpi_and_resize_serial(tmp_path):
+    from smc_benchmark.preprocess import convert_dpi_and_resize
+
+    _write_images(tmp_path / "in", n=2)
+    errors = convert_dpi_and_resize(input_folder=tmp_path / "in", output_folder=tmp_path / "out")
+    assert errors == {}
+    assert sorted(p.name for p in (tmp_path / "out").iterdir()) == ["image_0.png", "image_1.png"]
+
+
+def test_process_images_single_pass(tmp_path):
+    from smc_benchmark.preprocess import process_images
+
+    _write_images(tmp_path / "in", n=2)
+    errors = process_images(input_folder=tmp_path / "in", output_folder=tmp_path / "out")
+    assert errors == {}
+    assert sorted(p.name for p in (tmp_path / "out").glob("*.bmp")) == [
+        "image_0_8bit.bmp",
+        "image_1_8bit.bmp",
+    ]
+    with Image.open(tmp_path / "out" / "image_0_8bit.bmp") as img:
+        assert img.mode == "L"
+        assert img.size == (20, 30)
+        assert round(img.info["dpi"][0]) == 150
+
+
+def test_process_images_matches_two_pass(tmp_path):
+    from smc_benchmark.preprocess import process_images
+
+    _write_images(tmp_path / "in", n=1)
+    process_images(input_folder=tmp_path / "in", output_folder=tmp_path / "fused")
+    process_images(
+        input_folder=tmp_path / "in", output_folder=tmp_path / "two", temp_folder=tmp_path / "temp"
+    )
+    assert not (tmp_path / "temp").exists()
+    fused = np.asarray(Image.open(tmp_path / "fused" / "image_0_8bit.bmp"), dtype=np.int16)
+    two = np.asarray(Image.open(tmp_path / "two" / "image_0_8bit.bmp"), dtype=np.int16)
+    assert fused.shape == two.shape
+    assert np.abs(fused - two).mean() < 2
+
+
+@pt.mark.parametrize("extension", ["png", "jpg"])
+@pt.mark.parametrize("method", ["lanczos", "fast", "area"])
+def test_downscale_methods(tmp_path, method, extension):
+    from smc_benchmark.preprocess import process_images
+
+    y, x = np.mgrid[0:400, 0:320]
+    pixels = (128 + 100 * np.sin(x / 30) * np.cos(y / 40)).astype(np.uint8)
+    Image.fromarray(pixels).convert("RGB").save(tmp_path / f"scan.{extension}", dpi=(600, 600))
+
+    errors = process_images(
+        input_folder=tmp_path, output_folder=tmp_path / "out", target_dpi=150, method=method
+    )
+
+    assert errors == {}
+    with Image.open(tmp_path / "out" / "scan_8bit.bmp") as img:
+        assert img.mode == "L"
+        assert img.size == (80, 100)
+        result = np.asarray(img, dtype=np.float64)
+    expected = pixels.reshape(100, 4, 80, 4).mean(axis=(1, 3))
+    assert np.abs(result - expected).mean() < 3
+
+
+def test_downscale_unknown_method(tmp_path):
+    from smc_benchmark.preprocess import process_images
+
+    with pt.raises(ValueError, match="Unknown downscale method"):
+        process_images(input_folder=tmp_path, output_folder=tmp_path / "out", method="nearest")
+
+
+def test_process_images_skips_unchanged(tmp_path, caplog):
+    from smc_benchmark.preprocess import MANIFEST_NAME, process_images
+
+    _write_images(tmp_path / "in", n=2)
+    process_images(input_folder=tmp_path / "in", output_folder=tmp_path / "out")
+    assert (tmp_path / "out" / MANIFEST_NAME).exists()
+    output = tmp_path / "out" / "image_0_8bit.bmp"
+    mtime = output.stat().st_mtime_ns
+
+    # Nothing changed: no image is processed
+    with caplog.at_level(logging.INFO, logger="smc_benchmark.preprocess"):
+        process_images(input_folder=tmp_path / "in", output_folder=tmp_path / "out")
+    assert "Skipping 2 unchanged image(s)." in caplog.text
+    assert "Converted" not in caplog.text
+    assert output.stat().st_mtime_ns == mtime
+
+    # New image, changed image, and changed parameters
+    _write_images(tmp_path / "new", n=3)
+    (tmp_path / "new" / "image_2.png").rename(tmp_path / "in" / "image_2.png")
+    Image.new("RGB", (40, 40)).save(tmp_path / "in" / "image_1.png", dpi=(600, 600))
+    caplog.clear()
+    with caplog.at_level(logging.INFO, logger="smc_benchmark.preprocess"):
+        process_images(input_folder=tmp_path / "in", output_folder=tmp_path / "out")
+    assert "image_0.png" not in caplog.text
+    assert "image_1.png" in caplog.text
+    assert "image_2.png" in caplog.text
+    with Image.open(tmp_path / "out" / "image_1_8bit.bmp") as img:
+        assert img.size == (10, 10)
+
+    process_images(input_folder=tmp_path / "in", output_folder=tmp_path / "out", target_dpi=300)
+    with Image.open(output) as img:
+        assert img.size == (40, 60)
+
+
+def test_process_images_overwrite_updates_manifest(tmp_path):
+    from smc_benchmark.preprocess import process_images
+
+    _write_images(tmp_path / "in", n=1)
+    kwargs = {"input_folder": tmp_path / "in", "output_folder": tmp_path / "out"}
+    output = tmp_path / "out" / "image_0_8bit.bmp"
+
+    process_images(**kwargs)
+    process_images(**kwargs, target_dpi=300, overwrite=True)
+    with Image.open(output) as img:
+        assert img.size == (40, 60)
+
+    # The overwritten output is recorded with its parameters, so it is converted again
+    process_images(**kwargs)
+    with Image.open(output) as img:
+        assert img.size == (20, 30)
+
+
+def test_wait_time_is_deprecated(tmp_path):
+    from smc_benchmark.preprocess import convert_dpi_and_resize, process_images
+
+    _write_images(tmp_path / "in", n=1)
+    with pt.warns(DeprecationWarning, match="wait_time"):
+        errors = process_images(input_folder=tmp_path / "in", output_folder=tmp_path / "out",
+                                wait_time=0.1)
+    assert errors == {}
+    with pt.warns(DeprecationWarning, match="wait_time"):
+        convert_dpi_and_resize(input_folder=tmp_path / "in", output_folder=tmp_path / "resized",
+                               wait_time=0.1)
@@ -24,3 +24,288 @@ def test_read_institution(institution, file):
             assert isinstance(name, str)
             assert isinstance(values, list)
             assert all(isinstance(p, pd.DataFrame) for p in values)
+
+
+@pt.mark.parametrize("institution, file", testdata)
+def test_read_cache(institution, file, cache_dir):
+    """Test that cached experiments equal freshly parsed ones."""
+    import pandas as pd
+
+    from smc_benchmark.cache import clear_cache
+    from smc_benchmark.read import read
+
+    uncached = read(institution, file, cache=False)
+    assert not cache_dir.exists()
+
+    first = read(institution, file)
+    second = read(institution, file)
+    assert len(list(cache_dir.glob("*.npz"))) == 1
+    for material, configs in uncached.items():
+        for config, experiments in configs.items():
+            for expected, *cached in zip(
+                experiments, first[material][config], second[material][config]
+            ):
+                for df in cached:
+                    pd.testing.assert_frame_equal(df, expected)
+
+    (cache_dir / "interrupted.tmp").write_bytes(b"partial entry")
+    assert clear_cache() == 1
+    assert not list(cache_dir.iterdir())
+
+
+def test_cache_invalidation(tmp_path):
+    """Test that a modified data file is parsed again."""
+    import shutil
+
+    from smc_benchmark.read import read
+
+    folder = tmp_path / "kit"
+    folder.mkdir()
+    file = folder / "KIT-CF503K-1.TXT"
+    shutil.copy(testdata[0][1] / file.name, file)
+    full = read("kit", folder)["CF503K"]["7mm 100x100"][0]
+
+    # Truncate the data file
+    lines = file.read_text(encoding="latin1").splitlines(keepends=True)
+    file.write_text("".join(lines[:105]), encoding="latin1")
+    truncated = read("kit", folder)["CF503K"]["7mm 100x100"][0]
+    assert len(full) > len(truncated) == 100
+
+
+def test_read_workers(tmp_path):
+    """Test that parallel reading yields the same result as serial reading."""
+    import shutil
+
+    import pandas as pd
+
+    from smc_benchmark.read import read
+
+    # Several experiments of the same configuration
+    for number in [1, 5, 9]:
+        shutil.copy(testdata[1][1] / "UTW-CF503K-1.csv", tmp_path / f"UTW-CF503K-{number}.csv")
+
+    serial = read("ut", tmp_path, cache=False)
+    parallel = read("ut", tmp_path, cache=False, workers=2)
+    assert list(serial) == list(parallel)
+    for expected, df in zip(serial["CF503K"]["7mm 100x100"], parallel["CF503K"]["7mm 100x100"]):
+        pd.testing.assert_frame_equal(df, expected)
+
+
+def test_read_workers_cache_dir(tmp_path, cache_dir, monkeypatch):
+    """Test that spawned workers write to the cache directory of the parent process."""
+    import multiprocessing
+    import shutil
+    from concurrent.futures import ProcessPoolExecutor
+    from functools import partial
+
+    from smc_benchmark import _utils
+    from smc_benchmark.cache import CACHE_DIR_ENV
+    from smc_benchmark.read import read
+
+    monkeypatch.delenv(CACHE_DIR_ENV, raising=False)
+    monkeypatch.setenv("HOME", str(tmp_path / "home"))
+    monkeypatch.setattr(
+        _utils,
+        "ProcessPoolExecutor",
+        partial(ProcessPoolExecutor, mp_context=multiprocessing.get_context("spawn")),
+    )
+    folder = tmp_path / "ut"
+    folder.mkdir()
+    for number in [1, 5]:
+        shutil.copy(testdata[1][1] / "UTW-CF503K-1.csv", folder / f"UTW-CF503K-{number}.csv")
+
+    read("ut", folder, workers=2)
+    assert len(list(cache_dir.glob("*.npz"))) == 2
+    assert not (tmp_path / "home").exists()
+
+
+@pt.mark.parametrize("institution, file", testdata)
+def test_read_lazy(institution, file):
+    """Test that lazy experiment handles load the same data as eager reading."""
+    import pandas as pd
+
+    from smc_benchmark.experiment import Experiment
+    from smc_benchmark.read import NUMBER_TO_CONFIG_KIT, read
+
+    eager = read(institution, file)
+    lazy = read(institution, file, lazy=True, max_loaded=0)
+
+    for material, configs in lazy.items():
+        for config, experiments in configs.items():
+            for expected, experiment in zip(eager[material][config], experiments):
+                assert isinstance(experiment, Experiment)
+                assert experiment.institution == institution
+                assert experiment.material == material
+                assert experiment.config == config == NUMBER_TO_CONFIG_KIT[experiment.number]
+                pd.testing.assert_frame_equal(experiment.data, expected)
+                assert len(experiment._store) == 0
+
+
+def test_experiment_store_eviction():
+    """Test least-recently-used eviction of loaded experiments."""
+    from smc_benchmark.experiment import ExperimentStore
+
+    store = ExperimentStore(maxsize=2)
+    loads = []
+    for key in ["a", "b", "a", "c", "a", "b"]:
+        store.get(key, lambda key=key: loads.append(key) or key)
+    assert loads == ["a", "b", "c", "b"]
+    assert len(store) == 2
+
+
+def test_read_header():
+    """Test header metadata of KIT and UT data files."""
+    from datetime import datetime
+
+    from smc_benchmark.read import Header, read
+
+    kit = read("kit", testdata[0][1])["CF503K"]["7mm 100x100"][0]
+    date = datetime(2024, 11, 5, 16, 42, 50)
+    assert kit.attrs["header"] == Header(specimen="CF503K-1", date=date)
+    assert list(kit.columns) == ["t", "F", "d", "h"]
+
+    ut = read("ut", testdata[1][1], lazy=True)["CF503K"]["7mm 100x100"][0]
+    assert ut.header == Header(thickness=8.81, length=100.0, width=100.0)
+    assert list(ut.data.columns) == ["t", "d", "F", "L1", "L2"]
+    assert ut.data.attrs["header"] == ut.header
+
+
+def test_read_derive(cache_dir):
+    """Test that derived channels are added and cached along with the data."""
+    from smc_benchmark.read import read
+
+    data = read("kit", testdata[0][1], derive={"window": 21})["CF503K"]["7mm 100x100"][0]
+    assert {"v", "F_s", "dF/dh"} <= set(data.columns)
+    assert data.attrs["header"].specimen == "CF503K-1"
+    assert len(list(cache_dir.glob("*.npz"))) == 2
+
+    cached = read("kit", testdata[0][1], derive={"window": 21})["CF503K"]["7mm 100x100"][0]
+    assert cached.equals(data)
+
+    ut = read("ut", testdata[1][1], derive=True)["CF503K"]["7mm 100x100"][0]
+    assert {"v", "F_s"} <= set(ut.columns) and "dF/dh" not in ut.columns
+
+
+def test_read_derive_batch(tmp_path, monkeypatch):
+    """Test that channels derived for several files at once equal those of single files."""
+    import shutil
+
+    import pandas as pd
+
+    from smc_benchmark import read as read_module
+    from smc_benchmark.channels import add_channels as derive_channels
+    from smc_benchmark.read import read
+
+    for number in [1, 5]:
+        shutil.copy(testdata[1][1] / "UTW-CF503K-1.csv", tmp_path / f"UTW-CF503K-{number}.csv")
+    longer = tmp_path / "UTW-CF503K-5.csv"
+    longer.write_text(longer.read_text() + longer.read_text().splitlines(keepends=True)[-1])
+
+    batches = []
+
+    def add_channels(frames, **options):
+        batches.append(len(frames))
+        return derive_channels(frames, **options)
+
+    monkeypatch.setattr(read_module, "add_channels", add_channels)
+    batch = read("ut", tmp_path, cache=False, derive=True)["CF503K"]["7mm 100x100"]
+    assert batches == [2]
+    lazy = read("ut", tmp_path, cache=False, derive=True, lazy=True)["CF503K"]["7mm 100x100"]
+    assert len(batch[1]) == len(batch[0]) + 1
+    for df, experiment in zip(batch, lazy):
+        pd.testing.assert_frame_equal(df, experiment.data)
+
+
+def test_read_derive_tum_without_displacement(tmp_path):
+    """Test that TUM files without displacement get no velocity, but the other channels."""
+    import numpy as np
+
+    from smc_benchmark.read import read
+
+    t = np.arange(50) * 0.1
+    rows = "".join(f"{ti:.1f},{2 * ti + 1:.1f},{10 - ti:.1f}\n" for ti in t)
+    (tmp_path / "TUM-CF503K-3.csv").write_text("time,force,gap\n" + rows)
+
+    df = read("tum", tmp_path, derive={"window": 11})["CF503K"]["3mm 100x100"][0]
+    assert "v" not in df.columns
+    np.testing.assert_allclose(df["F_s"], df["F"], atol=1e-9)
+    np.testing.assert_allclose(df["dF/dh"], -2, atol=1e-6)
+
+
+def test_read_kit_variable_width(tmp_path):
+    """Test that KIT files which are not of fixed width are read by the fallback parser."""
+    import numpy as np
+
+    from smc_benchmark.read import _read_kit
+
+    kit = _read_kit(testdata[0][1] / "KIT-CF503K-1.TXT")
+    lines = (testdata[0][1] / "KIT-CF503K-1.TXT").read_bytes().split(b"\n")
+    stripped = [b",".join(field.strip() for field in line.split(b",")) for line in lines[5:]]
+    (tmp_path / "KIT-CF503K-1.TXT").write_bytes(b"\n".join(lines[:5] + stripped))
+
+    variable = _read_kit(tmp_path / "KIT-CF503K-1.TXT")
+    np.testing.assert_array_equal(variable.to_numpy(), kit.to_numpy())
+    assert variable.attrs["header"] == kit.attrs["header"]
+
+
+def test_read_tum(tmp_path):
+    """Test reading TUM data files by column names."""
+    from smc_benchmark.read import Header, read
+
+    (tmp_path / "TUM-CF503K-3.csv").write_text(
+        "Versuch;CF503K-3\n"
+        "Zeit;Kraft;Weg;Temperatur;Spalt\n"
+        "(s);(N);(mm);(°C);(mm)\n"
+        "0,0;1,5;0,0;140,0;10,0\n"
+        "0,1;2,5;0,5;140,1;9,5\n",
+        encoding="latin1",
+    )
+    (tmp_path / "TUM-CF503K-4.csv").write_text("time,force [N]\n0.0,1.0\n0.1,2.0\n")
+
+    data = read("tum", tmp_path)
+    df = data["CF503K"]["3mm 100x100"][0]
+    assert list(df.columns) == ["t", "F", "d", "T", "h"]
+    assert df["h"].tolist() == [10.0, 9.5]
+    assert df.attrs["header"] == Header()
+    assert data["CF503K"]["3mm 50x50"][0]["F"].tolist() == [1.0, 2.0]
+
+
+def test_read_tum_zwick(tmp_path):
+    """Test a Zwick export, where 'Prüfzeit' and 'Zeit' both name a time column."""
+    from smc_benchmark.read import read
+
+    (tmp_path / "TUM-CF503K-3.csv").write_text(
+        "Prüfzeit;Zeit;Standardkraft;Standardweg\n"
+        "s;s;N;mm\n"
+        "0,0;100,0;1,5;0,0\n"
+        "0,1;100,1;2,5;0,5\n",
+        encoding="latin1",
+    )
+
+    df = read("tum", tmp_path)["CF503K"]["3mm 100x100"][0]
+    assert list(df.columns) == ["t", "F", "d"]
+    assert df["t"].tolist() == [0.0, 0.1]
+
+
+def test_read_all():
+    """Test the long-format frame of several institutions."""
+    import numpy as np
+
+    from smc_benchmark.read import read, read_all
+
+    df = read_all({"kit": testdata[0][1], "ut": testdata[1][1]})
+    assert list(df.columns) == [
+        "institution", "material", "config", "specimen", "t", "F", "d", "h", "L1", "L2"
+    ]
+    for column in ["institution", "material", "config", "specimen"]:
+        assert df[column].dtype == "category"
+
+    kit = read("kit", testdata[0][1])["CF503K"]["7mm 100x100"][0]
+    ut = read("ut", testdata[1][1])["CF503K"]["7mm 100x100"][0]
+    assert len(df) == len(kit) + len(ut)
+    assert df.groupby("institution", observed=True).size().to_dict() == {
+        "kit": len(kit),
+        "ut": len(ut),
+    }
+    np.testing.assert_array_equal(df["F"], np.concatenate([kit["F"], ut["F"]]))
+    assert df.loc[df["institution"] == "ut", "h"].isna().all()
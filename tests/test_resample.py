@@ -0,0 +1,53 @@
+import numpy as np
+import pandas as pd
+
+
+def _experiment(number, h, force, config="3mm 100x100"):
+    """Create an experiment handle holding synthetic data."""
+    from smc_benchmark.experiment import Experiment
+
+    df = pd.DataFrame({"t": np.arange(len(h)) * 0.01, "F": force, "h": h})
+    return Experiment(
+        institution="kit",
+        material="CF503K",
+        number=number,
+        config=config,
+        file=f"KIT-CF503K-{number}.TXT",
+        loader=lambda file: df,
+    )
+
+
+def test_resample_non_monotonic():
+    """Test that gap reversals are skipped and grid points outside a curve are NaN."""
+    from smc_benchmark.resample import resample
+
+    # Gap reverses from 4 to 5 mm; force is linear in the gap
+    h = np.array([6.0, 5.0, 4.0, 5.0, 3.5, 3.0])
+    experiments = [_experiment(3, h, 10 * (7 - h)), _experiment(7, h[:3], 20 * (7 - h[:3]))]
+
+    values = resample(experiments, [6.5, 5.5, 4.5, 3.25, 2.5])
+    np.testing.assert_allclose(values[0], [np.nan, 15, 25, 37.5, np.nan])
+    np.testing.assert_allclose(values[1], [np.nan, 30, 50, np.nan, np.nan])
+
+
+def test_ensemble():
+    """Test ensemble statistics per group."""
+    from smc_benchmark.resample import ensemble
+
+    h = np.linspace(10, 3, 71)
+    experiments = [
+        _experiment(3, h, 100 * (10 - h)),
+        _experiment(7, h, 300 * (10 - h)),
+        _experiment(4, h, 50 * (10 - h), config="3mm 50x50"),
+    ]
+    stats = ensemble(experiments, [9.0, 5.0])
+
+    group = stats.loc[("kit", "CF503K", "3mm 100x100")]
+    np.testing.assert_allclose(group["count"], [2, 2])
+    np.testing.assert_allclose(group["mean"], [200, 1000])
+    np.testing.assert_allclose(group["std"], [np.sqrt(2) * 100, np.sqrt(2) * 500])
+    np.testing.assert_allclose(group["p50"], [200, 1000])
+
+    group = stats.loc[("kit", "CF503K", "3mm 50x50")]
+    np.testing.assert_allclose(group["mean"], [50, 250])
+    assert group["std"].isna().all()
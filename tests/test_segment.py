@@ -0,0 +1,184 @@
+import multiprocessing
+import os
+import subprocess
+import sys
+from types import SimpleNamespace
+
+import cv2
+import numpy as np
+import pytest as pt
+
+
+def test_import_does_not_load_model():
+    code = (
+        "import os, sys; import smc_benchmark.segment; "
+        "assert 'torch' not in sys.modules; "
+        "assert 'segment_anything' not in sys.modules; "
+        "assert 'KMP_DUPLICATE_LIB_OK' not in os.environ"
+    )
+    env = {"PYTHONPATH": os.pathsep.join(sys.path)}
+    subprocess.run([sys.executable, "-c", code], check=True, env=env)
+
+
+def test_get_model_is_cached(tmp_path):
+    from smc_benchmark import segment
+
+    model = segment.get_model(tmp_path / "model.pth", "vit_b", "cpu")
+    assert segment.get_model(str(tmp_path / "model.pth"), "vit_b", "cpu") is model
+    assert segment.get_model(tmp_path / "model.pth", "vit_b") is not model
+    assert model.checkpoint == (tmp_path / "model.pth").resolve()
+    assert "sam" not in vars(model)  # not loaded yet
+
+
+class _FakeGenerator:
+    """Mask generator returning the dark square of the test images."""
+
+    def generate(self, image):
+        dark = image.mean(axis=2) < 100
+        return [{"area": int(dark.sum()), "segmentation": dark}] if dark.any() else []
+
+
+def _fake_model():
+    """Return a model handle whose mask generator is a _FakeGenerator."""
+    from smc_benchmark.segment import SamModel
+
+    class FakeModel(SamModel):
+        device = SimpleNamespace(type="cpu")
+        mask_generator = _FakeGenerator()
+
+        def mask_generator_with(self, **kwargs):
+            self.generator_kwargs = kwargs
+            return self.mask_generator
+
+    return FakeModel()
+
+
+def _write_images(folder):
+    folder.mkdir()
+    image = np.full((60, 60, 3), 220, dtype=np.uint8)
+    cv2.imwrite(str(folder / "blank.bmp"), image)
+    image[10:40, 20:50] = 30
+    cv2.imwrite(str(folder / "specimen.bmp"), image)
+
+
+def test_segment_images(tmp_path):
+    from smc_benchmark import segment
+
+    _write_images(tmp_path / "in")
+    errors = segment.segment_images(
+        input_folder=tmp_path / "in", output_folder=tmp_path / "out",
+        log_file_path=tmp_path / "log.txt", model=_fake_model(), min_area_threshold=100,
+    )
+
+    assert list(errors) == [str(tmp_path / "in" / "blank.bmp")]
+    assert "Not enough valid masks" in errors[str(tmp_path / "in" / "blank.bmp")]
+    cutout = cv2.imread(str(tmp_path / "out" / "specimen.bmp"))
+    assert (cutout[10:40, 20:50] == 30).all()
+    assert (cutout[:10] == 255).all()
+
+
+def test_segment_images_parallel(tmp_path):
+    from smc_benchmark import segment
+
+    pt.importorskip("torch")
+    _write_images(tmp_path / "in")
+    errors = segment.segment_images(
+        input_folder=tmp_path / "in", output_folder=tmp_path / "out",
+        log_file_path=tmp_path / "log.txt", model=_fake_model(), min_area_threshold=100,
+        workers=2, threads_per_worker=1,
+    )
+    assert list(errors) == [str(tmp_path / "in" / "blank.bmp")]
+    assert (tmp_path / "out" / "specimen.bmp").exists()
+    assert segment._worker_model is None
+
+
+def test_create_pool_releases_model():
+    from smc_benchmark import segment
+
+    if "fork" not in multiprocessing.get_all_start_methods():
+        pt.skip("the model is only shared with forked workers")
+    model = _fake_model()
+    with segment.create_pool(1, model=model):
+        assert segment._worker_model is model
+    assert segment._worker_model is None
+
+
+@pt.mark.parametrize("refine", [False, True])
+def test_select_mask_fast(refine):
+    from smc_benchmark import segment
+
+    image = np.full((600, 800, 3), 220, dtype=np.uint8)
+    cv2.circle(image, (430, 290), 173, (30, 30, 30), thickness=-1)
+    expected = image[..., 0] == 30
+    model = _fake_model()
+
+    fast = segment.FastSettings(max_side=200, refine=refine)
+    mask = segment.select_mask(image_rgb=image, model=model, min_area_threshold=80000, fast=fast)
+
+    assert model.generator_kwargs["points_per_side"] == fast.points_per_side
+    assert mask.shape == expected.shape
+    iou = (mask & expected).sum() / (mask | expected).sum()
+    assert iou == 1.0 if refine else iou > 0.98
+
+
+def test_classical_mask():
+    from smc_benchmark import segment
+
+    image = np.full((300, 400, 3), 220, dtype=np.uint8)
+    image[50:250, 100:320] = 40
+    mask, score = segment.classical_mask(image_rgb=image, min_area_threshold=1000)
+    assert (mask == (image[..., 0] == 40)).all()
+    assert score > segment.MIN_QUALITY
+
+    # Too small, or several dark regions
+    assert segment.classical_mask(image_rgb=image, min_area_threshold=50000)[0] is None
+    image[20:280, 20:60] = 40
+    assert segment.classical_mask(image_rgb=image, min_area_threshold=1000)[1] < segment.MIN_QUALITY
+
+
+def test_segment_images_backends(tmp_path, monkeypatch):
+    from smc_benchmark import segment
+
+    _write_images(tmp_path / "in")
+    image = cv2.imread(str(tmp_path / "in" / "specimen.bmp"))
+    image[45:55, 5:55] = 30  # second dark region, low quality score
+    cv2.imwrite(str(tmp_path / "in" / "two.bmp"), image)
+    sam_calls = []
+    monkeypatch.setattr(segment, "select_mask",
+                        lambda image_rgb, **kwargs: sam_calls.append(image_rgb) or
+                        image_rgb[..., 0] == 30)
+
+    kwargs = {"input_folder": tmp_path / "in", "log_file_path": tmp_path / "log.txt",
+              "min_area_threshold": 100}
+    errors = segment.segment_images(output_folder=tmp_path / "classical", backend="classical",
+                                    **kwargs)
+    assert list(errors) == [str(tmp_path / "in" / "blank.bmp")]
+    assert not sam_calls
+    cutout = cv2.imread(str(tmp_path / "classical" / "specimen.bmp"))
+    assert (cutout[10:40, 20:50] == 30).all()
+    assert (cutout[:10] == 255).all()
+
+    segment.segment_images(output_folder=tmp_path / "auto", backend="auto", **kwargs)
+    assert len(sam_calls) == 2  # blank and two dark regions
+    cutout = cv2.imread(str(tmp_path / "auto" / "two.bmp"))
+    assert (cutout[45:55, 5:55] == 30).all()
+
+    with pt.raises(ValueError, match="Unknown segmentation backend"):
+        segment.find_mask(image_rgb=image, backend="other")
+
+
+def test_mask_darkness():
+    from smc_benchmark import segment
+
+    image = np.zeros((40, 50), dtype=np.uint8)
+    image[:, 25:] = 200
+    masks = [np.zeros_like(image, dtype=bool) for _ in range(20)]  # more than one chunk
+    masks[0][:, 20:30] = True
+    masks[1][:10] = True
+
+    darkness = segment.mask_darkness(grayscale_image=image, masks=masks)
+
+    # Black pixels count as well, empty masks are white
+    np.testing.assert_allclose(darkness[:3], [100, 100, 255])
+    rgb = np.repeat(image[..., None], 3, axis=2)
+    assert segment.calculate_darkness(image_rgb=rgb, mask=masks[0]) == 100
@@ -0,0 +1,116 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest as pt
+
+
+def test_read_testplan(tmp_path, caplog, write_testplan):
+    from smc_benchmark.sort import FIRST_ROW, LAST_ROW
+    from smc_benchmark.testplan import SHEETS, read_testplan
+
+    write_testplan(tmp_path / "plan.xlsx")
+    table = read_testplan(tmp_path / "plan.xlsx", first_row=FIRST_ROW, last_row=LAST_ROW)
+
+    assert len(table) == 3 * len(SHEETS)
+    assert table["file_name"].tolist()[:3] == ["CF503K-10", "CF503K-11", "CF503K-12"]
+    assert table["row"].tolist()[:3] == [21, 22, 23]
+    assert table["sheet"].iloc[-1] == "Day 5"
+    assert table["thickness"].tolist()[:3] == [3.0, 3.0, 2.5]
+    assert np.isnan(table["density"].iloc[2])
+    assert table["size"].dtype == np.float64
+    assert "Invalid density 'tbd'" in caplog.text
+
+
+def test_read_testplan_rows(tmp_path, write_testplan):
+    from smc_benchmark.sort import FIRST_ROW, LAST_ROW
+    from smc_benchmark.testplan import SHEETS, read_testplan
+
+    path = tmp_path / "plan.xlsx"
+    write_testplan(path)
+
+    # By default, all rows below the header are read, including the remarks
+    table = read_testplan(path)
+    assert len(table) == 4 * len(SHEETS)
+    assert table["row"].tolist()[:4] == [21, 22, 23, LAST_ROW + 2]
+    assert table["file_name"].iloc[3] == "Remarks below the specimens"
+
+    # Each row range is parsed and cached separately
+    sorted_rows = read_testplan(path, first_row=FIRST_ROW, last_row=LAST_ROW)
+    assert len(sorted_rows) == 3 * len(SHEETS)
+    assert len(read_testplan(path)) == 4 * len(SHEETS)
+    assert read_testplan(path, first_row=22, last_row=22)["row"].tolist() == [22] * len(SHEETS)
+
+
+def test_read_testplan_cache(tmp_path, monkeypatch, write_testplan):
+    from smc_benchmark.sort import FIRST_ROW, LAST_ROW
+    from smc_benchmark.testplan import SHEETS, read_testplan
+
+    path = tmp_path / "plan.xlsx"
+    write_testplan(path)
+    rows = {"first_row": FIRST_ROW, "last_row": LAST_ROW}
+    expected = read_testplan(path, **rows)
+
+    def fail(*args, **kwargs):
+        raise AssertionError("workbook parsed again")
+
+    with monkeypatch.context() as m:
+        m.setattr(pd, "read_excel", fail)
+        pd.testing.assert_frame_equal(read_testplan(path, **rows), expected, check_dtype=False)
+
+    # Changed workbook is parsed again
+    write_testplan(path, n=2)
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert len(read_testplan(path, **rows)) == 2 * len(SHEETS)
+
+
+@pt.mark.parametrize("mode", ["copy", "hardlink", "reflink", "symlink"])
+def test_sort_image_dir(tmp_path, mode, write_testplan):
+    from smc_benchmark.sort import sort_image_dir
+
+    write_testplan(tmp_path / "plan.xlsx", n=3)
+    indir = tmp_path / "images"
+    indir.mkdir()
+    for name in ["CF503K-10", "CF503K-12"]:
+        (indir / f"kit-{name}_8bit.bmp").write_bytes(b"image")
+
+    for _ in range(2):  # placing again replaces the files
+        errors = sort_image_dir(excel=tmp_path / "plan.xlsx", indir=indir,
+                                outdir=tmp_path / "out", institution="kit", mode=mode, workers=4)
+
+    assert sorted(errors) == [str(indir / f"kit-CF503K-{day}{i}_8bit.bmp")
+                              for day in range(1, 6) for i in range(3) if day > 1 or i == 1]
+    placed = tmp_path / "out" / "kit-CF503K_100_3mm" / "kit-CF503K-10_8bit.bmp"
+    assert placed.read_bytes() == b"image"
+    assert (tmp_path / "out" / "kit-CF503K_100_2.5mm" / "kit-CF503K-12_8bit.bmp").exists()
+    assert placed.is_symlink() == (mode == "symlink")
+    if mode == "hardlink":
+        assert placed.samefile(indir / "kit-CF503K-10_8bit.bmp")
+    if mode in ("copy", "reflink"):
+        placed.write_bytes(b"changed")
+        assert (indir / "kit-CF503K-10_8bit.bmp").read_bytes() == b"image"
+
+
+@pt.mark.parametrize("mode", ["copy", "reflink", "hardlink", "symlink"])
+@pt.mark.parametrize("previous", ["hardlink", "symlink"])
+def test_sort_image_dir_replaces_links(tmp_path, previous, mode, write_testplan):
+    from smc_benchmark.sort import sort_image_dir
+
+    write_testplan(tmp_path / "plan.xlsx", n=1)
+    indir = tmp_path / "images"
+    indir.mkdir()
+    source = indir / "kit-CF503K-10_8bit.bmp"
+    source.write_bytes(b"image")
+    kwargs = {"excel": tmp_path / "plan.xlsx", "indir": indir, "outdir": tmp_path / "out",
+              "institution": "kit"}
+
+    sort_image_dir(**kwargs, mode=previous)
+    errors = sort_image_dir(**kwargs, mode=mode)
+
+    assert str(source) not in errors
+    assert source.read_bytes() == b"image"
+    placed = tmp_path / "out" / "kit-CF503K_100_3mm" / source.name
+    assert placed.read_bytes() == b"image"
+    assert placed.is_symlink() == (mode == "symlink")
+    assert sorted(p.name for p in placed.parent.iterdir()) == [source.name]
@@ -0,0 +1,66 @@
+import cv2
+import numpy as np
+import pytest as pt
+from PIL import Image
+
+
+@pt.fixture
+def scan():
+    rng = np.random.default_rng(0)
+    y, x = np.mgrid[0:403, 0:323]
+    pattern = 128 + 80 * np.sin(x / 17)[..., None] * np.cos(y / 23)[..., None]
+    return np.clip(pattern + rng.normal(0, 10, (403, 323, 3)), 0, 255).astype(np.uint8)
+
+
+def _reference(rgb, size):
+    gray = cv2.cvtColor(np.ascontiguousarray(rgb[..., ::-1]), cv2.COLOR_BGR2GRAY)
+    return cv2.resize(gray, size, interpolation=cv2.INTER_AREA)
+
+
+def test_area_weights():
+    from smc_benchmark.tiled import area_weights
+
+    weights, first, last = area_weights(10, 4, 1, 3)
+    assert (first, last) == (2, 8)
+    np.testing.assert_allclose(weights.sum(axis=1), 1)
+    np.testing.assert_allclose(weights[0], [0.2, 0.4, 0.4, 0, 0, 0])
+
+
+@pt.mark.parametrize("mode", ["RGB", "RGBA", "L"])
+@pt.mark.parametrize("band_height", [7, 1000])
+def test_convert_tiled_bmp(tmp_path, scan, mode, band_height):
+    from smc_benchmark.tiled import convert_tiled
+
+    Image.fromarray(scan).convert(mode).save(tmp_path / "scan.bmp", dpi=(600, 600))
+
+    size = convert_tiled(tmp_path / "scan.bmp", tmp_path / "out.bmp", 150, band_height)
+
+    assert size == (80, 100)
+    with Image.open(tmp_path / "out.bmp") as img:
+        assert img.mode == "L"
+        assert img.size == size
+        assert round(img.info["dpi"][0]) == 150
+        result = np.asarray(img, dtype=np.int16)
+    rgb = np.asarray(Image.fromarray(scan).convert(mode).convert("RGB"))
+    assert np.abs(result - _reference(rgb, size)).max() <= 1
+
+
+def test_convert_tiled_other_formats(tmp_path, scan):
+    from smc_benchmark.tiled import convert_tiled
+
+    Image.fromarray(scan).save(tmp_path / "scan.png", dpi=(300, 300))
+    size = convert_tiled(tmp_path / "scan.png", tmp_path / "out.bmp", 150)
+    assert size == (161, 201)
+    with Image.open(tmp_path / "out.bmp") as img:
+        result = np.asarray(img, dtype=np.int16)
+    assert np.abs(result - _reference(scan, size)).max() <= 1
+
+
+def test_process_images_tiled(tmp_path, scan):
+    from smc_benchmark.preprocess import process_images
+
+    Image.fromarray(scan).save(tmp_path / "scan.bmp", dpi=(600, 600))
+    errors = process_images(input_folder=tmp_path, output_folder=tmp_path / "out", band_height=16)
+    assert errors == {}
+    with Image.open(tmp_path / "out" / "scan_8bit.bmp") as img:
+        assert img.size == (80, 100)
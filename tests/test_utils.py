@@ -0,0 +1,25 @@
+import multiprocessing
+
+import pytest as pt
+
+
+def _fails_in_worker(item):
+    """Raise an OSError in worker processes, return the item in the main process."""
+    if multiprocessing.parent_process() is not None:
+        raise OSError(f"failed on {item}")
+    return item
+
+
+def test_parallel_map():
+    from smc_benchmark._utils import parallel_map
+
+    assert parallel_map(abs, [-3, 2, -1], workers=2) == [3, 2, 1]
+    assert parallel_map(abs, [-3, 2, -1]) == [3, 2, 1]
+
+
+def test_parallel_map_raises_errors():
+    """Test that errors of the function are raised instead of processing serially."""
+    from smc_benchmark._utils import parallel_map
+
+    with pt.raises(OSError, match="failed on"):
+        parallel_map(_fails_in_worker, [1, 2], workers=2)
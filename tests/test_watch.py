@@ -0,0 +1,63 @@
+import pathlib as pl
+import shutil
+
+source = pl.Path("tests/data/utw/UTW-CF503K-1.csv")
+
+
+def test_incremental_reader(tmp_path):
+    """Test that only new, changed and removed experiments are reported."""
+    from smc_benchmark.watch import IncrementalReader
+
+    reader = IncrementalReader("ut", tmp_path)
+    assert reader.update() == set()
+
+    shutil.copy(source, tmp_path / "UTW-CF503K-1.csv")
+    shutil.copy(source, tmp_path / "UTW-CF503K-3.csv")
+    assert reader.update() == {("CF503K", "7mm 100x100"), ("CF503K", "3mm 100x100")}
+    assert reader.update() == set()
+
+    # Changed and new experiments
+    lines = source.read_text().splitlines(keepends=True)
+    (tmp_path / "UTW-CF503K-1.csv").write_text("".join(lines[:100]))
+    shutil.copy(source, tmp_path / "UTW-CF5050K-2.csv")
+    assert reader.update() == {("CF503K", "7mm 100x100"), ("CF5050K", "5mm 100x100")}
+    assert len(reader.data["CF503K"]["7mm 100x100"][0]) == 94
+
+    (tmp_path / "UTW-CF503K-3.csv").unlink()
+    assert reader.update() == {("CF503K", "3mm 100x100")}
+    assert list(reader.data["CF503K"]) == ["7mm 100x100"]
+
+
+def test_watch(tmp_path):
+    """Test that the callback is only called on changes."""
+    from smc_benchmark.watch import watch
+
+    shutil.copy(source, tmp_path / "UTW-CF503K-1.csv")
+    calls = []
+    watch("ut", tmp_path, lambda data, groups: calls.append(groups), interval=0, max_updates=3)
+    assert calls == [{("CF503K", "7mm 100x100")}]
+
+
+def test_incremental_reader_disappearing_files(tmp_path, monkeypatch):
+    """Test that files removed while they are read are skipped until the next update."""
+    from smc_benchmark import watch
+    from smc_benchmark.cache import fingerprint
+
+    for number in [1, 2, 3]:
+        shutil.copy(source, tmp_path / f"UTW-CF503K-{number}.csv")
+
+    def vanishing(file):
+        if file.name == "UTW-CF503K-3.csv":
+            file.unlink()  # removed between glob and stat
+        result = fingerprint(file)
+        if file.name == "UTW-CF503K-2.csv":
+            file.unlink()  # removed between stat and load
+        return result
+
+    reader = watch.IncrementalReader("ut", tmp_path, cache=False)
+    with monkeypatch.context() as m:
+        m.setattr(watch, "fingerprint", vanishing)
+        assert reader.update() == {("CF503K", "7mm 100x100")}
+
+    shutil.copy(source, tmp_path / "UTW-CF503K-2.csv")
+    assert reader.update() == {("CF503K", "5mm 100x100")}